@@ -0,0 +1,222 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: This module provides the asset loading helpers of the game: a resolver that prefers
+ the pre-flattened .bam files produced by bake_assets.py when they are up to date with their sources,
+ and an in-memory cache of the prepared vehicle models. Each vehicle model is loaded once, scaled,
+ flattened and given its shader, and every later use (switching cars in the garage, entering gameplay)
+ is an instance of that prepared template with no disk access.
+"""
+import hashlib
+import json
+import os
+from panda3d.core import Filename, NodePath
+from loadtrace import load_trace
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+BAKED_DIR = os.path.join(ROOT_DIR, "assets", "baked")
+BAKE_MANIFEST = os.path.join(BAKED_DIR, "manifest.json")
+
+
+def asset_key(path):
+	"""
+	Converts an asset path (e.g. "./assets/models/ground/ground.egg") to the key used in the bake manifest.
+
+	Params:
+	 - path (str): The asset path, absolute or relative to the working directory.
+	Returns:
+	 - str: The path relative to the game directory, with forward slashes.
+	"""
+	return os.path.relpath(os.path.abspath(path), ROOT_DIR).replace(os.sep, "/")
+
+
+_hash_cache = {}	# (abs path, mtime, size) -> sha256 hex digest
+
+def file_sha256(path):
+	"""
+	Hashes a file, remembering the result for as long as the file's size and modification time do not change.
+
+	Params:
+	 - path (str): The file to hash.
+	Returns:
+	 - str or None: The hex SHA-256 digest, or None if the file does not exist.
+	"""
+	try:
+		stat = os.stat(path)
+	except OSError:
+		return None
+	key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+	if key not in _hash_cache:
+		digest = hashlib.sha256()
+		with open(path, "rb") as f:
+			for chunk in iter(lambda: f.read(1 << 20), b""):
+				digest.update(chunk)
+		_hash_cache[key] = digest.hexdigest()
+	return _hash_cache[key]
+
+
+class BakedAssetIndex:
+	"""
+	Looks up baked .bam files in the bake manifest and checks that they still match their sources.
+	"""
+	def __init__(self, manifest_path=BAKE_MANIFEST):
+		"""
+		Params:
+		 - manifest_path (str): Path to the manifest.json written by bake_assets.py.
+		Returns: None
+		"""
+		self.manifest_path = manifest_path
+		self.entries = None
+		self.resolved = {}	# asset key -> baked path (or None when the source must be used)
+
+	def load_manifest(self):
+		"""
+		Reads the manifest (an empty one if nothing has been baked yet).
+
+		Params: None
+		Returns: None
+		"""
+		try:
+			with open(self.manifest_path) as f:
+				self.entries = json.load(f).get("assets", {})
+		except (OSError, ValueError):
+			self.entries = {}
+		self.resolved.clear()
+
+	def baked_path(self, path):
+		"""
+		Returns the baked file for `path` if the source and every texture it was baked from are unchanged.
+
+		Params:
+		 - path (str): The source asset path.
+		Returns:
+		 - str or None: The path of the .bam file to load, or None to load the source.
+		"""
+		if self.entries is None:
+			self.load_manifest()
+		key = asset_key(path)
+		if key not in self.resolved:
+			self.resolved[key] = None
+			entry = self.entries.get(key)
+			if entry:
+				baked = os.path.join(ROOT_DIR, entry["baked"])
+				sources = {key: entry["source_sha256"], **entry.get("dependencies", {})}
+				if os.path.exists(baked) and all(file_sha256(os.path.join(ROOT_DIR, dep)) == digest for dep, digest in sources.items()):
+					self.resolved[key] = baked
+		return self.resolved[key]
+
+
+baked_assets = BakedAssetIndex()
+
+def load_model(loader, path, **kwargs):
+	"""
+	Loads a model, preferring its baked .bam file when the bake is up to date with the source.
+
+	Params:
+	 - loader (Loader): The Panda3D loader.
+	 - path (str): The source model path.
+	 - **kwargs: Passed on to loader.loadModel (e.g. callback, extraArgs).
+	Returns:
+	 - NodePath: The loaded model (or the request object for asynchronous loads).
+	"""
+	baked = baked_assets.baked_path(path)
+	source = Filename.fromOsSpecific(baked) if baked else path	# The manifest paths are OS-native
+	if kwargs:	# Asynchronous loads complete later, so only synchronous loads are traced
+		return loader.loadModel(source, **kwargs)
+	with load_trace.asset(path):
+		return loader.loadModel(source)
+
+
+class VehicleModelCache:
+	"""
+	Caches one flattened, shader-prepared template per entry of the vehicle model list.
+	"""
+	def __init__(self, loader, vehicle_models):
+		"""
+		Params:
+		 - loader (Loader): The Panda3D loader used to read the model files.
+		 - vehicle_models (list[dict]): The vehicle model list (each with "file_path" and "model_scale").
+		Returns: None
+		"""
+		self.loader = loader
+		self.vehicle_models = vehicle_models
+		self.templates = {}	  # vehicle model index -> prepared NodePath (not in the scene graph)
+		self.pending = set()  # vehicle model indices with an asynchronous load in flight
+
+	def prepare(self, idx, model):
+		"""
+		Bakes the scale into the model, flattens it and enables its shader, then stores it as the template.
+
+		Params:
+		 - idx (int): The vehicle model index.
+		 - model (NodePath): The freshly loaded model.
+		Returns:
+		 - NodePath: The prepared template.
+		"""
+		template = NodePath(f"vehicle_template_{idx}")
+		model.reparentTo(template)
+		model.setScale(self.vehicle_models[idx]["model_scale"])
+		model.clearModelNodes()
+		template.flattenStrong()
+		template.setShaderAuto()
+		self.templates[idx] = template
+		self.pending.discard(idx)
+		return template
+
+	def get_template(self, idx):
+		"""
+		Returns the prepared template of a vehicle model, loading it synchronously if it is not cached yet.
+
+		Params:
+		 - idx (int): The vehicle model index.
+		Returns:
+		 - NodePath: The prepared template.
+		"""
+		if idx not in self.templates:
+			model = load_model(self.loader, self.vehicle_models[idx]["file_path"])
+			self.prepare(idx, model)
+		return self.templates[idx]
+
+	def preload_async(self, indices=None):
+		"""
+		Starts loading vehicle models in the background so that they are ready before they are needed.
+		Models are prepared on the main thread when their load completes.
+
+		Params:
+		 - indices (iterable[int]): The vehicle model indices to preload (all of them if None).
+		Returns: None
+		"""
+		if indices is None:
+			indices = range(len(self.vehicle_models))
+		for idx in indices:
+			if idx in self.templates or idx in self.pending:
+				continue
+			self.pending.add(idx)
+			load_model(self.loader, self.vehicle_models[idx]["file_path"], callback=self._on_loaded, extraArgs=[idx])
+
+	def _on_loaded(self, model, idx):
+		"""
+		Callback of an asynchronous preload.
+
+		Params:
+		 - model (NodePath): The loaded model.
+		 - idx (int): The vehicle model index.
+		Returns: None
+		"""
+		if idx not in self.templates and model:
+			self.prepare(idx, model)
+		self.pending.discard(idx)
+
+	def instance(self, idx, parent):
+		"""
+		Creates an instance of a vehicle model's template under `parent`.
+		The geometry is shared with the template; the returned node carries its own transform and state.
+
+		Params:
+		 - idx (int): The vehicle model index.
+		 - parent (NodePath): The node to attach the instance to.
+		Returns:
+		 - NodePath: The new instance root.
+		"""
+		holder = parent.attachNewNode(f"vehicle_{idx}")
+		self.get_template(idx).instanceTo(holder)
+		return holder
@@ -0,0 +1,225 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Offline asset bake step. Converts every model under assets/models (.glb, .gltf, .egg)
+ into a pre-flattened .bam file under assets/baked, with mipmapped and (where possible) compressed
+ textures embedded, and every standalone image under assets (.png, .jpg, .tif) into a mipmapped,
+ compressed .txo texture. The SHA-256 of each source (and of the textures a model uses) is recorded in
+ assets/baked/manifest.json; at runtime asset_cache.load_model and TextureManager.load only use a baked
+ file while those hashes still match.
+
+Usage:
+	python bake_assets.py            (bake new or changed assets)
+	python bake_assets.py --force    (re-bake everything)
+"""
+import argparse
+import json
+import os
+import time
+from panda3d.core import *
+from asset_cache import ROOT_DIR, BAKED_DIR, BAKE_MANIFEST, asset_key, file_sha256
+
+loadPrcFileData("", "load-file-type p3assimp")		# Use glTF loader, like the game
+loadPrcFileData("", "bam-texture-mode rawdata")		# Embed the processed texture images in the .bam
+
+ASSETS_DIR = os.path.join(ROOT_DIR, "assets")
+MODELS_DIR = os.path.join(ASSETS_DIR, "models")
+MODEL_EXTENSIONS = (".glb", ".gltf", ".egg")
+TEXTURE_EXTENSIONS = (".png", ".jpg", ".tif")
+
+
+def find_files(directory, extensions):
+	"""
+	Lists every file under `directory` with one of the given extensions (skipping the baked output).
+
+	Params:
+	 - directory (str): The directory to search.
+	 - extensions (tuple[str]): The lowercase file extensions to match.
+	Returns:
+	 - list[str]: Absolute paths of the files, sorted.
+	"""
+	found = []
+	for dirpath, dirnames, filenames in os.walk(directory):
+		if os.path.abspath(dirpath).startswith(BAKED_DIR):
+			continue
+		for filename in filenames:
+			if filename.lower().endswith(extensions):
+				found.append(os.path.join(dirpath, filename))
+	return sorted(found)
+
+
+def find_models(models_dir=MODELS_DIR):
+	"""
+	Lists every model file under `models_dir`.
+
+	Params:
+	 - models_dir (str): The directory to search.
+	Returns:
+	 - list[str]: Absolute paths of the model files, sorted.
+	"""
+	return find_files(models_dir, MODEL_EXTENSIONS)
+
+
+def find_textures(assets_dir=ASSETS_DIR):
+	"""
+	Lists every image file under `assets_dir`.
+
+	Params:
+	 - assets_dir (str): The directory to search.
+	Returns:
+	 - list[str]: Absolute paths of the image files, sorted.
+	"""
+	return find_files(assets_dir, TEXTURE_EXTENSIONS)
+
+
+def prepare_texture(tex, compress):
+	"""
+	Generates the mipmap chain of a texture and compresses its images for embedding in the .bam.
+	If this Panda3D build cannot compress the format offline, the texture is flagged so that the
+	driver compresses it on upload instead.
+
+	Params:
+	 - tex (Texture): The texture to prepare (must have a RAM image).
+	 - compress (bool): Whether to compress the texture.
+	Returns:
+	 - str: A short description of what was done (for the bake log).
+	"""
+	if not tex.hasRamImage():
+		return "no ram image"
+	tex.setMinfilter(SamplerState.FTLinearMipmapLinear)
+	tex.generateRamMipmapImages()
+	if not compress:
+		return "mipmapped"
+	mode = Texture.CMDxt5 if tex.getNumComponents() == 4 else Texture.CMDxt1
+	if tex.compressRamImage(mode):
+		return "mipmapped, dxt"
+	tex.setCompression(Texture.CMOn)
+	return "mipmapped, compress on upload"
+
+
+def bake_model(source, compress=True):
+	"""
+	Bakes one model: loads it, flattens it, prepares its textures and writes it as a .bam file.
+
+	Params:
+	 - source (str): Absolute path of the source model.
+	 - compress (bool): Whether to compress the textures.
+	Returns:
+	 - dict: The manifest entry of the baked model.
+	"""
+	key = asset_key(source)
+	baked_key = "assets/baked/" + os.path.relpath(source, MODELS_DIR).replace(os.sep, "/") + ".bam"
+	baked = os.path.join(ROOT_DIR, baked_key)
+
+	model = NodePath(Loader.getGlobalPtr().loadSync(Filename.fromOsSpecific(source), LoaderOptions(LoaderOptions.LF_no_cache)))
+	model.clearModelNodes()
+	model.flattenStrong()
+
+	dependencies = {}
+	texture_notes = []
+	for tex in model.findAllTextures():
+		texture_notes.append(f"{tex.getName()}: {prepare_texture(tex, compress)}")
+		if tex.hasFullpath():
+			dep = tex.getFullpath().toOsSpecific()
+			if os.path.exists(dep):
+				dependencies[asset_key(dep)] = file_sha256(dep)
+
+	os.makedirs(os.path.dirname(baked), exist_ok=True)
+	if not model.writeBamFile(Filename.fromOsSpecific(baked)):
+		raise IOError(f"Could not write {baked}")
+
+	return {
+		"baked": baked_key,
+		"source_sha256": file_sha256(source),
+		"dependencies": dependencies,
+		"textures": texture_notes,
+	}
+
+
+def bake_texture(source, compress=True):
+	"""
+	Bakes one standalone texture into a mipmapped, compressed .txo file.
+
+	Params:
+	 - source (str): Absolute path of the source image.
+	 - compress (bool): Whether to compress the texture.
+	Returns:
+	 - dict: The manifest entry of the baked texture.
+	"""
+	baked_key = "assets/baked/textures/" + os.path.relpath(source, ASSETS_DIR).replace(os.sep, "/") + ".txo"
+	baked = os.path.join(ROOT_DIR, baked_key)
+
+	tex = TexturePool.loadTexture(Filename.fromOsSpecific(source))
+	tex = tex.makeCopy()	# Do not modify the copy held by the texture pool
+	source_bytes = tex.getRamImageSize()
+	note = prepare_texture(tex, compress)
+
+	os.makedirs(os.path.dirname(baked), exist_ok=True)
+	if not tex.write(Filename.fromOsSpecific(baked)):
+		raise IOError(f"Could not write {baked}")
+
+	return {
+		"baked": baked_key,
+		"source_sha256": file_sha256(source),
+		"dependencies": {},
+		"textures": [f"{tex.getName()}: {note}, {source_bytes} -> {tex.getRamImageSize()} bytes (level 0)"],
+	}
+
+
+def is_up_to_date(entry):
+	"""
+	Checks a manifest entry against the current sources.
+
+	Params:
+	 - entry (dict): The manifest entry.
+	Returns:
+	 - bool: True if the baked file exists and no source or texture changed.
+	"""
+	if not os.path.exists(os.path.join(ROOT_DIR, entry["baked"])):
+		return False
+	return all(file_sha256(os.path.join(ROOT_DIR, dep)) == digest for dep, digest in entry["dependencies"].items())
+
+
+def main():
+	"""
+	Command line entry point of the bake step.
+
+	Params: None
+	Returns: None
+	"""
+	parser = argparse.ArgumentParser(description="Bake assets/models into pre-flattened .bam files.")
+	parser.add_argument("--force", action="store_true", help="re-bake assets that are already up to date")
+	parser.add_argument("--no-compress", action="store_true", help="keep textures uncompressed")
+	args = parser.parse_args()
+
+	try:
+		with open(BAKE_MANIFEST) as f:
+			manifest = json.load(f)
+	except (OSError, ValueError):
+		manifest = {"assets": {}}
+	manifest["panda3d_version"] = PandaSystem.getVersionString()
+
+	jobs = [(source, bake_model) for source in find_models()] + [(source, bake_texture) for source in find_textures()]
+	for source, bake in jobs:
+		key = asset_key(source)
+		entry = manifest["assets"].get(key)
+		if not args.force and entry and entry["source_sha256"] == file_sha256(source) and is_up_to_date(entry):
+			print(f"up to date  {key}")
+			continue
+		start = time.perf_counter()
+		try:
+			manifest["assets"][key] = bake(source, not args.no_compress)
+		except Exception as e:
+			print(f"FAILED      {key}: {e}")
+			manifest["assets"].pop(key, None)
+			continue
+		print(f"baked       {key} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+		for note in manifest["assets"][key]["textures"]:
+			print(f"              {note}")
+
+	os.makedirs(BAKED_DIR, exist_ok=True)
+	with open(BAKE_MANIFEST, "w") as f:
+		json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,5 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Headless benchmark suite for the simulation and routing core. Run it from the game
+ directory with `python -m benchmarks` (see benchmarks/__main__.py for the options).
+"""
@@ -0,0 +1,80 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Command line entry point of the benchmark suite.
+
+Usage (from the game directory):
+	python -m benchmarks                                   (run everything, save results/<date>-<commit>.json)
+	python -m benchmarks -k route npc --size 20 40         (only some benchmarks / parameter values)
+	python -m benchmarks --save-baseline                   (also store the results as benchmarks/baseline.json)
+	python -m benchmarks --compare benchmarks/baseline.json --fail-on-regression
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from .fixtures import ROOT_DIR
+from .harness import REGRESSION_THRESHOLD, compare, run, save
+from . import bench_dispatch, bench_fleet, bench_grid, bench_routing, bench_sim	# Registers the benchmarks
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def main():
+	"""
+	Runs the benchmarks, writes the results and optionally compares them with a baseline.
+
+	Params: None
+	Returns:
+	 - int: The exit code (1 if --fail-on-regression is set and a case regressed).
+	"""
+	parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the Delivery Deluxe benchmarks.")
+	parser.add_argument("-k", nargs="+", metavar="NAME", help="only run benchmarks whose name contains one of these")
+	parser.add_argument("--size", nargs="+", type=int, help="map sizes to use instead of the defaults")
+	parser.add_argument("--npcs", nargs="+", type=int, help="NPC counts to use instead of the defaults")
+	parser.add_argument("--vehicles", nargs="+", type=int, help="fleet sizes to use instead of the defaults")
+	parser.add_argument("--pending", nargs="+", type=int, help="pending order counts to use instead of the defaults")
+	parser.add_argument("--repeat", type=int, default=5, help="timed batches per case (default 5)")
+	parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per timed batch (default 0.05)")
+	parser.add_argument("--out", help="results file (default benchmarks/results/<date>-<commit>.json)")
+	parser.add_argument("--save-baseline", action="store_true", help=f"also write the results to {os.path.relpath(BASELINE, ROOT_DIR)}")
+	parser.add_argument("--compare", metavar="BASELINE", help="compare the results with a saved results file")
+	parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help=f"relative slowdown counted as a regression (default {REGRESSION_THRESHOLD})")
+	parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 if any case regressed")
+	args = parser.parse_args()
+
+	os.chdir(ROOT_DIR)	# The game loads its assets relative to its directory
+	overrides = {}
+	if args.size:
+		overrides["size"] = args.size
+	if args.npcs:
+		overrides["npcs"] = args.npcs
+	if args.vehicles:
+		overrides["vehicles"] = args.vehicles
+	if args.pending:
+		overrides["pending"] = args.pending
+
+	report = run(args.k, args.min_time, args.repeat, overrides)
+
+	out = args.out or os.path.join(BENCH_DIR, "results", f"{time.strftime('%Y%m%d-%H%M%S')}-{report['machine'].get('commit', 'nogit')}.json")
+	save(report, out)
+	print(f"\nResults written to {out}")
+	if args.save_baseline:
+		save(report, BASELINE)
+		print(f"Baseline written to {BASELINE}")
+
+	if args.compare:
+		with open(args.compare) as f:
+			baseline = json.load(f)
+		rows = compare(report, baseline, args.threshold)
+		print(f"\nCompared with {args.compare} ({baseline['machine'].get('commit', '?')}, {baseline['machine'].get('date', '?')}):")
+		for label, base, new, ratio, status in rows:
+			print(f"{label:<44} {base * 1000:10.4f} -> {new * 1000:10.4f} ms  {ratio:6.2f}x  {status}")
+		if args.fail_on_regression and any(row[4] == "regression" for row in rows):
+			return 1
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Benchmarks of the order dispatch: one dispatch tick over a backlog of pending orders.
+"""
+import random
+from dispatch import Dispatcher, OrderStream
+from fleet import delivery_nodes
+from routing import RoutingEngine
+from .fixtures import SPACING, load_game, use_map
+from .harness import benchmark
+
+DISPATCH_MAP_SIZE = 20
+IDLE_VEHICLES = 100
+
+
+@benchmark(pending=[1000, 10000, 100000])
+def dispatch_tick(pending):
+	"""
+	One dispatch tick assigning orders to 100 idle vehicles out of a backlog of pending orders
+	(travel times already known, as after the first ticks of a game).
+
+	Params:
+	 - pending (int): The number of pending orders.
+	Returns:
+	 - tuple: The case and its reset.
+	"""
+	game = load_game()
+	grid = use_map(DISPATCH_MAP_SIZE)
+	router = RoutingEngine(grid, game.ROAD_TYPES)
+	houses = delivery_nodes(grid)
+	rng = random.Random(0)
+	orders = OrderStream(houses, pending / 10 / len(houses), rng).poll(10)
+	starts = [(rng.randrange(router.rows), rng.randrange(router.cols)) for _ in range(IDLE_VEHICLES)]
+	warm = Dispatcher(router, SPACING)
+	state = {}
+
+	def reset():
+		dispatcher = Dispatcher(router, SPACING)
+		dispatcher.times = warm.times
+		dispatcher.submit(orders)
+		for v, node in enumerate(starts):
+			dispatcher.vehicle_idle(v, node)
+		state["dispatcher"] = dispatcher
+
+	reset()
+	state["dispatcher"].tick(10)	# Fills the shared travel times
+	return lambda: state["dispatcher"].tick(10), reset
@@ -0,0 +1,34 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Benchmarks of fleet mode: the batched step of all the fleet vehicles.
+"""
+import random
+from fleet import Fleet, delivery_nodes
+from routing import RoutingEngine
+from .fixtures import SPACING, load_game, use_map
+from .harness import benchmark
+
+FLEET_MAP_SIZE = 20
+
+
+@benchmark(vehicles=[10, 100, 500])
+def fleet_step(vehicles):
+	"""
+	One frame of the fleet: every vehicle driving to random delivery houses, rerouting when it arrives.
+
+	Params:
+	 - vehicles (int): The number of fleet vehicles.
+	Returns:
+	 - callable: The case.
+	"""
+	game = load_game()
+	grid = use_map(FLEET_MAP_SIZE)
+	rng = random.Random(0)
+	fleet = Fleet(RoutingEngine(grid, game.ROAD_TYPES), vehicles, SPACING, (-8, -34), rng)
+	houses = list(delivery_nodes(grid).values())
+	fleet.on_idle = lambda v: fleet.assign(v, rng.choice(houses))
+	for v in range(vehicles):
+		fleet.assign(v, rng.choice(houses))
+	for _ in range(60):		# Get the vehicles moving
+		fleet.step(1 / 60)
+	return lambda: fleet.step(1 / 60)
@@ -0,0 +1,122 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Benchmarks of the map module: map generation, loading a map file, street lookups and delivery picks,
+ and of the spatial queries built from a map (position lookups for many vehicles at once).
+"""
+import itertools
+import os
+import random
+import tempfile
+import numpy as np
+import grid_map
+import rules
+from mapfile import MappedGrid, write_map
+from spatial import GAS_STATION, SpatialIndex
+from .fixtures import SPACING, load_game
+from .harness import benchmark
+
+
+@benchmark(size=[10, 20, 40])
+def generate_map(size):
+	"""
+	A full map generation (labels, streets and road types).
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	Returns:
+	 - callable: The case.
+	"""
+	game = load_game()
+	rng = random.Random(0)
+	return lambda: grid_map.generate_map(size, size, game.NUM_LOCATIONS, game.ROAD_TYPES, rng)
+
+
+@benchmark(size=[40, 160, 640], source=["generate", "mapfile", "mapfile_open"])
+def map_load(size, source):
+	"""
+	Getting a map ready to route on: generated from its seed ("generate"), or opened from a map file (written once,
+	then mapped) with the road labels that routing reads decoded into this process ("mapfile"). "mapfile_open" only
+	opens the file (the part shared by the processes that map it).
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	 - source (str): "generate", "mapfile" or "mapfile_open".
+	Returns:
+	 - callable: The case.
+	"""
+	game = load_game()
+	if source == "generate":
+		return lambda: grid_map.generate_map(size, size, game.NUM_LOCATIONS, game.ROAD_TYPES, random.Random(0))
+	path = os.path.join(tempfile.gettempdir(), f"bench_map_{size}.ddm")
+	write_map(grid_map.generate_map(size, size, game.NUM_LOCATIONS, game.ROAD_TYPES, random.Random(0)), path)
+	if source == "mapfile_open":
+		return lambda: MappedGrid(path)
+	return lambda: MappedGrid(path).road_isx_grid
+
+
+@benchmark(size=[10, 20, 40])
+def get_street_idx(size):
+	"""
+	One street lookup, cycling through every intersection of the map.
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	Returns:
+	 - callable: The case.
+	"""
+	game = load_game()
+	grid = grid_map.generate_map(size, size, game.NUM_LOCATIONS, game.ROAD_TYPES, random.Random(0))
+	cells = itertools.cycle([(r, c) for r in range(size - 1) for c in range(size - 1)])
+	return lambda: grid.get_street_idx(next(cells))
+
+
+@benchmark(size=[10, 20, 40, 80])
+def delivery_target(size):
+	"""
+	Picking the next delivery house from the map's label index.
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	Returns:
+	 - callable: The case.
+	"""
+	game = load_game()
+	grid = grid_map.generate_map(size, size, game.NUM_LOCATIONS, game.ROAD_TYPES, random.Random(0))
+	rng = random.Random(0)
+	return lambda: rules.pick_delivery_target(grid, rng)
+
+@benchmark(size=[10, 20, 40])
+def spatial_index(size):
+	"""
+	Building the spatial queries of a map (speed limit, street and refuel grids and the points of interest tree).
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	Returns:
+	 - callable: The case.
+	"""
+	game = load_game()
+	grid = grid_map.generate_map(size, size, game.NUM_LOCATIONS, game.ROAD_TYPES, random.Random(0))
+	return lambda: SpatialIndex(grid, game.ROAD_TYPES, SPACING, (-8, -34), (-37, -37))
+
+
+@benchmark(vehicles=[10, 100, 1000])
+def spatial_batch(vehicles):
+	"""
+	One batched lookup of the speed limit and the nearest gas station under every vehicle's position,
+	on a 40 x 40 map.
+
+	Params:
+	 - vehicles (int): The number of positions looked up.
+	Returns:
+	 - callable: The case.
+	"""
+	game = load_game()
+	grid = grid_map.generate_map(40, 40, game.NUM_LOCATIONS, game.ROAD_TYPES, random.Random(0))
+	spatial = SpatialIndex(grid, game.ROAD_TYPES, SPACING, (-8, -34), (-37, -37))
+	xy = np.random.default_rng(0).uniform(-40, 40 * SPACING, (vehicles, 2))
+
+	def lookup():
+		spatial.speed_limits_of(xy)
+		spatial.nearest_many(GAS_STATION, xy)
+	return lookup
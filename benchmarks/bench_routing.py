@@ -0,0 +1,135 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Benchmarks of the autopilot route search (from scratch, and repaired by the incremental planner),
+ of the all-destinations travel time search (over the grid or the CSR road graph), of the route cache and of the
+ fuel range search (isochrones).
+"""
+from isochrone import IsochroneEngine
+from routing import DStarLite, RouteCache
+from .fixtures import SPACING, load_game, use_map
+from .harness import benchmark
+
+
+@benchmark(size=[10, 20, 40, 80])
+def autopilot_route(size):
+	"""
+	One shortest-time route search from a corner of the map to the opposite corner (the longest route).
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	Returns:
+	 - callable: The case.
+	"""
+	game = load_game()
+	use_map(size)
+	goal = (size - 2, size - 2)
+	return lambda: game.find_shortest_time_path((0, 0), goal)
+
+
+@benchmark(size=[20, 40, 80], change=["deviation", "speed"])
+def autopilot_replan(size, change):
+	"""
+	One repair of the autopilot's corner to corner route by the incremental planner (compare with autopilot_route,
+	which searches from scratch): either the car was pushed from the middle of the route to an intersection off it,
+	or the middle of the route became the slowest street type.
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	 - change (str): "deviation" or "speed".
+	Returns:
+	 - tuple: The case and its reset.
+	"""
+	game = load_game()
+	grid = use_map(size)
+	router = game.get_router()
+	goal = (size - 2, size - 2)
+	route = router.shortest_time_path((0, 0), goal)
+	middle, pushed = next((node, off) for node in route[len(route) // 2:] for off, _ in router.neighbors(node) if off not in route)
+	label = grid.roadisx_get(*middle)
+	slowest = min(game.ROAD_TYPES, key=game.ROAD_TYPES.get)
+	state = {}
+
+	def reset():
+		grid.roadisx_set(middle[0], middle[1], label)
+		planner = DStarLite(router, (0, 0), goal)
+		if change == "deviation":
+			planner.move(middle)
+		state["planner"] = planner
+
+	def case():
+		planner = state["planner"]
+		if change == "deviation":
+			planner.move(pushed)
+		else:
+			grid.roadisx_set(middle[0], middle[1], slowest)
+			planner.update_speeds([middle])
+		return planner.path()
+
+	return case, reset
+
+
+@benchmark(size=[20, 40, 80], graph=["grid", "csr"])
+def travel_times(size, graph):
+	"""
+	The travel times from a corner of the map to every intersection (one row of the dispatcher's travel time table),
+	searched over the grid's neighbour tuples by the routing engine or over the compiled CSR road graph.
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	 - graph (str): "grid" or "csr".
+	Returns:
+	 - callable: The case.
+	"""
+	game = load_game()
+	grid = use_map(size)
+	if graph == "grid":
+		router = game.get_router()
+
+		def search():
+			router.travel_times((0, 0))	# (a returned dict would be taken as metrics)
+		return search
+	road_graph = grid.road_graph(game.ROAD_TYPES)
+	return lambda: road_graph.travel_times(0)
+
+
+@benchmark(size=[20, 40, 80], cache=["miss", "hit"])
+def route_cache(size, cache):
+	"""
+	The corner to corner route through the route cache: searched and encoded on every call ("miss", the cache
+	keeps nothing), or decoded from the cache ("hit"). Compare "miss" with autopilot_route for the cache's overhead.
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	 - cache (str): "miss" or "hit".
+	Returns:
+	 - callable: The case.
+	"""
+	game = load_game()
+	use_map(size)
+	routes = RouteCache(game.get_router(), max_bytes=0 if cache == "miss" else 2**20)
+	goal = (size - 2, size - 2)
+	return lambda: routes.get((0, 0), goal)
+
+@benchmark(size=[20, 40, 80], cache=["cold", "warm"])
+def fuel_isochrone(size, cache):
+	"""
+	The fuel range of the most economical vehicle from the middle of the map: a full search bounded by a full tank
+	("cold"), or the same query answered from the LRU cache ("warm").
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	 - cache (str): "cold" or "warm".
+	Returns:
+	 - callable: The case.
+	"""
+	game = load_game()
+	use_map(size)
+	engine = IsochroneEngine(game.get_router(), SPACING)
+	source = (size // 2, size // 2)
+	fuel_consumption = min(vehicle["fuel_consumption"] for vehicle in game.VEHICLE_MODELS)
+	if cache == "cold":
+		engine.capacity = 0
+
+	def search():
+		engine.reachable(source, fuel_consumption, 100)	# (a returned dict would be taken as metrics)
+	return search
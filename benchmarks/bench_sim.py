@@ -0,0 +1,207 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Benchmarks of the per-frame simulation (NPC update loop, pedestrian hit detection,
+ physics step with and without collision filtering, autopilot driving) and of the city construction,
+ run on a headless game instance.
+"""
+import random
+from direct.task import Task
+from panda3d.bullet import BulletBoxShape, BulletRigidBodyNode
+from panda3d.core import ClockObject, Point3, TransformState, Vec3
+from collision import CAR_GROUP, GROUPS, NPC_GROUP, HitEvents, set_collision_group
+from .fixtures import SPACING, get_app, load_game, reset_scene, use_map
+from .harness import benchmark
+
+NPC_COUNTS = [10, 40, 160]
+SIM_MAP_SIZE = 20	# Large enough to place 160 NPCs (one per intersection)
+AUTOPILOT_ROUTES = 8	# Routes driven by one autopilot_delivery call
+AUTOPILOT_TIMEOUT = 300	# Simulated seconds after which a route counts as not arrived
+
+
+def setup_street_scene(npcs):
+	"""
+	Builds a scene with a ground plane, `npcs` walking NPCs and the car's physics body (far from the NPCs).
+
+	Params:
+	 - npcs (int): The number of NPCs.
+	Returns:
+	 - MyApp: The game, ready for update_npcs / check_pedestrian_hits / doPhysics.
+	"""
+	app = get_app()
+	use_map(SIM_MAP_SIZE)
+	reset_scene(app)
+	app.add_ground()
+	app.setup_npcs(npcs)
+
+	# The car's physics body, as in setup_vehicle, placed where no NPC can reach it
+	app.chassisNP = app.render.attachNewNode(BulletRigidBodyNode('Vehicle'))
+	app.chassisNP.node().addShape(BulletBoxShape(Vec3(0.7, 1.5, 0.5)), TransformState.makePos(Point3(0, 0, 0.5)))
+	app.chassisNP.setPos(-1000, -1000, 1.0)
+	app.chassisNP.node().setMass(1000)
+	set_collision_group(app.chassisNP.node(), CAR_GROUP)
+	app.world.attachRigidBody(app.chassisNP.node())
+	app.pedestrian_hits = HitEvents(app.chassisNP.node(), NPC_GROUP)
+	return app
+
+
+@benchmark(npcs=NPC_COUNTS)
+def npc_update(npcs):
+	"""
+	One frame of the NPC update loop.
+
+	Params:
+	 - npcs (int): The number of NPCs.
+	Returns:
+	 - callable: The case.
+	"""
+	app = setup_street_scene(npcs)
+	return lambda: app.update_npcs(1 / 60)
+
+
+@benchmark(npcs=NPC_COUNTS, detection=["scan", "events"])
+def pedestrian_hits(npcs, detection):
+	"""
+	One frame of the physics simulation and of the pedestrian hit detection (no hit, outside the fine cooldown):
+	a car-versus-NPC contactTestPair scan of every NPC ("scan", the detection before collision.HitEvents),
+	or draining the hits queued from Bullet's contact events ("events", MyApp.check_pedestrian_hits).
+
+	Params:
+	 - npcs (int): The number of NPCs.
+	 - detection (str): "scan" or "events".
+	Returns:
+	 - callable: The case.
+	"""
+	app = setup_street_scene(npcs)
+	car_node = app.chassisNP.node()
+	if detection == "scan":
+		car_node.notifyCollisions(False)
+		def frame():
+			app.world.doPhysics(1 / 60, 10, 1.0 / 180.0)
+			for npc in app.npcs:
+				if app.world.contactTestPair(car_node, npc['node'].node()).getNumContacts() > 0:
+					break
+		return frame
+	def frame():
+		app.world.doPhysics(1 / 60, 10, 1.0 / 180.0)
+		app.pedestrian_hits.poll()		# What the event manager does between frames in the game
+		app.last_fine_time = float("-inf")
+		app.check_pedestrian_hits(0.0)
+	return frame
+
+
+@benchmark(npcs=NPC_COUNTS)
+def physics_step(npcs):
+	"""
+	One frame of the physics simulation (the call in MyApp.update).
+
+	Params:
+	 - npcs (int): The number of NPCs.
+	Returns:
+	 - callable: The case.
+	"""
+	app = setup_street_scene(npcs)
+	return lambda: app.world.doPhysics(1 / 60, 10, 1.0 / 180.0)
+
+
+@benchmark(npcs=NPC_COUNTS, filter=["none", "groups"])
+def physics_filter(npcs, filter):
+	"""
+	One frame of the physics simulation of the whole city (ground, buildings, car and NPCs, after the NPCs walked
+	for two seconds), with every pair of bodies colliding ("none") or with the collision groups of collision.py
+	("groups"). The metrics give the pairs that passed the broadphase filter (one contact manifold each).
+
+	Params:
+	 - npcs (int): The number of NPCs.
+	 - filter (str): "none" or "groups".
+	Returns:
+	 - callable: The case.
+	"""
+	app = setup_street_scene(npcs)
+	app.add_building_grid(load_game().g_map, SPACING)
+	if filter == "none":
+		for a in GROUPS:
+			for b in GROUPS:
+				app.world.setGroupCollisionFlag(a, b, True)
+	for _ in range(120):
+		app.update_npcs(1 / 60)
+		app.world.doPhysics(1 / 60, 10, 1.0 / 180.0)
+
+	def step():
+		app.world.doPhysics(1 / 60, 10, 1.0 / 180.0)
+		return {"pairs": app.world.getNumManifolds()}
+	return step
+
+
+@benchmark(size=[10, 20])
+def scene_construction(size):
+	"""
+	Building the city (add_building_grid, which also adds the roads and streetlights).
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	Returns:
+	 - tuple[callable, callable]: The case and its reset (a fresh scene and map before every build).
+	"""
+	app = get_app()
+	state = {}
+	def reset():
+		reset_scene(app)
+		state["grid"] = use_map(size)
+	return (lambda: app.add_building_grid(state["grid"], SPACING)), reset
+
+
+@benchmark(size=[20])
+def autopilot_delivery(size):
+	"""
+	The autopilot driving the car (physics included, at a fixed 60 fps) along 8 random routes of at least
+	8 streets, from a standstill at the start intersection to its stop at the delivery target. The time is
+	for all the routes; the metrics give the mean simulated delivery time per route and the routes completed.
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	Returns:
+	 - callable: The case.
+	"""
+	app = get_app()
+	game = load_game()
+	use_map(size)
+	reset_scene(app)
+	app.add_ground()
+	app.chassisNP = app.render.attachNewNode(BulletRigidBodyNode('Vehicle'))
+	app.chassisNP.node().addShape(BulletBoxShape(Vec3(0.7, 1.5, 0.5)), TransformState.makePos(Point3(0, 0, 0.5)))
+	app.chassisNP.node().setMass(app.vehicle_models[app.vehicle_model_idx]["mass"])
+	app.chassisNP.node().setDeactivationEnabled(False)
+	set_collision_group(app.chassisNP.node(), CAR_GROUP)
+	app.world.attachRigidBody(app.chassisNP.node())
+
+	router = game.get_router()
+	rng = random.Random(0)
+	routes = []
+	while len(routes) < AUTOPILOT_ROUTES:
+		start = (rng.randrange(router.rows), rng.randrange(router.cols))
+		goal = (rng.randrange(router.rows), rng.randrange(router.cols))
+		if abs(start[0] - goal[0]) + abs(start[1] - goal[1]) >= 8:
+			routes.append((start, goal))
+
+	def drive():
+		mode = globalClock.getMode()
+		globalClock.setMode(ClockObject.MForced)
+		globalClock.setFrameRate(60)
+		globalClock.tick()
+		total, arrived = 0.0, 0
+		for start, goal in routes:
+			app.chassisNP.setPosHpr(app.road_offset_start_x + start[1] * SPACING, app.road_offset_start_y + start[0] * SPACING, 1.0, 0, 0, 0)
+			app.chassisNP.node().setLinearVelocity(Vec3(0, 0, 0))
+			app.delivery_target = goal
+			app.start_autopilot()
+			frames = 0
+			while frames < AUTOPILOT_TIMEOUT * 60:
+				app.world.doPhysics(1 / 60, 10, 1.0 / 180.0)
+				frames += 1
+				if app.autopilot_drive_task(None) == Task.done:
+					arrived += 1
+					break
+			total += frames / 60
+		globalClock.setMode(mode)
+		return {"delivery_seconds": total / len(routes), "arrived": arrived}
+	return drive
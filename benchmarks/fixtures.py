@@ -0,0 +1,96 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Shared setup for the benchmarks: a headless game instance (offscreen window, no
+ sound), maps of a given size installed as the game's map, and a reset of the 3D scene and physics
+ world between cases.
+"""
+import os
+import random
+from panda3d.core import loadPrcFileData
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPACING = 60	# buildings_spacing of the game
+
+_app = None
+
+
+def load_game():
+	"""
+	Imports the game module without starting it.
+
+	Params: None
+	Returns:
+	 - module: The main module.
+	"""
+	import main
+	return main
+
+
+def get_app():
+	"""
+	Returns the shared headless game instance, creating it on first use.
+
+	Params: None
+	Returns:
+	 - MyApp: The game, on its start screen.
+	"""
+	global _app
+	if _app is None:
+		loadPrcFileData("", "window-type offscreen\naudio-library-name null\nwin-size 320 240\nnotify-level error")
+		loadPrcFileData("", f"model-path {ROOT_DIR}")
+		_app = load_game().MyApp()
+	return _app
+
+
+def use_map(size, seed=0):
+	"""
+	Generates a square map and installs it as the game's map (g_map, ROWS and COLUMNS).
+
+	Params:
+	 - size (int): The number of building rows and columns.
+	 - seed (int): The map seed.
+	Returns:
+	 - ManhattanGrid: The map.
+	"""
+	import grid_map
+	game = load_game()
+	game.ROWS = game.COLUMNS = size
+	game.MAP_SEED = seed
+	game.g_map = grid_map.generate_map(size, size, game.NUM_LOCATIONS, game.ROAD_TYPES, random.Random(seed))
+	return game.g_map
+
+
+def reset_scene(app, seed=0):
+	"""
+	Removes everything from the 3D scene and starts a new, empty physics world (and the lookups of the current map).
+
+	Params:
+	 - app (MyApp): The game.
+	 - seed (int): The seed of the game's random source.
+	Returns: None
+	"""
+	from panda3d.bullet import BulletWorld
+	from panda3d.core import Vec3
+	from collision import setup_collision_filter
+
+	for npc in app.npcs:
+		npc['actor'].cleanup()
+		npc['node'].removeNode()
+	app.npcs = []
+	app.game_elements.clear()
+	app.textures.clear_tiles()
+	for child in app.render.getChildren():
+		if child != app.camera:
+			child.removeNode()
+	app.render.clearLight()
+
+	app.world = BulletWorld()
+	app.world.setGravity(Vec3(0, 0, -9.81))
+	setup_collision_filter(app.world)
+	app.rng = random.Random(seed)
+	app.road_offset_start_x = -8
+	app.road_offset_start_y = -34
+	app.buildings_spacing = SPACING
+	app.building_offset_start_x = -37
+	app.building_offset_start_y = -37
+	app.spatial = app.build_spatial_index()
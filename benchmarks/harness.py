@@ -0,0 +1,202 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: The benchmark harness. Benchmarks register themselves with the `benchmark` decorator
+ and a grid of parameters (e.g. map sizes, NPC counts); for every combination the harness builds the case,
+ calibrates how many calls make a measurable batch, times several batches and records the per-call
+ statistics. Results are written as JSON and can be compared against a saved baseline.
+"""
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+BENCHMARKS = []		# Registered (name, function, params) in definition order
+REGRESSION_THRESHOLD = 0.15		# Relative slowdown against the baseline counted as a regression (compare, --threshold)
+
+
+def benchmark(**params):
+	"""
+	Decorator registering a benchmark. The decorated function is called once per combination
+	of the parameter values and returns the case to time: either a callable, or a tuple of
+	(callable, reset) where reset is run untimed before every call (for cases that consume state).
+	A case may return a dict of other measurements (e.g. simulated seconds), recorded as its metrics.
+
+	Params:
+	 - **params (list): The values of each parameter, e.g. size=[10, 20, 40].
+	Returns:
+	 - callable: The decorator.
+	"""
+	def register(func):
+		BENCHMARKS.append((func.__name__, func, params))
+		return func
+	return register
+
+
+def case_name(name, combo):
+	"""
+	Params:
+	 - name (str): The benchmark name.
+	 - combo (dict): The parameter values of one case.
+	Returns:
+	 - str: The case name, e.g. "npc_update[npcs=40]".
+	"""
+	if not combo:
+		return name
+	return name + "[" + ",".join(f"{k}={v}" for k, v in combo.items()) + "]"
+
+
+def time_case(case, min_time=0.05, repeat=5):
+	"""
+	Times one case.
+
+	Params:
+	 - case (callable or tuple): The case returned by a benchmark function.
+	 - min_time (float): The minimum duration of one timed batch in seconds.
+	 - repeat (int): The number of timed batches.
+	Returns:
+	 - dict: The per-call min, median, mean and standard deviation in seconds, the calls per batch and the batch count
+			 (and "metrics", the dict returned by the last untimed or single call, if the case returns one).
+	"""
+	func, reset = case if isinstance(case, tuple) else (case, None)
+	result = None
+
+	if reset:
+		# Stateful case: one call per sample, reset untimed in between
+		samples = []
+		for _ in range(repeat):
+			reset()
+			start = time.perf_counter()
+			result = func()
+			samples.append(time.perf_counter() - start)
+		number = 1
+	else:
+		result = func()	# Warm up
+		number = 1
+		while True:
+			start = time.perf_counter()
+			for _ in range(number):
+				func()
+			elapsed = time.perf_counter() - start
+			if elapsed >= min_time or number >= 1 << 20:
+				break
+			number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+		samples = []
+		for _ in range(repeat):
+			start = time.perf_counter()
+			for _ in range(number):
+				func()
+			samples.append((time.perf_counter() - start) / number)
+
+	stats = {
+		"min": min(samples),
+		"median": statistics.median(samples),
+		"mean": statistics.fmean(samples),
+		"stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+		"number": number,
+		"repeat": repeat,
+	}
+	if isinstance(result, dict):
+		stats["metrics"] = result
+	return stats
+
+
+def machine_info():
+	"""
+	Returns:
+	 - dict: The Python version, platform, Panda3D version (if installed) and current git commit.
+	"""
+	info = {
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"processor": platform.processor() or platform.machine(),
+		"date": time.strftime("%Y-%m-%d %H:%M:%S"),
+	}
+	try:
+		from panda3d.core import PandaSystem
+		info["panda3d"] = PandaSystem.getVersionString()
+	except ImportError:
+		pass
+	try:
+		info["commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+										cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+	except OSError:
+		pass
+	return info
+
+
+def run(selected=None, min_time=0.05, repeat=5, overrides=None, log=print):
+	"""
+	Runs the registered benchmarks.
+
+	Params:
+	 - selected (list[str]): Only run benchmarks whose name contains one of these strings (all if None).
+	 - min_time (float): The minimum duration of one timed batch in seconds.
+	 - repeat (int): The number of timed batches per case.
+	 - overrides (dict): Parameter values replacing the registered ones (e.g. {"size": [20]}).
+	 - log (callable): Called with one progress line per case.
+	Returns:
+	 - dict: {"machine": ..., "results": {case name: stats, or {"error": message} if the case failed}}
+	"""
+	results = {}
+	for name, func, params in BENCHMARKS:
+		if selected and not any(s in name for s in selected):
+			continue
+		params = {k: (overrides or {}).get(k, v) for k, v in params.items()}
+		for values in itertools.product(*params.values()):
+			combo = dict(zip(params, values))
+			label = case_name(name, combo)
+			try:
+				stats = time_case(func(**combo), min_time, repeat)
+			except Exception as e:
+				results[label] = {"error": f"{type(e).__name__}: {e}"}
+				log(f"{label:<44} ERROR {results[label]['error']}")
+				continue
+			results[label] = stats
+			metrics = "".join(f"  {k}={v:.4g}" for k, v in stats.get("metrics", {}).items())
+			log(f"{label:<44} {stats['median'] * 1000:10.4f} ms  (min {stats['min'] * 1000:.4f}, x{stats['number']}){metrics}")
+	return {"machine": machine_info(), "results": results}
+
+
+def save(report, path):
+	"""
+	Writes a report as JSON.
+
+	Params:
+	 - report (dict): The report returned by run().
+	 - path (str): The file to write.
+	Returns: None
+	"""
+	os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+	with open(path, "w") as f:
+		json.dump(report, f, indent=1)
+
+
+def compare(report, baseline, threshold=REGRESSION_THRESHOLD):
+	"""
+	Compares the medians of a report with a baseline report.
+
+	Params:
+	 - report (dict): The new report.
+	 - baseline (dict): The baseline report.
+	 - threshold (float): The relative slowdown above which a case counts as a regression.
+	Returns:
+	 - list[tuple]: (case name, baseline median, new median, ratio, status) for every case in both reports,
+					where status is "regression", "improvement" or "same".
+	"""
+	rows = []
+	for label, stats in report["results"].items():
+		base = baseline["results"].get(label)
+		if not base or "error" in base or "error" in stats:
+			continue
+		ratio = stats["median"] / base["median"] if base["median"] else float("inf")
+		if ratio > 1 + threshold:
+			status = "regression"
+		elif ratio < 1 / (1 + threshold):
+			status = "improvement"
+		else:
+			status = "same"
+		rows.append((label, base["median"], stats["median"], ratio, status))
+	return rows
@@ -0,0 +1,113 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Collision filtering of the physics world, shared by the game and the episode runner. Every
+ Bullet body belongs to one collision group (the bit of its into collide mask), and a matrix of the group pairs
+ that collide is given to Bullet's broadphase filter callback ("groups-mask" filter algorithm), so the pairs
+ that do not matter to the game (NPCs against each other or against the buildings, the static bodies against
+ each other) are dropped when the broadphase finds them, before the narrowphase ever tests them.
+ Bullet also reports the contacts of the bodies that ask for it (e.g. the car): every new contact point is
+ queued as an event, and HitEvents keeps the ones against a group (e.g. the NPCs) until the game logic drains
+ them, so hits cost in proportion to the contacts instead of a test of every NPC every frame.
+"""
+from collections import deque
+from panda3d.core import BitMask32, EventQueue, loadPrcFileData
+
+# Read when a BulletWorld is created: its filter callback pairs bodies by the group matrix (setup_collision_filter)
+loadPrcFileData("", "bullet-filter-algorithm groups-mask")
+# New contact points of the bodies that notify collisions are sent as events (CONTACT_ADDED_EVENT)
+loadPrcFileData("", "bullet-enable-contact-events true")
+CONTACT_ADDED_EVENT = "bullet-contact-added"	# Parameters: the two nodes
+
+GROUND_GROUP = 0
+CAR_GROUP = 1
+NPC_GROUP = 2
+BUILDING_GROUP = 3
+GROUPS = (GROUND_GROUP, CAR_GROUP, NPC_GROUP, BUILDING_GROUP)
+
+# Group pairs whose bodies collide; every other pair (a group with itself included) is filtered out
+COLLIDING_GROUPS = (
+	(CAR_GROUP, GROUND_GROUP),
+	(CAR_GROUP, BUILDING_GROUP),
+	(CAR_GROUP, NPC_GROUP),			# Pedestrian hits
+	(NPC_GROUP, GROUND_GROUP),		# Keeps the NPCs standing on the street
+)
+
+
+def setup_collision_filter(world):
+	"""
+	Sets the group matrix of a new physics world.
+
+	Params:
+	 - world (BulletWorld): The world (created after this module was imported).
+	Returns: None
+	"""
+	for a in GROUPS:
+		for b in GROUPS:
+			world.setGroupCollisionFlag(a, b, False)
+	for a, b in COLLIDING_GROUPS:
+		world.setGroupCollisionFlag(a, b, True)
+
+
+def set_collision_group(node, group):
+	"""
+	Params:
+	 - node (BulletRigidBodyNode): A body (before it is attached to the world).
+	 - group (int): Its collision group (e.g. NPC_GROUP).
+	Returns: None
+	"""
+	node.setIntoCollideMask(BitMask32.bit(group))
+
+
+class HitEvents:
+	"""
+	The queue of a body's new contacts with the bodies of one collision group (e.g. the car hitting NPCs).
+	It is fed with Bullet's contact events: by the messenger in the game (accept CONTACT_ADDED_EVENT with
+	on_contact), or by poll where nothing else reads the event queue (the headless episodes).
+	"""
+	def __init__(self, body, group):
+		"""
+		Params:
+		 - body (BulletRigidBodyNode): The body whose contacts are watched (it is made to notify collisions).
+		 - group (int): The collision group of the bodies it can hit.
+		Returns: None
+		"""
+		self.body = body
+		self.mask = BitMask32.bit(group)
+		self.hits = deque()		# The hit bodies, oldest first
+		body.notifyCollisions(True)
+
+	def on_contact(self, node0, node1):
+		"""
+		Queues a contact event if it is a hit (CONTACT_ADDED_EVENT handler).
+
+		Params:
+		 - node0 (PandaNode): One body of the new contact.
+		 - node1 (PandaNode): The other body.
+		Returns: None
+		"""
+		other = node1 if node0 == self.body else node0 if node1 == self.body else None
+		if other is not None and not (other.getIntoCollideMask() & self.mask).isZero():
+			self.hits.append(other)
+
+	def poll(self):
+		"""
+		Reads every event waiting in Panda3D's global event queue, queueing the hits (other events are dropped).
+
+		Params: None
+		Returns: None
+		"""
+		queue = EventQueue.getGlobalEventQueue()
+		while not queue.isQueueEmpty():
+			event = queue.dequeueEvent()
+			if event.name == CONTACT_ADDED_EVENT:
+				self.on_contact(event.getParameter(0).getPtr(), event.getParameter(1).getPtr())
+
+	def drain(self):
+		"""
+		Params: None
+		Returns:
+		 - list: The bodies hit since the last drain, oldest first (the queue is emptied).
+		"""
+		hits = list(self.hits)
+		self.hits.clear()
+		return hits
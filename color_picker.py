@@ -0,0 +1,188 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: This module provides the garage color picker: a hue strip above a saturation/value
+ area, drawn by a fragment shader on a single quad. The picked color is computed from the texture
+ coordinates under the mouse, and the selection markers are drawn by the same shader from its inputs,
+ so picking a color only changes one shader input instead of creating or recoloring any nodes.
+"""
+import colorsys
+from panda3d.core import *
+
+# Layout of the quad in texture coordinates: the saturation/value area is at the bottom and the hue
+# strip at the top, with a transparent gap between them
+SV_TOP = 0.66
+HUE_BOTTOM = 0.76
+# Saturation and value given to a hue picked while the color has none (e.g. the default white), as in the
+# old rainbow grid, so that picking a hue always changes the color
+HUE_PICK_SATURATION = 0.9
+HUE_PICK_VALUE = 0.9
+
+PICKER_VERTEX = """
+#version 120
+uniform mat4 p3d_ModelViewProjectionMatrix;
+attribute vec4 p3d_Vertex;
+attribute vec2 p3d_MultiTexCoord0;
+varying vec2 uv;
+
+void main() {
+	gl_Position = p3d_ModelViewProjectionMatrix * p3d_Vertex;
+	uv = p3d_MultiTexCoord0;
+}
+"""
+
+PICKER_FRAGMENT = """
+#version 120
+uniform vec3 selection;		// hue, saturation, value
+uniform vec2 layout;		// top of the saturation/value area, bottom of the hue strip
+uniform vec2 size;			// size of the quad on screen, to keep the markers round
+varying vec2 uv;
+
+vec3 hsv_to_rgb(vec3 c) {
+	vec3 p = abs(fract(c.xxx + vec3(0.0, 2.0 / 3.0, 1.0 / 3.0)) * 6.0 - 3.0);
+	return c.z * mix(vec3(1.0), clamp(p - 1.0, 0.0, 1.0), c.y);
+}
+
+void main() {
+	vec3 color;
+	float d;
+	if (uv.y >= layout.y) {
+		// Hue strip, marked with a bar at the selected hue
+		color = hsv_to_rgb(vec3(uv.x, 1.0, 1.0));
+		d = abs(uv.x - selection.x) * size.x;
+		if (d < 0.006) color = vec3(1.0);
+		else if (d < 0.009) color = vec3(0.0);
+	} else if (uv.y <= layout.x) {
+		// Saturation (left to right) and value (bottom to top) of the selected hue, marked with a ring
+		vec2 sv = vec2(uv.x, uv.y / layout.x);
+		color = hsv_to_rgb(vec3(selection.x, sv));
+		d = length((sv - selection.yz) * size * vec2(1.0, layout.x));
+		if (d > 0.016 && d < 0.022) color = vec3(1.0);
+		else if (d >= 0.022 && d < 0.026) color = vec3(0.0);
+	} else {
+		discard;
+	}
+	gl_FragColor = vec4(color, 1.0);
+}
+"""
+
+
+class ColorPicker:
+	"""
+	A hue strip and a saturation/value area drawn on one quad of aspect2d.
+	"""
+	def __init__(self, parent, frame, color, command):
+		"""
+		Params:
+		 - parent (NodePath): The 2D node to attach the picker to (e.g. aspect2d).
+		 - frame (tuple[float, float, float, float]): (left, right, bottom, top) of the picker in the parent's space.
+		 - color (Vec4): The initial RGBA color to select.
+		 - command (callable): Called with the picked RGBA color (Vec4) whenever the selection changes.
+		Returns: None
+		"""
+		self.command = command
+		self.dragging = None	# "hue" or "sv" while the mouse button is held
+
+		maker = CardMaker("color_picker")
+		maker.setFrame(0, 1, 0, 1)
+		maker.setUvRange((0, 0), (1, 1))
+		left, right, bottom, top = frame
+		self.quad = parent.attachNewNode(maker.generate())
+		self.quad.setPos(left, 0, bottom)
+		self.quad.setScale(right - left, 1, top - bottom)
+		self.quad.setShader(Shader.make(Shader.SL_GLSL, vertex=PICKER_VERTEX, fragment=PICKER_FRAGMENT))
+		self.quad.setShaderInput("layout", Vec2(SV_TOP, HUE_BOTTOM))
+		self.quad.setShaderInput("size", Vec2(right - left, top - bottom))
+
+		self.hue, self.saturation, self.value = colorsys.rgb_to_hsv(color[0], color[1], color[2])
+		self.update_selection()
+
+	def get_color(self):
+		"""
+		Returns:
+		 - Vec4: The selected RGBA color.
+		"""
+		return Vec4(*colorsys.hsv_to_rgb(self.hue, self.saturation, self.value), 1)
+
+	def update_selection(self):
+		"""
+		Moves the markers to the selected color.
+
+		Params: None
+		Returns: None
+		"""
+		self.quad.setShaderInput("selection", Vec3(self.hue, self.saturation, self.value))
+
+	def uv_at(self, mouse_watcher):
+		"""
+		Params:
+		 - mouse_watcher (MouseWatcher): The window's mouse watcher (base.mouseWatcherNode).
+		Returns:
+		 - tuple[float, float] or None: The texture coordinates of the quad under the mouse (None if the mouse is outside the window).
+		"""
+		if not mouse_watcher.hasMouse():
+			return None
+		mouse = mouse_watcher.getMouse()
+		point = self.quad.getRelativePoint(self.quad.getTop(), Point3(mouse.getX(), 0, mouse.getY()))
+		return point.getX(), point.getZ()
+
+	def press(self, mouse_watcher):
+		"""
+		Starts picking if the mouse is over the hue strip or the saturation/value area.
+
+		Params:
+		 - mouse_watcher (MouseWatcher): The window's mouse watcher.
+		Returns:
+		 - bool: True if the press was on the picker.
+		"""
+		uv = self.uv_at(mouse_watcher)
+		if uv is None or not (0 <= uv[0] <= 1 and 0 <= uv[1] <= 1):
+			return False
+		if uv[1] >= HUE_BOTTOM:
+			self.dragging = "hue"
+		elif uv[1] <= SV_TOP:
+			self.dragging = "sv"
+		else:
+			return False
+		self.drag(mouse_watcher)
+		return True
+
+	def drag(self, mouse_watcher):
+		"""
+		Picks the color under the mouse while the button is held (the selection is clamped to the picker's area).
+
+		Params:
+		 - mouse_watcher (MouseWatcher): The window's mouse watcher.
+		Returns: None
+		"""
+		uv = self.uv_at(mouse_watcher)
+		if uv is None or self.dragging is None:
+			return
+		u = min(1.0, max(0.0, uv[0]))
+		if self.dragging == "hue":
+			hue, saturation, value = u, self.saturation, self.value
+			if saturation == 0 or value == 0:	# A grey: any hue would leave it unchanged
+				saturation, value = HUE_PICK_SATURATION, HUE_PICK_VALUE
+		else:
+			hue, saturation, value = self.hue, u, min(1.0, max(0.0, uv[1] / SV_TOP))
+		if (hue, saturation, value) != (self.hue, self.saturation, self.value):
+			self.hue, self.saturation, self.value = hue, saturation, value
+			self.update_selection()
+			self.command(self.get_color())
+
+	def release(self):
+		"""
+		Stops picking.
+
+		Params: None
+		Returns: None
+		"""
+		self.dragging = None
+
+	def destroy(self):
+		"""
+		Removes the picker from the scene graph (called by the screen cleanup).
+
+		Params: None
+		Returns: None
+		"""
+		self.quad.removeNode()
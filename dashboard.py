@@ -0,0 +1,154 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: This module provides a small change-tracking model for the gameplay dashboard.
+ Every widget is bound to a value, and the widget is only re-rendered when that value changes
+ (e.g. the whole seconds left on the timer, or the grid cell the car is in), so the dashboard task
+ does not regenerate text geometry or re-rotate gauge needles on frames where nothing moved.
+"""
+
+_UNSET = object()   # Sentinel so that the first update always renders
+
+
+def ordinal(n):
+	"""
+	Convert number to ordinal (1st, 2nd, etc.)
+
+	Params:
+	 - n (int): The integer to convert.
+	Returns:
+	 - str: The ordinal string (e.g., "1st", "2nd").
+	"""
+	if 11 <= (n % 100) <= 13:
+		suffix = 'th'
+	else:
+		suffix = ['th', 'st', 'nd', 'rd', 'th'][min(n % 10, 4)]
+	return str(n) + suffix
+
+
+class BoundText:
+	"""
+	A text widget bound to a value. The widget's text is rebuilt through the
+	formatter only when the bound value changes.
+	"""
+	def __init__(self, widget, formatter):
+		"""
+		Params:
+		 - widget (OnscreenText): Any object with a setText(str) method.
+		 - formatter (callable): Converts the bound value into the text to display.
+		Returns: None
+		"""
+		self.widget = widget
+		self.formatter = formatter
+		self.value = _UNSET
+		self.render_count = 0
+
+	def update(self, value):
+		"""
+		Re-render the widget if the bound value changed since the last update.
+
+		Params:
+		 - value (hashable): The new bound value.
+		Returns:
+		 - bool: True if the widget was re-rendered, False otherwise.
+		"""
+		if value == self.value:
+			return False
+		self.value = value
+		self.widget.setText(self.formatter(value))
+		self.render_count += 1
+		return True
+
+
+class BoundNeedle:
+	"""
+	A gauge needle pivot bound to an angle. The pivot is only rotated once the
+	angle has moved past a threshold from the last rendered angle.
+	"""
+	def __init__(self, pivot, threshold):
+		"""
+		Params:
+		 - pivot (NodePath): The pivot node the needle rotates around.
+		 - threshold (float): Minimum change in degrees before the pivot is rotated again.
+		Returns: None
+		"""
+		self.pivot = pivot
+		self.threshold = threshold
+		self.value = _UNSET
+		self.render_count = 0
+
+	def update(self, angle):
+		"""
+		Rotate the pivot if the angle moved past the threshold.
+
+		Params:
+		 - angle (float): The new needle angle in degrees.
+		Returns:
+		 - bool: True if the pivot was rotated, False otherwise.
+		"""
+		if self.value is not _UNSET and abs(angle - self.value) < self.threshold:
+			return False
+		self.value = angle
+		self.pivot.setR(angle)
+		self.render_count += 1
+		return True
+
+
+class DashboardModel:
+	"""
+	Holds the bound widgets of the dashboard by name and forwards new values to them.
+	"""
+	def __init__(self):
+		"""
+		Initializes an empty dashboard model.
+
+		Params: None
+		Returns: None
+		"""
+		self.widgets = {}
+
+	def bind_text(self, name, widget, formatter):
+		"""
+		Bind a text widget to a named value.
+
+		Params:
+		 - name (str): The name of the value (e.g. "timer").
+		 - widget (OnscreenText): Any object with a setText(str) method.
+		 - formatter (callable): Converts the bound value into the text to display.
+		Returns:
+		 - BoundText: The created binding.
+		"""
+		self.widgets[name] = BoundText(widget, formatter)
+		return self.widgets[name]
+
+	def bind_needle(self, name, pivot, threshold):
+		"""
+		Bind a gauge needle pivot to a named angle.
+
+		Params:
+		 - name (str): The name of the value (e.g. "speed").
+		 - pivot (NodePath): The pivot node the needle rotates around.
+		 - threshold (float): Minimum change in degrees before the pivot is rotated again.
+		Returns:
+		 - BoundNeedle: The created binding.
+		"""
+		self.widgets[name] = BoundNeedle(pivot, threshold)
+		return self.widgets[name]
+
+	def set(self, name, value):
+		"""
+		Push a new value to the widget bound to `name`.
+
+		Params:
+		 - name (str): The name of the value.
+		 - value: The new bound value.
+		Returns:
+		 - bool: True if the widget was re-rendered, False otherwise.
+		"""
+		return self.widgets[name].update(value)
+
+	def render_counts(self):
+		"""
+		Returns:
+		 - dict: Mapping of widget name to the number of times it has been re-rendered.
+		"""
+		return {name: widget.render_count for name, widget in self.widgets.items()}
@@ -0,0 +1,445 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: The order dispatch of fleet mode. Every delivery house receives orders as a Poisson stream;
+ pending orders wait in an indexed priority queue ordered by deadline (then by reward), and every dispatch
+ tick drops the expired orders and assigns the most urgent ones to the idle vehicle that reaches them
+ soonest over the road network. The dispatcher keeps the dispatch latency (time from order to assignment)
+ and the throughput.
+
+Usage:
+	python dispatch.py [--vehicles 200] [--orders-per-second 2000] [--seconds 120]     (headless dispatch load test)
+"""
+import argparse
+import heapq
+import time
+from collections import deque
+import numpy as np
+from profiler import percentile
+
+REWARDS = [20, 30, 40]	# Same rewards as the player's deliveries
+
+
+class IndexedPriorityQueue:
+	"""
+	A binary min-heap of items with an index from item to heap position, so that any item
+	can be removed or given a new key in O(log n).
+	"""
+	def __init__(self):
+		self.heap = []		# [key, item] entries
+		self.position = {}	# item -> index of its entry in the heap
+
+	def __len__(self):
+		return len(self.heap)
+
+	def __contains__(self, item):
+		return item in self.position
+
+	def push(self, item, key):
+		"""
+		Adds an item, or changes its key if it is already queued.
+
+		Params:
+		 - item (hashable): The item (e.g. an order id).
+		 - key (tuple): The priority; the smallest key is popped first.
+		Returns: None
+		"""
+		if item in self.position:
+			self.update(item, key)
+			return
+		self.heap.append([key, item])
+		self.position[item] = len(self.heap) - 1
+		self._sift_up(len(self.heap) - 1)
+
+	def peek(self):
+		"""
+		Returns:
+		 - tuple: (item, key) of the smallest key (the queue must not be empty).
+		"""
+		key, item = self.heap[0]
+		return item, key
+
+	def pop(self):
+		"""
+		Removes the item with the smallest key.
+
+		Params: None
+		Returns:
+		 - tuple: (item, key).
+		"""
+		item, key = self.peek()
+		self.remove(item)
+		return item, key
+
+	def remove(self, item):
+		"""
+		Removes an item.
+
+		Params:
+		 - item (hashable): A queued item.
+		Returns: None
+		"""
+		pos = self.position.pop(item)
+		last = self.heap.pop()
+		if pos < len(self.heap):
+			self.heap[pos] = last
+			self.position[last[1]] = pos
+			self._sift_up(pos)
+			self._sift_down(self.position[last[1]])
+
+	def update(self, item, key):
+		"""
+		Changes the key of a queued item.
+
+		Params:
+		 - item (hashable): A queued item.
+		 - key (tuple): The new priority.
+		Returns: None
+		"""
+		pos = self.position[item]
+		self.heap[pos][0] = key
+		self._sift_up(pos)
+		self._sift_down(self.position[item])
+
+	def _sift_up(self, pos):
+		heap, position = self.heap, self.position
+		entry = heap[pos]
+		while pos:
+			parent = (pos - 1) >> 1
+			if heap[parent][0] <= entry[0]:
+				break
+			heap[pos] = heap[parent]
+			position[heap[pos][1]] = pos
+			pos = parent
+		heap[pos] = entry
+		position[entry[1]] = pos
+
+	def _sift_down(self, pos):
+		heap, position = self.heap, self.position
+		size = len(heap)
+		entry = heap[pos]
+		while True:
+			child = 2 * pos + 1
+			if child >= size:
+				break
+			if child + 1 < size and heap[child + 1][0] < heap[child][0]:
+				child += 1
+			if entry[0] <= heap[child][0]:
+				break
+			heap[pos] = heap[child]
+			position[heap[pos][1]] = pos
+			pos = child
+		heap[pos] = entry
+		position[entry[1]] = pos
+
+
+class OrderStream:
+	"""
+	Generates orders for every delivery house as independent Poisson processes.
+	"""
+	def __init__(self, houses, rate, rng, start=0.0, deadline_range=(60, 180)):
+		"""
+		Params:
+		 - houses (dict): House label -> (row, column) of its intersection (see fleet.delivery_nodes).
+		 - rate (float): Orders per second per house.
+		 - rng (random.Random): The random source.
+		 - start (float): The simulation time at which the streams start.
+		 - deadline_range (tuple[float, float]): The range of the seconds an order may take to be delivered.
+		Returns: None
+		"""
+		self.houses = houses
+		self.rate = rate
+		self.rng = rng
+		self.deadline_range = deadline_range
+		self.next_id = 0
+		self.arrivals = [(start + rng.expovariate(rate), label) for label in houses]	# Heap of (next arrival time, house)
+		heapq.heapify(self.arrivals)
+
+	def poll(self, now):
+		"""
+		Returns every order that arrived up to `now`.
+
+		Params:
+		 - now (float): The current simulation time in seconds.
+		Returns:
+		 - list[dict]: The new orders (id, house, node, created, deadline, reward), oldest first.
+		"""
+		orders = []
+		arrivals = self.arrivals
+		while arrivals and arrivals[0][0] <= now:
+			created, label = arrivals[0]
+			heapq.heapreplace(arrivals, (created + self.rng.expovariate(self.rate), label))
+			orders.append({
+				"id": self.next_id,
+				"house": label,
+				"node": self.houses[label],
+				"created": created,
+				"deadline": created + self.rng.uniform(*self.deadline_range),
+				"reward": self.rng.choice(REWARDS),
+			})
+			self.next_id += 1
+		return orders
+
+
+class Dispatcher:
+	"""
+	Matches pending orders to idle vehicles by road-network travel time, most urgent orders first.
+	"""
+	def __init__(self, router, block_length, max_scan=256, window=10000):
+		"""
+		Params:
+		 - router (RoutingEngine): The shared routing engine.
+		 - block_length (float): The world units between adjacent intersections (converts route costs to seconds).
+		 - max_scan (int): The maximum number of orders examined per tick (bounds the cost of a tick).
+		 - window (int): The number of recent latency samples kept for the statistics.
+		Returns: None
+		"""
+		self.router = router
+		self.block_length = block_length
+		self.max_scan = max_scan
+		self.cols = router.cols
+		self.graph = router.grid.road_graph(router.road_types)	# Node ids are the intersection indices
+		self.on_assign = None	# Called with (vehicle, order) for every assignment
+
+		# Travel times in seconds from the intersections where vehicles went idle, filled by ensure_times:
+		# source intersection index -> times to every intersection
+		self.times = {}
+		self.version = router.grid.version	# The map version of the travel times
+
+		self.queue = IndexedPriorityQueue()	# order id -> (deadline, -reward)
+		self.orders = {}		# order id -> pending order
+		self.idle = {}			# vehicle -> intersection index
+		self.active = {}		# vehicle -> order being delivered
+		self.now = 0.0
+		self.start = None
+
+		self.received = 0
+		self.assigned = 0
+		self.delivered = 0
+		self.on_time = 0
+		self.expired = 0
+		self.latency = deque(maxlen=window)		# Seconds from order to assignment
+		self.tick_time = deque(maxlen=window)	# Wall seconds per tick
+
+	def submit(self, orders):
+		"""
+		Queues new orders.
+
+		Params:
+		 - orders (list[dict]): Orders from an OrderStream.
+		Returns: None
+		"""
+		for order in orders:
+			self.orders[order["id"]] = order
+			self.queue.push(order["id"], (order["deadline"], -order["reward"]))
+		self.received += len(orders)
+
+	def cancel(self, order_id):
+		"""
+		Removes a pending order.
+
+		Params:
+		 - order_id (int): The order id.
+		Returns: None
+		"""
+		if order_id in self.queue:
+			self.queue.remove(order_id)
+			del self.orders[order_id]
+
+	def vehicle_idle(self, vehicle, node):
+		"""
+		Makes a vehicle available for the next tick.
+
+		Params:
+		 - vehicle (int): The vehicle number.
+		 - node (tuple[int, int]): The (row, column) of the vehicle's intersection.
+		Returns: None
+		"""
+		self.idle[vehicle] = node[0] * self.cols + node[1]
+
+	def vehicle_delivered(self, vehicle):
+		"""
+		Records that a vehicle delivered its order.
+
+		Params:
+		 - vehicle (int): The vehicle number.
+		Returns: None
+		"""
+		order = self.active.pop(vehicle, None)
+		if order:
+			self.delivered += 1
+			if self.now <= order["deadline"]:
+				self.on_time += 1
+
+	def ensure_times(self, sources):
+		"""
+		Computes the travel times from the given intersections if they are not known yet (all of them again
+		after the map's version changed).
+
+		Params:
+		 - sources (numpy.ndarray): Intersection indices.
+		Returns: None
+		"""
+		if self.version != self.router.grid.version:
+			self.times.clear()
+			self.version = self.router.grid.version
+		for source in np.unique(sources).tolist():
+			if source not in self.times:
+				self.times[source] = self.graph.travel_times(source) * self.block_length
+
+	def tick(self, now, orders=()):
+		"""
+		One dispatch step: queues the new orders, drops the expired ones and assigns the most urgent
+		orders to the idle vehicles that reach them soonest. Orders that no idle vehicle can reach
+		before their deadline wait for the next tick.
+
+		Params:
+		 - now (float): The current simulation time in seconds.
+		 - orders (list[dict]): Orders that arrived since the previous tick.
+		Returns:
+		 - list[tuple]: The (vehicle, order) assignments of this tick.
+		"""
+		started = time.perf_counter()
+		if self.start is None:
+			self.start = now
+		self.now = now
+		self.submit(orders)
+
+		# Drop the orders whose deadline has passed (they are at the top of the queue)
+		queue = self.queue
+		while queue and queue.peek()[1][0] < now:
+			order_id, _ = queue.pop()
+			del self.orders[order_id]
+			self.expired += 1
+
+		assignments = []
+		if self.idle and queue:
+			vehicles = np.fromiter(self.idle.keys(), dtype=np.int64, count=len(self.idle))
+			nodes = np.fromiter(self.idle.values(), dtype=np.int64, count=len(self.idle))
+			self.ensure_times(nodes)
+			times = np.stack([self.times[node] for node in nodes.tolist()])	# Idle vehicle x intersection
+			free = np.ones(len(vehicles), dtype=bool)
+			deferred = []
+			for _ in range(min(self.max_scan, len(queue))):
+				order_id, key = queue.pop()
+				order = self.orders[order_id]
+				node = order["node"][0] * self.cols + order["node"][1]
+				arrival = np.where(free, times[:, node], np.inf)
+				best = int(np.argmin(arrival))
+				if now + arrival[best] > order["deadline"]:
+					deferred.append((order_id, key))	# No idle vehicle makes it in time
+					continue
+				free[best] = False
+				vehicle = int(vehicles[best])
+				del self.idle[vehicle]
+				del self.orders[order_id]
+				self.active[vehicle] = order
+				self.latency.append(now - order["created"])
+				assignments.append((vehicle, order))
+				if not free.any():
+					break
+			for order_id, key in deferred:
+				queue.push(order_id, key)
+		self.assigned += len(assignments)
+
+		if self.on_assign:
+			for vehicle, order in assignments:
+				self.on_assign(vehicle, order)
+		self.tick_time.append(time.perf_counter() - started)
+		return assignments
+
+	def stats(self):
+		"""
+		Returns:
+		 - dict: Order counts, pending orders, idle vehicles, dispatch latency percentiles (seconds),
+				 tick time percentiles (milliseconds) and throughput (per simulated second).
+		"""
+		latency = sorted(self.latency)
+		ticks = sorted(self.tick_time)
+		elapsed = max(self.now - (self.start or 0), 1e-9)
+		return {
+			"received": self.received,
+			"assigned": self.assigned,
+			"delivered": self.delivered,
+			"on_time": self.on_time,
+			"expired": self.expired,
+			"pending": len(self.queue),
+			"idle_vehicles": len(self.idle),
+			"latency_p50": percentile(latency, 0.50),
+			"latency_p95": percentile(latency, 0.95),
+			"tick_p50_ms": percentile(ticks, 0.50) * 1000,
+			"tick_p95_ms": percentile(ticks, 0.95) * 1000,
+			"received_per_s": self.received / elapsed,
+			"assigned_per_s": self.assigned / elapsed,
+			"delivered_per_s": self.delivered / elapsed,
+		}
+
+
+def connect_fleet(dispatcher, fleet):
+	"""
+	Lets a dispatcher drive a fleet: assignments are queued on the vehicles, arrivals are reported
+	back as deliveries, and vehicles with nothing left to do become idle.
+
+	Params:
+	 - dispatcher (Dispatcher): The dispatcher.
+	 - fleet (Fleet): The fleet.
+	Returns: None
+	"""
+	dispatcher.on_assign = lambda v, order: fleet.assign(v, order["node"])
+	fleet.on_delivered = lambda v, node: dispatcher.vehicle_delivered(v)
+	fleet.on_idle = lambda v: dispatcher.vehicle_idle(v, fleet.node_of(v))
+	for v in range(fleet.count):
+		if v not in dispatcher.active:
+			dispatcher.vehicle_idle(v, fleet.node_of(v))
+
+
+def main():
+	"""
+	Headless load test: a fleet on a generated map fed by Poisson order streams.
+
+	Params: None
+	Returns: None
+	"""
+	import random
+	import grid_map
+	from fleet import Fleet, delivery_nodes
+	from main import NUM_LOCATIONS, ROAD_TYPES
+	from routing import RoutingEngine
+
+	parser = argparse.ArgumentParser(description="Run a headless Delivery Deluxe dispatch load test.")
+	parser.add_argument("--vehicles", type=int, default=200, help="number of vehicles (default 200)")
+	parser.add_argument("--orders-per-second", type=float, default=2000, help="orders per second over all houses (default 2000)")
+	parser.add_argument("--seconds", type=float, default=120, help="simulated seconds (default 120)")
+	parser.add_argument("--size", type=int, default=20, help="map rows and columns (default 20)")
+	parser.add_argument("--seed", type=int, default=0, help="random seed (default 0)")
+	args = parser.parse_args()
+
+	rng = random.Random(args.seed)
+	grid = grid_map.generate_map(args.size, args.size, NUM_LOCATIONS, ROAD_TYPES, rng)
+	router = RoutingEngine(grid, ROAD_TYPES)
+	houses = delivery_nodes(grid)
+	fleet = Fleet(router, args.vehicles, 60, (-8, -34), rng)	# The game's road spacing and offsets
+	stream = OrderStream(houses, args.orders_per_second / len(houses), rng)
+	dispatcher = Dispatcher(router, 60)
+	connect_fleet(dispatcher, fleet)
+
+	dt = 1 / 30
+	steps = int(args.seconds / dt)
+	started = time.perf_counter()
+	for i in range(steps):
+		now = (i + 1) * dt
+		dispatcher.tick(now, stream.poll(now))
+		fleet.step(dt)
+	wall = time.perf_counter() - started
+
+	stats = dispatcher.stats()
+	print(f"{args.vehicles} vehicles, {args.orders_per_second:g} orders/s, {args.seconds:g} s simulated in {wall:.1f} s")
+	print(f"  orders: {stats['received']} received, {stats['assigned']} assigned, {stats['delivered']} delivered "
+		  f"({stats['on_time']} on time), {stats['expired']} expired, {stats['pending']} pending")
+	print(f"  dispatch latency: p50 {stats['latency_p50']:.2f} s, p95 {stats['latency_p95']:.2f} s")
+	print(f"  tick time: p50 {stats['tick_p50_ms']:.3f} ms, p95 {stats['tick_p95_ms']:.3f} ms")
+	print(f"  throughput: {stats['received_per_s']:.0f} received/s, {stats['assigned_per_s']:.1f} assigned/s, "
+		  f"{stats['delivered_per_s']:.1f} delivered/s, {stats['received'] / wall:.0f} orders processed per wall second")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,532 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Parallel episode runner for balancing sweeps. An episode is a headless game without
+ rendering: one Bullet world with the ground, the car and the walking NPCs, a bot driver that takes the
+ fastest route to each delivery (refuelling when low), and the game's rules (rules.py) for fuel, fines,
+ ratings and winning or losing. Episodes run across a multiprocessing pool, one Bullet world per worker
+ process, and every worker receives the map once, read-only (or maps the same map file, sharing its pages,
+ when the map is opened from a file written by mapfile.py). The results are aggregated per configuration:
+ win rate, fuel used, fines and rating.
+
+Usage:
+	python episodes.py --vehicle "Porsche 992" --set mass=600,800 --set fuel_consumption=0.001,0.002 --episodes 32
+	python episodes.py --set road_speed_scale=0.8,1.0,1.2 --set time_base=35,45 --processes 8 --out sweep.json
+	python episodes.py --map city.ddm --episodes 64
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import time
+from math import atan2, cos, degrees, radians, sin
+from panda3d.bullet import BulletBoxShape, BulletCapsuleShape, BulletPlaneShape, BulletRigidBodyNode, BulletWorld
+from panda3d.core import NodePath, Point3, TransformState, Vec3
+import grid_map
+import rules
+from mapfile import MappedGrid
+from collision import CAR_GROUP, GROUND_GROUP, NPC_GROUP, HitEvents, set_collision_group, setup_collision_filter
+from routing import RoutingEngine
+from spatial import SpatialIndex
+
+SPACING = 60			# buildings_spacing of the game
+ROAD_ORIGIN = (-8, -34)	# road_offset_start_x / _y of the game
+BUILDING_ORIGIN = (-37, -37)	# building_offset_start_x / _y of the game
+FRAME_DT = 1 / 60		# The game's rules count fuel per frame, so episodes run at a fixed 60 fps
+VEHICLE_PARAMS = ("mass", "acceleration", "handling_coeff", "fuel_consumption")
+EPISODE_PARAMS = ("road_speed_scale", "time_base", "time_scale", "driver_speed", "refuel_below")
+
+_grid = None	# The map of this worker process (set by init_worker)
+_world = None	# The Bullet world of this worker process
+
+
+def init_worker(grid):
+	"""
+	Pool initializer: stores the shared map and creates this process's Bullet world with the ground plane.
+
+	Params:
+	 - grid (ManhattanGrid): The map (read-only).
+	Returns: None
+	"""
+	global _grid, _world
+	_grid = grid
+	_world = BulletWorld()
+	_world.setGravity(Vec3(0, 0, -9.81))
+	setup_collision_filter(_world)
+	ground = BulletRigidBodyNode('Ground')
+	ground.addShape(BulletPlaneShape(Vec3(0, 0, 1), 0))
+	set_collision_group(ground, GROUND_GROUP)
+	NodePath(ground).setPos(0, 0, 1)
+	_world.attachRigidBody(ground)
+
+
+def make_config(vehicle, road_types, **overrides):
+	"""
+	Builds an episode configuration.
+
+	Params:
+	 - vehicle (dict): The vehicle model (see VEHICLE_MODELS in main.py).
+	 - road_types (dict): Road label -> speed limit (see ROAD_TYPES in main.py).
+	 - **overrides: Vehicle parameters (mass, acceleration, handling_coeff, fuel_consumption) and episode
+					parameters (road_speed_scale, time_base, time_scale, driver_speed, refuel_below).
+	Returns:
+	 - dict: The configuration, labelled with its overrides.
+	"""
+	config = {
+		"label": ",".join(f"{k}={v}" for k, v in overrides.items()) or "default",
+		"vehicle": {k: vehicle[k] for k in VEHICLE_PARAMS},
+		"road_types": dict(road_types),
+		"time_base": rules.DELIVERY_TIME_BASE,
+		"time_scale": rules.DELIVERY_TIME_SCALE,
+		"driver_speed": 0.9,	# Fraction of the speed limit the bot drives at (above 1 the bot speeds)
+		"refuel_below": 50,		# Fuel level at which the bot drives to a gas station
+	}
+	for key, value in overrides.items():
+		if key in VEHICLE_PARAMS:
+			config["vehicle"][key] = value
+		elif key == "road_speed_scale":
+			config["road_types"] = {label: speed * value for label, speed in road_types.items()}
+		elif key in EPISODE_PARAMS:
+			config[key] = value
+		else:
+			raise ValueError(f"Unknown parameter: {key}")
+	return config
+
+
+class Episode:
+	"""
+	One headless game played by a bot, following the same rules and frame order as the game.
+	"""
+	def __init__(self, grid, world, config, seed):
+		"""
+		Params:
+		 - grid (ManhattanGrid): The map.
+		 - world (BulletWorld): A Bullet world containing only the ground.
+		 - config (dict): The configuration (see make_config).
+		 - seed (int): The seed of the episode's random source (deliveries and NPCs).
+		Returns: None
+		"""
+		self.grid = grid
+		self.world = world
+		self.config = config
+		self.vehicle = config["vehicle"]
+		self.road_types = config["road_types"]
+		self.router = RoutingEngine(grid, self.road_types)
+		self.spatial = SpatialIndex(grid, self.road_types, SPACING, ROAD_ORIGIN, BUILDING_ORIGIN)
+		self.rng = random.Random(seed)
+		self.rows = grid.rows
+		self.cols = grid.cols
+		self.key_map = {"forward": False, "backward": False, "left": False, "right": False, "brake": False}
+
+		self.time = 0.0
+		self.fuel_level = 100.0
+		self.money = 30
+		self.total_delivery_count = 0
+		self.successful_delivery_count = 0
+		self.delivery_scores = []
+		self.speeding_timer = 0.0
+		self.last_fine_time = -rules.PEDESTRIAN_FINE_COOLDOWN
+		self.fuel_used = 0.0
+		self.fines = {"speeding": 0, "pedestrian_hit": 0}
+		self.fines_paid = 0
+		self.refuels = 0
+		self.route = []
+		self.heading_for = None		# "delivery" or "refuel"
+		self.stuck_time = 0.0
+		self.reverse_time = 0.0
+
+		self.gas_stations = [(min(i, self.rows - 2), min(j, self.cols - 2)) for i, j in sorted(grid.positions(grid_map.GAS_STATION))]
+		self.bodies = []
+		self.setup_vehicle()
+		self.setup_npcs(2 * self.rows)
+		self.start_new_delivery()
+
+	def setup_vehicle(self):
+		"""
+		Adds the car's rigid body, as in the game's setup_vehicle.
+
+		Params: None
+		Returns: None
+		"""
+		self.chassisNP = NodePath(BulletRigidBodyNode('Vehicle'))
+		self.chassisNP.node().addShape(BulletBoxShape(Vec3(0.7, 1.5, 0.5)), TransformState.makePos(Point3(0, 0, 0.5)))
+		self.chassisNP.setPos(0, -5, 1.0)
+		self.chassisNP.node().setMass(self.vehicle["mass"])
+		self.chassisNP.node().setDeactivationEnabled(False)
+		set_collision_group(self.chassisNP.node(), CAR_GROUP)
+		self.world.attachRigidBody(self.chassisNP.node())
+		self.hits = HitEvents(self.chassisNP.node(), NPC_GROUP)
+		self.bodies.append(self.chassisNP.node())
+
+	def setup_npcs(self, count):
+		"""
+		Adds the walking NPCs' rigid bodies, as in the game's setup_npcs.
+
+		Params:
+		 - count (int): The number of NPCs to attempt to create.
+		Returns: None
+		"""
+		self.npcs = []
+		for i in range(self.rows - 1):
+			for j in range(self.cols - 1):
+				if count < 0:
+					break
+				node = BulletRigidBodyNode(f'NPC_{i}')
+				node.addShape(BulletCapsuleShape(0.3, 1, 1))
+				node.setMass(1.0)
+				node.setDeactivationEnabled(False)
+				set_collision_group(node, NPC_GROUP)
+				np_np = NodePath(node)
+				np_np.setPos(ROAD_ORIGIN[0] + j * SPACING, ROAD_ORIGIN[1] + i * SPACING, 0.5)
+				self.world.attachRigidBody(node)
+				self.bodies.append(node)
+				self.npcs.append({
+					'node': np_np,
+					'speed': self.rng.uniform(6.5, 10.5),
+					'direction': self.rng.choice([0, 90, 180, 270]),
+					'change_dir_timer': self.rng.uniform(20, 30)
+				})
+				count -= 1
+
+	def cleanup(self):
+		"""
+		Removes the episode's bodies from the Bullet world, leaving only the ground.
+
+		Params: None
+		Returns: None
+		"""
+		for body in self.bodies:
+			self.world.removeRigidBody(body)
+		self.bodies = []
+
+	def car_cell(self):
+		"""
+		Returns:
+		 - tuple[int, int]: The (row, column) of the intersection the car is at, as the game computes it.
+		"""
+		pos = self.chassisNP.getPos()
+		return self.spatial.cell_of(pos.getX(), pos.getY())
+
+	def start_new_delivery(self):
+		"""
+		Starts a new delivery, as in the game's start_new_delivery, and routes the bot to it.
+
+		Params: None
+		Returns: None
+		"""
+		self.delivery_target = rules.pick_delivery_target(self.grid, self.rng)
+		self.delivery_time_given = rules.delivery_time_given(self.delivery_target, self.car_cell(), self.rows, self.cols,
+															 self.config["time_base"], self.config["time_scale"])
+		self.delivery_time_left = self.delivery_time_given
+		self.delivery_reward = self.rng.choice(rules.DELIVERY_REWARDS)
+		self.total_delivery_count += 1
+		self.plan()
+
+	def plan(self):
+		"""
+		Routes the bot to the nearest gas station when the fuel is low, otherwise to the delivery target.
+
+		Params: None
+		Returns: None
+		"""
+		cell = self.car_cell()
+		if self.fuel_level < self.config["refuel_below"] and self.money > 0 and self.gas_stations:
+			routes = [self.router.cache.get(cell, station) for station in self.gas_stations]
+			routes = [(route, time) for route, time in routes if route]
+			if routes:
+				self.route = min(routes, key=lambda found: found[1])[0][1:]	# The car is already at the first intersection
+				self.heading_for = "refuel"
+				return
+		self.route = self.router.route(cell, rules.delivery_cell(self.delivery_target, self.rows, self.cols))[1:]
+		self.heading_for = "delivery"
+
+	def drive_bot(self, speed):
+		"""
+		Sets the controls for this frame: steer towards the next intersection of the route, keep to the
+		bot's share of the speed limit, brake before sharp turns, and back up when stuck.
+
+		Params:
+		 - speed (float): The car's current speed.
+		Returns: None
+		"""
+		for key in self.key_map:
+			self.key_map[key] = False
+		if self.reverse_time > 0:
+			self.reverse_time -= FRAME_DT
+			self.key_map["backward"] = True
+			return
+
+		pos = self.chassisNP.getPos()
+		while len(self.route) > 1:
+			r, c = self.route[0]
+			if (pos.getX() - ROAD_ORIGIN[0] - c * SPACING) ** 2 + (pos.getY() - ROAD_ORIGIN[1] - r * SPACING) ** 2 > 100:
+				break
+			self.route.pop(0)
+		if not self.route:
+			return
+		r, c = self.route[0]
+		dx = ROAD_ORIGIN[0] + c * SPACING - pos.getX()
+		dy = ROAD_ORIGIN[1] + r * SPACING - pos.getY()
+		diff = (degrees(atan2(-dx, dy)) - self.chassisNP.getH() + 180) % 360 - 180
+
+		cell = self.car_cell()
+		limit = self.spatial.speed_limit(cell) or 15
+		target_speed = limit * self.config["driver_speed"]
+		if abs(diff) > 20:
+			target_speed = min(target_speed, 5)
+		if abs(diff) > 3:
+			self.key_map["left" if diff > 0 else "right"] = True
+		if speed > target_speed + 1:
+			self.key_map["brake"] = True
+		elif speed < target_speed and (abs(diff) < 45 or speed < 3):	# Creep forward to turn sharply
+			self.key_map["forward"] = True
+
+		# Back up for a second after 3 seconds without moving
+		self.stuck_time = self.stuck_time + FRAME_DT if speed < 0.5 else 0.0
+		if self.stuck_time > 3:
+			self.stuck_time = 0.0
+			self.reverse_time = 1.0
+
+	def step(self):
+		"""
+		Plays one frame: physics, the bot's controls, NPCs, pedestrian fines, fuel, speeding fines,
+		the delivery timer and the bot's deliveries and refuels.
+
+		Params: None
+		Returns:
+		 - str or None: "win" or "loss" when the episode ended, otherwise None.
+		"""
+		dt = FRAME_DT
+		self.time += dt
+		self.world.doPhysics(dt, 10, 1.0 / 180.0)
+
+		# update: controls, NPCs and pedestrian hits
+		self.drive_bot(self.chassisNP.node().getLinearVelocity().length())
+		if self.fuel_level <= 0:
+			self.key_map["forward"] = False
+			self.key_map["backward"] = False
+		speed = rules.drive(self.chassisNP, self.key_map, self.vehicle, dt)
+		for npc in self.npcs:
+			npc['change_dir_timer'] -= dt
+			if npc['change_dir_timer'] <= 0:
+				npc['direction'] = self.rng.uniform(0, 360)
+				npc['change_dir_timer'] = self.rng.uniform(2, 5)
+			rad = radians(npc['direction'])
+			npc['node'].node().setLinearVelocity(Vec3(sin(rad), cos(rad), 0) * npc['speed'])
+		self.hits.poll()	# No event manager here: the contact events are read from the queue directly
+		if self.hits.drain() and self.time - self.last_fine_time > rules.PEDESTRIAN_FINE_COOLDOWN:
+			self.fine("pedestrian_hit", rules.PEDESTRIAN_FINE)
+			self.last_fine_time = self.time
+
+		# update_dashboard: fuel
+		used = rules.fuel_used(self.chassisNP.node().getLinearVelocity().length(), self.vehicle["fuel_consumption"])
+		self.fuel_used += min(used, self.fuel_level)
+		self.fuel_level = max(0, self.fuel_level - used)
+		if self.heading_for == "delivery" and self.fuel_level < self.config["refuel_below"] <= self.fuel_level + used:
+			self.plan()		# The fuel just got low: head for a gas station
+
+		# handle_speeding
+		cell = self.car_cell()
+		limit = self.spatial.speed_limit(cell)
+		if limit is not None:
+			if self.chassisNP.node().getLinearVelocity().length() > limit:
+				self.speeding_timer += dt
+				if self.speeding_timer >= rules.SPEEDING_GRACE:
+					self.fine("speeding", rules.SPEEDING_FINE)
+					self.speeding_timer = 0.0
+			else:
+				self.speeding_timer = 0.0
+
+		# update_delivery
+		self.delivery_time_left -= dt
+		if rules.is_game_lost(self.fuel_level, self.total_delivery_count - self.successful_delivery_count, self.money):
+			return "loss"
+		if self.delivery_time_left <= 0:
+			self.delivery_scores.append(0)
+			self.start_new_delivery()
+
+		# The bot's "C" and "V" keys
+		if self.heading_for == "refuel" and self.spatial.can_refuel(cell):
+			self.refuels += 1
+			_, self.fuel_level, self.money = rules.refuel(self.fuel_level, self.money)
+			self.plan()
+		elif rules.at_target(cell, self.delivery_target):
+			if self.successful_delivery_count >= rules.WIN_DELIVERIES - 1:
+				return "win"
+			self.money += self.delivery_reward
+			self.successful_delivery_count += 1
+			self.delivery_scores.append(rules.rating(self.delivery_time_left, self.delivery_time_given))
+			self.start_new_delivery()
+		elif len(self.route) <= 1 and speed < 1:
+			self.plan()		# Reached the end of the route without arriving (e.g. pushed off it)
+		return None
+
+	def fine(self, reason, amount):
+		"""
+		Params:
+		 - reason (str): "speeding" or "pedestrian_hit".
+		 - amount (float): The fine.
+		Returns: None
+		"""
+		self.money -= amount
+		self.fines[reason] += 1
+		self.fines_paid += amount
+
+	def run(self, max_seconds):
+		"""
+		Plays the episode until it is won, lost or runs out of time.
+
+		Params:
+		 - max_seconds (float): The maximum simulated seconds.
+		Returns:
+		 - dict: The outcome ("win", "loss" or "timeout") and the episode's statistics.
+		"""
+		started = time.perf_counter()
+		outcome = None
+		while outcome is None and self.time < max_seconds:
+			outcome = self.step()
+		return {
+			"outcome": outcome or "timeout",
+			"deliveries": self.successful_delivery_count + (outcome == "win"),
+			"failures": self.total_delivery_count - self.successful_delivery_count - (outcome == "win"),
+			"fuel_used": self.fuel_used,
+			"refuels": self.refuels,
+			"fines": self.fines_paid,
+			"speeding_fines": self.fines["speeding"],
+			"pedestrian_fines": self.fines["pedestrian_hit"],
+			"rating": sum(self.delivery_scores) / len(self.delivery_scores) if self.delivery_scores else 0.0,
+			"money": self.money,
+			"seconds": self.time,
+			"wall_seconds": time.perf_counter() - started,
+		}
+
+
+def run_job(job):
+	"""
+	Pool task: plays one episode in this worker's Bullet world.
+
+	Params:
+	 - job (tuple): (configuration index, configuration, seed, max_seconds).
+	Returns:
+	 - tuple: (configuration index, episode statistics).
+	"""
+	index, config, seed, max_seconds = job
+	episode = Episode(_grid, _world, config, seed)
+	try:
+		return index, episode.run(max_seconds)
+	finally:
+		episode.cleanup()
+
+
+def aggregate(config, results):
+	"""
+	Params:
+	 - config (dict): The configuration.
+	 - results (list[dict]): The statistics of its episodes.
+	Returns:
+	 - dict: Win rate, means of fuel used, fines, rating, deliveries and simulated seconds, and outcome counts.
+	"""
+	summary = {"label": config["label"], "episodes": len(results),
+			   "win_rate": sum(r["outcome"] == "win" for r in results) / len(results)}
+	for key in ("fuel_used", "fines", "speeding_fines", "pedestrian_fines", "rating", "deliveries", "refuels", "seconds"):
+		summary[key] = statistics.fmean(r[key] for r in results)
+	for outcome in ("win", "loss", "timeout"):
+		summary[outcome] = sum(r["outcome"] == outcome for r in results)
+	return summary
+
+
+def run_sweep(grid, configs, episodes, processes=None, seed=0, max_seconds=900):
+	"""
+	Plays `episodes` episodes of every configuration across a process pool. The episodes of every
+	configuration use the same seeds, so configurations are compared on the same deliveries.
+
+	Params:
+	 - grid (ManhattanGrid): The map, sent once to every worker (a MappedGrid is sent as its path).
+	 - configs (list[dict]): The configurations (see make_config).
+	 - episodes (int): The number of episodes per configuration.
+	 - processes (int): The number of worker processes (all cores if None).
+	 - seed (int): The seed of the first episode.
+	 - max_seconds (float): The maximum simulated seconds per episode.
+	Returns:
+	 - dict: {"configs": one aggregate per configuration, "episodes": total, "processes": ..., "wall_seconds": ...}
+	"""
+	jobs = [(index, config, seed + k, max_seconds) for k in range(episodes) for index, config in enumerate(configs)]
+	results = [[] for _ in configs]
+	processes = processes or os.cpu_count()
+	started = time.perf_counter()
+	with multiprocessing.Pool(processes, initializer=init_worker, initargs=(grid,)) as pool:
+		for index, result in pool.imap_unordered(run_job, jobs):
+			results[index].append(result)
+	wall = time.perf_counter() - started
+	return {
+		"configs": [aggregate(config, config_results) for config, config_results in zip(configs, results)],
+		"episodes": len(jobs),
+		"processes": processes,
+		"wall_seconds": wall,
+		"simulated_seconds": sum(r["seconds"] for config_results in results for r in config_results),
+	}
+
+
+def parse_value(text):
+	"""
+	Params:
+	 - text (str): A number from the command line.
+	Returns:
+	 - int or float: The number.
+	"""
+	value = float(text)
+	return int(value) if value.is_integer() and "." not in text else value
+
+
+def main():
+	"""
+	Command line entry point: builds the configuration grid from --set options and runs the sweep.
+
+	Params: None
+	Returns: None
+	"""
+	from main import COLUMNS, NUM_LOCATIONS, ROAD_TYPES, ROWS, VEHICLE_MODELS
+
+	parser = argparse.ArgumentParser(description="Run headless Delivery Deluxe episodes for balancing sweeps.")
+	parser.add_argument("--vehicle", default="0", help="base vehicle model: name or index in VEHICLE_MODELS (default 0)")
+	parser.add_argument("--set", action="append", default=[], metavar="PARAM=V1,V2",
+						help=f"values to sweep (every combination is run); PARAM is one of {', '.join(VEHICLE_PARAMS + EPISODE_PARAMS)}")
+	parser.add_argument("--episodes", type=int, default=16, help="episodes per configuration (default 16)")
+	parser.add_argument("--processes", type=int, help="worker processes (default: all cores)")
+	parser.add_argument("--max-seconds", type=float, default=900, help="simulated seconds before an episode times out (default 900)")
+	parser.add_argument("--map-seed", type=int, default=0, help="seed of the shared map (default 0)")
+	parser.add_argument("--map", help="open the shared map from a map file (see mapfile.py) instead of generating it")
+	parser.add_argument("--seed", type=int, default=0, help="seed of the first episode (default 0)")
+	parser.add_argument("--out", help="also write the results as JSON")
+	args = parser.parse_args()
+
+	vehicle = next((m for m in VEHICLE_MODELS if m["name"] == args.vehicle), None)
+	if vehicle is None:
+		vehicle = VEHICLE_MODELS[int(args.vehicle)]
+	sweep = {}
+	for option in args.set:
+		name, values = option.split("=", 1)
+		sweep[name] = [parse_value(v) for v in values.split(",")]
+	configs = [make_config(vehicle, ROAD_TYPES, **dict(zip(sweep, combo))) for combo in itertools.product(*sweep.values())]
+
+	if args.map:
+		grid = MappedGrid(args.map)
+	else:
+		grid = grid_map.generate_map(ROWS, COLUMNS, NUM_LOCATIONS, ROAD_TYPES, random.Random(args.map_seed))
+	report = run_sweep(grid, configs, args.episodes, args.processes, args.seed, args.max_seconds)
+
+	print(f"{vehicle['name']}, {report['episodes']} episodes on {report['processes']} processes in {report['wall_seconds']:.1f} s "
+		  f"({report['simulated_seconds'] / report['wall_seconds']:.0f} simulated seconds per second)")
+	print(f"{'configuration':<40} {'win':>6} {'fuel':>7} {'fines':>7} {'rating':>6} {'deliv':>5}  win/loss/timeout")
+	for summary in report["configs"]:
+		print(f"{summary['label']:<40} {summary['win_rate']:6.0%} {summary['fuel_used']:7.1f} {summary['fines']:7.1f} "
+			  f"{summary['rating']:6.2f} {summary['deliveries']:5.1f}  {summary['win']}/{summary['loss']}/{summary['timeout']}")
+	if args.out:
+		with open(args.out, "w") as f:
+			json.dump({"vehicle": vehicle["name"], "sweep": sweep, **report}, f, indent=1)
+
+
+if __name__ == "__main__":
+	main()
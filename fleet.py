@@ -0,0 +1,336 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Fleet mode: many autonomous delivery vehicles sharing the city with the player, used to
+ load-test the delivery dispatch. Every vehicle's position, heading, speed, route and delivery queue lives in
+ compact numpy arrays, and one batched step moves all the vehicles along their routes at once. Routes come from
+ the shared routing engine. Vehicles near the camera are drawn with the real car model (a small pool of
+ instances); all the others are drawn as one batch of points in a single draw call.
+
+Usage:
+	python fleet.py [--vehicles 200] [--seconds 60]     (headless load test: step time and deliveries)
+"""
+import argparse
+import time
+import numpy as np
+from panda3d.core import (Geom, GeomNode, GeomPoints, GeomVertexData, GeomVertexFormat,
+						  OmniBoundingVolume)
+
+IDLE = 0		# Vehicle states
+DRIVING = 1
+
+ARRIVE_RADIUS = 3.0		# World units from an intersection's center at which it counts as reached
+ACCELERATION = 8.0		# World units per second squared
+DECELERATION = 20.0
+TURN_RATE = 180.0		# Degrees per second
+PROXY_HIDDEN_Z = -1000.0	# Height of the proxy points of vehicles drawn with the real model
+PROXY_DTYPE = np.dtype([("vertex", "<f4", 3), ("color", "u1", 4)])	# Layout of GeomVertexFormat.getV3c4()
+
+
+def delivery_nodes(grid):
+	"""
+	Finds the intersection in front of every delivery house (lettered building) of a map.
+
+	Params:
+	 - grid (ManhattanGrid): The map.
+	Returns:
+	 - dict: House label -> (row, column) of its intersection.
+	"""
+	nodes = {}
+	for i in range(grid.rows):
+		for j in range(grid.cols):
+			if grid[i, j].isalpha():
+				nodes[grid[i, j]] = (min(i, grid.rows - 2), min(j, grid.cols - 2))
+	return nodes
+
+
+class Fleet:
+	"""
+	A fleet of autonomous delivery vehicles, stored as arrays indexed by vehicle number.
+	"""
+	def __init__(self, router, count, spacing, origin, rng, queue_capacity=8):
+		"""
+		Params:
+		 - router (RoutingEngine): The shared routing engine.
+		 - count (int): The number of vehicles.
+		 - spacing (float): The distance in world units between adjacent intersections.
+		 - origin (tuple[float, float]): The world (x, y) of intersection (0, 0).
+		 - rng (random.Random): The random source (spawn points and cruise speeds).
+		 - queue_capacity (int): The maximum number of queued deliveries per vehicle.
+		Returns: None
+		"""
+		self.router = router
+		self.count = count
+		self.rng = rng
+		self.cols = router.cols
+		self.on_delivered = None	# Called with (vehicle, node) when a vehicle reaches a destination
+		self.on_idle = None			# Called with (vehicle) when a vehicle has nothing left to do
+
+		# Intersection index -> world position and speed limit
+		rows, cols = np.mgrid[0:router.rows, 0:router.cols]
+		self.node_xy = np.stack([origin[0] + cols.ravel() * spacing, origin[1] + rows.ravel() * spacing], axis=1)
+		self.node_speed = np.zeros(router.rows * router.cols)
+		self.refresh_speeds()
+
+		# Per-vehicle state
+		self.pos = np.zeros((count, 2))
+		self.heading = np.zeros(count)
+		self.speed = np.zeros(count)
+		self.cruise = np.array([rng.uniform(0.8, 1.0) for _ in range(count)])	# Fraction of the speed limit driven
+		self.state = np.full(count, IDLE, dtype=np.uint8)
+		self.route = np.full((count, router.rows * router.cols), -1, dtype=np.int32)	# Intersection indices
+		self.route_len = np.zeros(count, dtype=np.int32)
+		self.route_pos = np.zeros(count, dtype=np.int32)
+		self.queue = np.full((count, queue_capacity), -1, dtype=np.int32)	# Ring buffers of destinations
+		self.queue_head = np.zeros(count, dtype=np.int32)
+		self.queue_len = np.zeros(count, dtype=np.int32)
+		self.delivered = np.zeros(count, dtype=np.int32)
+		self.distance = np.zeros(count)
+
+		roads = np.flatnonzero(self.node_speed > 0)
+		for v in range(count):
+			self.pos[v] = self.node_xy[roads[rng.randrange(len(roads))]]
+			self.heading[v] = rng.choice([0, 90, 180, 270])
+
+		self.proxy_np = None
+		self.proxy_vdata = None
+		self.near_pool = []
+
+	def refresh_speeds(self):
+		"""
+		Re-reads the speed limit of every intersection from the map (after its road types changed).
+
+		Params: None
+		Returns: None
+		"""
+		for r in range(self.router.rows):
+			for c in range(self.router.cols):
+				self.node_speed[r * self.cols + c] = self.router.speed((r, c)) or 0
+
+	def node_of(self, v):
+		"""
+		Params:
+		 - v (int): The vehicle number.
+		Returns:
+		 - tuple[int, int]: The (row, column) of the intersection nearest to the vehicle.
+		"""
+		d = np.abs(self.node_xy - self.pos[v]).sum(axis=1)
+		return divmod(int(np.argmin(d)), self.cols)
+
+	def assign(self, v, node):
+		"""
+		Queues a delivery for a vehicle; an idle vehicle starts driving to it right away.
+
+		Params:
+		 - v (int): The vehicle number.
+		 - node (tuple[int, int]): The (row, column) of the destination intersection.
+		Returns:
+		 - bool: False if the vehicle's queue is full.
+		"""
+		capacity = self.queue.shape[1]
+		if self.queue_len[v] == capacity:
+			return False
+		self.queue[v, (self.queue_head[v] + self.queue_len[v]) % capacity] = node[0] * self.cols + node[1]
+		self.queue_len[v] += 1
+		if self.state[v] == IDLE:
+			self.start_next(v)
+		return True
+
+	def start_next(self, v):
+		"""
+		Routes a vehicle to the next destination of its queue, or makes it idle when the queue is empty.
+
+		Params:
+		 - v (int): The vehicle number.
+		Returns: None
+		"""
+		while self.queue_len[v]:
+			goal = int(self.queue[v, self.queue_head[v]])
+			self.queue_head[v] = (self.queue_head[v] + 1) % self.queue.shape[1]
+			self.queue_len[v] -= 1
+			path = self.router.route(self.node_of(v), divmod(goal, self.cols))
+			if path:
+				self.route[v, :len(path)] = [r * self.cols + c for r, c in path]
+				self.route_len[v] = len(path)
+				self.route_pos[v] = 0
+				self.state[v] = DRIVING
+				return
+		self.state[v] = IDLE
+		self.speed[v] = 0
+		if self.on_idle:
+			self.on_idle(v)
+
+	def step(self, dt):
+		"""
+		Moves every driving vehicle for one time step: vehicles head for the next intersection of their route,
+		slow down while turning, respect the speed limit of the street, and advance their route on arrival.
+
+		Params:
+		 - dt (float): The time step in seconds.
+		Returns: None
+		"""
+		moving = np.flatnonzero(self.state == DRIVING)
+		if not len(moving):
+			return
+		target = self.node_xy[self.route[moving, self.route_pos[moving]]]
+		delta = target - self.pos[moving]
+		dist = np.hypot(delta[:, 0], delta[:, 1])
+
+		# Turn towards the target (heading 0 faces +y, like Panda3D's H)
+		desired = np.degrees(np.arctan2(-delta[:, 0], delta[:, 1]))
+		diff = (desired - self.heading[moving] + 180) % 360 - 180
+		self.heading[moving] += np.clip(diff, -TURN_RATE * dt, TURN_RATE * dt)
+
+		# Accelerate towards the street's speed limit, slower while the vehicle still has to turn
+		limit = self.node_speed[self.route[moving, self.route_pos[moving]]] * self.cruise[moving]
+		limit *= np.clip(1 - np.abs(diff) / 90, 0.2, 1)
+		speed = self.speed[moving]
+		speed += np.clip(limit - speed, -DECELERATION * dt, ACCELERATION * dt)
+		self.speed[moving] = speed
+
+		# Move straight at the target without overshooting it
+		travel = np.minimum(speed * dt, dist)
+		scale = np.divide(travel, dist, out=np.zeros_like(dist), where=dist > 0)
+		self.pos[moving] += delta * scale[:, None]
+		self.distance[moving] += travel
+
+		# Advance the routes of the vehicles that reached their intersection (the only per-vehicle work)
+		for v in moving[dist - travel < ARRIVE_RADIUS]:
+			self.route_pos[v] += 1
+			if self.route_pos[v] == self.route_len[v]:
+				node = divmod(int(self.route[v, self.route_len[v] - 1]), self.cols)
+				self.delivered[v] += 1
+				if self.on_delivered:
+					self.on_delivered(v, node)
+				self.start_next(v)
+
+	# =============================================
+	# Rendering
+	# =============================================
+
+	def attach(self, parent, model_factory=None, near_count=16, point_size=1.5):
+		"""
+		Creates the fleet's visuals: one point per vehicle in a single GeomPoints, and a pool of
+		real car models that follow the vehicles nearest to the camera.
+
+		Params:
+		 - parent (NodePath): The node to draw the fleet under (e.g. render).
+		 - model_factory (callable): Called with a holder NodePath; attaches a car model to it (no pool if None).
+		 - near_count (int): The number of vehicles drawn with the real model.
+		 - point_size (float): The size of the proxy points in world units.
+		Returns: None
+		"""
+		self.proxy_vdata = GeomVertexData("fleet_proxies", GeomVertexFormat.getV3c4(), Geom.UHDynamic)
+		self.proxy_vdata.setNumRows(self.count)
+		points = GeomPoints(Geom.UHStatic)
+		points.addConsecutiveVertices(0, self.count)
+		geom = Geom(self.proxy_vdata)
+		geom.addPrimitive(points)
+		node = GeomNode("fleet_proxies")
+		node.addGeom(geom)
+		node.setBounds(OmniBoundingVolume())	# The points move every frame; never cull them
+		node.setFinal(True)
+		self.proxy_np = parent.attachNewNode(node)
+		self.proxy_np.setRenderModeThickness(point_size)
+		self.proxy_np.setRenderModePerspective(True)
+		self.proxy_np.setLightOff()
+		self.proxy_np.setShaderOff()
+
+		view = self.proxy_view()
+		view["color"] = [(self.rng.randrange(80, 256), self.rng.randrange(80, 256), self.rng.randrange(80, 256), 255)
+						 for _ in range(self.count)]
+
+		self.near_pool = []
+		if model_factory:
+			for k in range(min(near_count, self.count)):
+				holder = parent.attachNewNode(f"fleet_vehicle_{k}")
+				model_factory(holder)
+				holder.hide()
+				self.near_pool.append(holder)
+
+	def proxy_view(self):
+		"""
+		Returns:
+		 - numpy.ndarray: A writable view of the proxy vertices (fields "vertex" and "color").
+		"""
+		return np.frombuffer(memoryview(self.proxy_vdata.modifyArray(0)).cast("B"), dtype=PROXY_DTYPE)
+
+	def update_render(self, camera_pos):
+		"""
+		Moves the visuals to the vehicles' positions: the nearest vehicles get the pooled car models and
+		their points are hidden; every other vehicle is drawn as a point.
+
+		Params:
+		 - camera_pos (Point3): The camera position in world space.
+		Returns: None
+		"""
+		if self.proxy_vdata is None:
+			return
+		view = self.proxy_view()
+		vertex = view["vertex"]
+		vertex[:, 0:2] = self.pos
+		vertex[:, 2] = 1.0
+
+		if self.near_pool:
+			d2 = ((self.pos - (camera_pos[0], camera_pos[1])) ** 2).sum(axis=1)
+			k = len(self.near_pool)
+			near = np.argpartition(d2, k - 1)[:k] if k < self.count else np.arange(self.count)
+			vertex[near, 2] = PROXY_HIDDEN_Z
+			for holder, v in zip(self.near_pool, near):
+				holder.setPosHpr(self.pos[v, 0], self.pos[v, 1], 0.5, self.heading[v], 0, 0)
+				holder.show()
+
+	def destroy(self):
+		"""
+		Removes the fleet's visuals.
+
+		Params: None
+		Returns: None
+		"""
+		for holder in self.near_pool:
+			holder.removeNode()
+		self.near_pool = []
+		if self.proxy_np:
+			self.proxy_np.removeNode()
+			self.proxy_np = None
+			self.proxy_vdata = None
+
+
+def main():
+	"""
+	Headless load test: runs a fleet on a generated map with random deliveries and reports the step time.
+
+	Params: None
+	Returns: None
+	"""
+	import random
+	import grid_map
+	from main import ROAD_TYPES
+	from routing import RoutingEngine
+
+	parser = argparse.ArgumentParser(description="Run a headless Delivery Deluxe fleet load test.")
+	parser.add_argument("--vehicles", type=int, default=200, help="number of vehicles (default 200)")
+	parser.add_argument("--seconds", type=float, default=60, help="simulated seconds (default 60)")
+	parser.add_argument("--size", type=int, default=20, help="map rows and columns (default 20)")
+	parser.add_argument("--seed", type=int, default=0, help="map and fleet seed (default 0)")
+	args = parser.parse_args()
+
+	rng = random.Random(args.seed)
+	grid = grid_map.generate_map(args.size, args.size, 10, ROAD_TYPES, rng)
+	fleet = Fleet(RoutingEngine(grid, ROAD_TYPES), args.vehicles, 60, (-8, -34), rng)	# The game's road spacing and offsets
+	houses = list(delivery_nodes(grid).values())
+	fleet.on_idle = lambda v: fleet.assign(v, rng.choice(houses))
+	for v in range(fleet.count):
+		fleet.assign(v, rng.choice(houses))
+
+	dt = 1 / 60
+	steps = int(args.seconds / dt)
+	start = time.perf_counter()
+	for _ in range(steps):
+		fleet.step(dt)
+	elapsed = time.perf_counter() - start
+	print(f"{args.vehicles} vehicles, {steps} steps: {elapsed / steps * 1000:.3f} ms per step, "
+		  f"{int(fleet.delivered.sum())} deliveries, {fleet.distance.sum() / 1000:.1f} km driven")
+
+
+if __name__ == "__main__":
+	main()
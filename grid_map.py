@@ -4,10 +4,13 @@
 -Date completed: May 9, 2025
 -Game title: Delivery Deluxe (GTA 5.5)
 -Brief description: This module provides classes and functions for generating a grid-based map
-for the driving simulation game, Delivery Deluxe, resembling a Manhattan-style grid.
+for the driving simulation game, Delivery Deluxe, resembling a Manhattan-style grid, and for compiling
+its roads into a compressed sparse row (CSR) graph that routing algorithms can run on directly.
 """
+import heapq
 import random
 import string
+import numpy as np
 
 
 """
@@ -18,6 +21,25 @@ Alphabet letters represent delivery locations.
 '?' represents a mystery location that can offer a gift.
 """
 
+# Categories of building labels, indexed by ManhattanGrid along with the labels themselves
+DELIVERY_HOUSE = "delivery_house"	# Any alphabet letter
+GAS_STATION = "gas_station"			# '+'
+
+
+def label_keys(label):
+	"""
+	Params:
+	 - label (str): A building label.
+	Returns:
+	 - tuple[str]: The keys under which the label is indexed: the label, and its category if it has one.
+	"""
+	if label.isalpha():
+		return (label, DELIVERY_HOUSE)
+	if label == '+':
+		return (label, GAS_STATION)
+	return (label,)
+
+
 class ManhattanGrid:
 	"""
 	Represents a grid-based map with buildings and roads, structured like a Manhattan grid.
@@ -30,7 +52,8 @@ class ManhattanGrid:
 		Initializes the ManhattanGrid.
 
 		The grid is internally represented by two 2D lists: one for buildings
-		and one for road intersections.
+		and one for road intersections. An index from every building label and
+		category to its positions is kept up to date by __setitem__.
 
 		Parameters:
 		 - buildings_rows (int): The number of rows for the building grid.
@@ -42,9 +65,19 @@ class ManhattanGrid:
 		# Full grid is expanded to hold roads in between
 		self.rows = buildings_rows
 		self.cols = buildings_cols
+		self.default_building_label = default_building_label
+		self.default_road_label = default_road_label
 		self.buildings_grid = [[default_building_label for j in range(self.cols)] for i in range(self.rows)]
 		self.road_isx_grid = [[default_road_label for j in range(self.cols - 1)] for i in range(self.rows - 1)]
 		self.streets = []
+		self.graph = None	# Compiled road graph (see road_graph), kept up to date by roadisx_set
+		self.version = 0	# Bumped whenever the roads change (roadisx_set, set_streets), so route caches can tell
+
+		# Label/category -> positions, and (key, position) -> slot of the position in its key's list,
+		# so a position is added or removed in O(1) (removal moves the last position into the freed slot)
+		positions = [(i, j) for i in range(self.rows) for j in range(self.cols)]
+		self.label_index = {key: list(positions) for key in label_keys(default_building_label)}
+		self.label_slots = {(key, pos): slot for key in self.label_index for slot, pos in enumerate(positions)}
 	
 	def __getitem__(self, pos):
 		"""
@@ -68,7 +101,76 @@ class ManhattanGrid:
 		Returns: None
 		"""
 		row, col = pos
+		old_label = self.buildings_grid[row][col]
+		if old_label == label:
+			return
+		self.unindex_position((row, col), old_label)
 		self.buildings_grid[row][col] = label
+		self.index_position((row, col), label)
+
+	def index_position(self, pos, label):
+		"""
+		Adds a building cell to the index of its label (and category).
+
+		Parameters:
+		 - pos (tuple): The (row, col) of the building cell.
+		 - label (str): The cell's label.
+		Returns: None
+		"""
+		for key in label_keys(label):
+			positions = self.label_index.setdefault(key, [])
+			self.label_slots[key, pos] = len(positions)
+			positions.append(pos)
+
+	def unindex_position(self, pos, label):
+		"""
+		Removes a building cell from the index of its label (and category).
+
+		Parameters:
+		 - pos (tuple): The (row, col) of the building cell.
+		 - label (str): The cell's label.
+		Returns: None
+		"""
+		for key in label_keys(label):
+			positions = self.label_index[key]
+			slot = self.label_slots.pop((key, pos))
+			last = positions.pop()
+			if slot < len(positions):
+				positions[slot] = last
+				self.label_slots[key, last] = slot
+
+	def positions(self, key):
+		"""
+		Retrieves the building cells with a label or of a category, without scanning the grid.
+
+		Parameters:
+		 - key (str): A label (e.g. '+' or 'A') or a category (DELIVERY_HOUSE or GAS_STATION).
+		Returns:
+		 - list: The (row, col) of every such cell, in no particular order. The list is the index itself and must not be modified.
+		"""
+		return self.label_index.get(key, [])
+
+	def count(self, key):
+		"""
+		Parameters:
+		 - key (str): A label or a category.
+		Returns:
+		 - int: The number of building cells with the label or of the category.
+		"""
+		return len(self.label_index.get(key, ()))
+
+	def sample(self, key, rng=random):
+		"""
+		Picks a random building cell with a label or of a category in O(1).
+
+		Parameters:
+		 - key (str): A label or a category.
+		 - rng (random.Random): The random source. Defaults to the global `random` module.
+		Returns:
+		 - tuple or None: The (row, col) of the picked cell, or None if there is none.
+		"""
+		positions = self.label_index.get(key)
+		return rng.choice(positions) if positions else None
 		
 	def roadisx_get(self, row, col):
 		"""
@@ -94,8 +196,25 @@ class ManhattanGrid:
 		 - str: The updated label of the road intersection.
 		"""
 		self.road_isx_grid[row][col] = label
+		self.version += 1
+		if self.graph is not None:
+			self.graph.update_node(row, col)
 		return self.road_isx_grid[row][col]
 
+	def road_graph(self, road_types):
+		"""
+		Compiles the road intersections into a CSR graph, or returns the one already compiled for these road types.
+		Later road label changes (roadisx_set) update it in place.
+
+		Parameters:
+		 - road_types (dict): A dictionary mapping road character labels to their speed limits.
+		Returns:
+		 - RoadGraph: The compiled graph.
+		"""
+		if self.graph is None or self.graph.road_types is not road_types:
+			self.graph = RoadGraph(self, road_types)
+		return self.graph
+
 	def show(self):
 		"""
 		Prints a visual representation of the grid to the console.
@@ -151,7 +270,7 @@ class ManhattanGrid:
 		
 		return isx_to_street_index.get(pos)
 	
-	def set_streets(self):
+	def set_streets(self, rng=random):
 		"""
 		Generates a Manhattan-style grid of horizontal streets.
 
@@ -159,6 +278,8 @@ class ManhattanGrid:
 		by creating horizontal streets, one for each row of intersections.
 		It marks these roads on the grid and stores them internally.
 
+		Parameters:
+		 - rng (random.Random): The random source. Defaults to the global `random` module.
 		Returns:
 		 - list: The list of generated street segments.
 		"""
@@ -167,7 +288,7 @@ class ManhattanGrid:
 		streets = []
 
 		# Start with a random initial point in the unvisited set
-		start_pos = random.choice(list(unvisited))
+		start_pos = rng.choice(list(unvisited))
 		street = [start_pos]
 		unvisited.remove(start_pos)
 
@@ -193,9 +314,131 @@ class ManhattanGrid:
 		
 		# Store the created streets in the instance variable
 		self.streets = streets
+		self.version += 1
 		return streets
 
 
+class RoadGraph:
+	"""
+	The road intersections of a ManhattanGrid as a directed graph in compressed sparse row (CSR) form.
+
+	Intersection (row, col) has the id row * cols + col. The edges leaving node u are indices[indptr[u]:indptr[u + 1]],
+	and weights holds the travel time of every edge: the inverse of the speed limit of the intersection it enters
+	(infinite if that intersection is not a road), the same cost as the routing engine's. The arrays can be used
+	directly by other routing code, e.g. scipy.sparse.csr_matrix((weights, indices, indptr)) for scipy.sparse.csgraph.
+	"""
+	def __init__(self, grid, road_types):
+		"""
+		Parameters:
+		 - grid (ManhattanGrid): The map.
+		 - road_types (dict): A dictionary mapping road character labels to their speed limits.
+		Returns: None
+		"""
+		self.grid = grid
+		self.road_types = road_types
+		self.rows = grid.rows - 1	# Intersections lie between the buildings
+		self.cols = grid.cols - 1
+		n = self.rows * self.cols
+
+		# Id <-> (row, col)
+		self.node_rows, self.node_cols = np.divmod(np.arange(n), self.cols)
+
+		# Every node has an edge to each of its (up to 4) neighbours, whatever their road labels, so a label
+		# change only changes weights and never the structure
+		targets = np.full((n, 4), -1, dtype=np.int64)
+		for k, (dr, dc) in enumerate(((-1, 0), (1, 0), (0, -1), (0, 1))):
+			nr, nc = self.node_rows + dr, self.node_cols + dc
+			inside = (nr >= 0) & (nr < self.rows) & (nc >= 0) & (nc < self.cols)
+			targets[inside, k] = nr[inside] * self.cols + nc[inside]
+		valid = targets >= 0
+		self.indptr = np.zeros(n + 1, dtype=np.int64)
+		np.cumsum(valid.sum(axis=1), out=self.indptr[1:])
+		self.indices = targets[valid]
+
+		# Edges entering every node (for the in-place updates)
+		self.in_edges = np.argsort(self.indices, kind="stable")
+		self.in_indptr = np.searchsorted(self.indices[self.in_edges], np.arange(n + 1))
+
+		self.node_weights = np.array([self.entry_weight(r, c) for r, c in zip(self.node_rows.tolist(), self.node_cols.tolist())])
+		self.weights = self.node_weights[self.indices]
+		self.adjacency = None	# Python lists of the arrays for travel_times, made on first use
+
+	def entry_weight(self, row, col):
+		"""
+		Parameters:
+		 - row (int): The row index of the intersection.
+		 - col (int): The column index of the intersection.
+		Returns:
+		 - float: The travel time of an edge entering the intersection (infinite if it is not a road).
+		"""
+		speed = self.road_types.get(self.grid.road_isx_grid[row][col])
+		return 1 / speed if speed else np.inf
+
+	def node_id(self, row, col):
+		"""
+		Parameters:
+		 - row (int): The row index of the intersection.
+		 - col (int): The column index of the intersection.
+		Returns:
+		 - int: The node id of the intersection.
+		"""
+		return row * self.cols + col
+
+	def node_cell(self, node):
+		"""
+		Parameters:
+		 - node (int): A node id.
+		Returns:
+		 - tuple: The (row, col) of the intersection.
+		"""
+		return divmod(node, self.cols)
+
+	def update_node(self, row, col):
+		"""
+		Re-reads the road label of one intersection and updates the weights of the edges entering it.
+
+		Parameters:
+		 - row (int): The row index of the intersection.
+		 - col (int): The column index of the intersection.
+		Returns: None
+		"""
+		node = self.node_id(row, col)
+		weight = self.entry_weight(row, col)
+		if self.node_weights[node] != weight:
+			self.node_weights[node] = weight
+			self.weights[self.in_edges[self.in_indptr[node]:self.in_indptr[node + 1]]] = weight
+			self.adjacency = None
+
+	def travel_times(self, source):
+		"""
+		Finds the shortest travel time from a node to every node with Dijkstra's algorithm over the CSR arrays.
+
+		Parameters:
+		 - source (int): The node id to start from.
+		Returns:
+		 - numpy.ndarray: The travel time to every node (infinite where unreachable).
+		"""
+		if self.adjacency is None:
+			self.adjacency = (self.indptr.tolist(), self.indices.tolist(), self.weights.tolist())
+		indptr, indices, weights = self.adjacency
+		times = [np.inf] * len(self.node_weights)
+		done = [False] * len(self.node_weights)
+		times[source] = 0.0
+		heap = [(0.0, source)]
+		while heap:
+			time, node = heapq.heappop(heap)
+			if done[node]:
+				continue
+			done[node] = True
+			for edge in range(indptr[node], indptr[node + 1]):
+				new_time = time + weights[edge]
+				neighbor = indices[edge]
+				if new_time < times[neighbor]:
+					times[neighbor] = new_time
+					heapq.heappush(heap, (new_time, neighbor))
+		return np.array(times)
+
+
 def manhattan(p1, p2):
 	"""
 	Calculates the Manhattan distance (L1 distance) between two points.
@@ -212,7 +455,7 @@ def manhattan(p1, p2):
 	return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
 
 
-def generate_map(rows, cols, num_locations, road_types):
+def generate_map(rows, cols, num_locations, road_types, rng=random):
 	"""
 	Generates a game map with a Manhattan-style grid, including special locations and roads.
 
@@ -226,6 +469,8 @@ def generate_map(rows, cols, num_locations, road_types):
 	 - cols (int): The number of columns for the building grid.
 	 - num_locations (int): The number of unique delivery locations (A-Z) to place.
 	 - road_types (dict): A dictionary mapping road character labels to their associated speed/cost.
+	 - rng (random.Random): The random source (e.g. random.Random(seed) for a reproducible map).
+							Defaults to the global `random` module.
 	Returns:
 	 - ManhattanGrid: An initialized and populated `ManhattanGrid` object representing the game map.
 	"""
@@ -242,7 +487,7 @@ def generate_map(rows, cols, num_locations, road_types):
 		Returns: None
 		"""
 		while True:
-			x, y = random.randint(0, cols - 1), random.randint(0, rows - 1)
+			x, y = rng.randint(0, cols - 1), rng.randint(0, rows - 1)
 			if grid[y, x] == '#': # Check if the spot is empty
 				grid[y, x] = label
 				break
@@ -259,11 +504,11 @@ def generate_map(rows, cols, num_locations, road_types):
 		place_label(label) # Place the delivery label
 		
 	# Generate the main street layout
-	grid.set_streets()
+	grid.set_streets(rng)
 	
 	# Assign random road types to the generated streets
 	for street in grid.get_streets():
-		road_type = random.choice(list(road_types.keys())) # Choose a random road type
+		road_type = rng.choice(list(road_types.keys())) # Choose a random road type
 		# Apply the chosen road type to all intersections in the current street
 		for isx in street:
 			grid.roadisx_set(isx[0], isx[1], road_type)
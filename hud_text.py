@@ -0,0 +1,308 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: This module provides a fixed-width HUD text renderer for the dashboard readouts
+ (money, timer, speed and delivery counters). The glyphs are baked once from the game font into a
+ texture atlas, and each readout is a single Geom with one quad per character slot. Changing the text
+ only rewrites the texture coordinates of the slots that changed, instead of rebuilding the geometry
+ of a TextNode. A readout has as many slots as the widest value it can show (see ReadoutFormat).
+"""
+from panda3d.core import *
+
+HUD_FONT = "./assets/fonts/OpenSans_Condensed-ExtraBold.ttf"
+HUD_CHARSET = " 0123456789$.-:s"
+
+_atlas_cache = {}	# (font_path, charset, pixel_size) -> GlyphAtlas
+
+
+class GlyphAtlas:
+	"""
+	A texture holding one cell per character of a charset, rendered from a TrueType font.
+	"""
+	def __init__(self, font_path, charset, pixel_size=64, padding=2):
+		"""
+		Bakes the glyphs of `charset` into an atlas texture.
+
+		Params:
+		 - font_path (str): Path to the .ttf font to rasterize.
+		 - charset (str): The characters to bake. Characters outside the charset render blank.
+		 - pixel_size (int): The font size in pixels used for rasterizing (1 em).
+		 - padding (int): Empty pixels around each cell to prevent bleeding between glyphs.
+		Returns: None
+		"""
+		maker = PNMTextMaker(Filename(font_path), 0)
+		maker.setPixelSize(pixel_size)
+		maker.setFg((1, 1, 1, 1))
+		maker.setAlign(PNMTextMaker.ALeft)
+
+		self.pixel_size = pixel_size
+		self.padding = padding
+		self.charset = charset if " " in charset else " " + charset
+
+		# Measure how far the glyphs reach above and below the baseline
+		scratch_h = pixel_size * 3
+		scratch_baseline = pixel_size * 2
+		scratch = PNMImage(maker.calcWidth(self.charset) + pixel_size, scratch_h, 4)
+		scratch.alphaFill(0)
+		maker.generateInto(self.charset, scratch, 0, scratch_baseline)
+		inked_rows = [y for y in range(scratch_h) if any(scratch.getAlpha(x, y) > 0 for x in range(scratch.getXSize()))]
+		ascent = scratch_baseline - inked_rows[0] if inked_rows else pixel_size
+		descent = inked_rows[-1] - scratch_baseline + 1 if inked_rows else 0
+
+		self.ascent = ascent + padding
+		self.descent = descent + padding
+
+		# Pack the glyph cells into rows of a power-of-two texture
+		self.advances = {ch: maker.calcWidth(ch) for ch in self.charset}
+		cell_h = ascent + descent + 2 * padding
+		row_w = 512
+		cells = {}
+		cx, cy = 0, 0
+		for ch in self.charset:
+			cell_w = self.advances[ch] + 2 * padding
+			if cx + cell_w > row_w:
+				cx, cy = 0, cy + cell_h
+			cells[ch] = (cx, cy, cell_w)
+			cx += cell_w
+		tex_w = row_w
+		tex_h = 1 << (cy + cell_h - 1).bit_length()
+
+		image = PNMImage(tex_w, tex_h, 4)
+		image.fill(1, 1, 1)
+		image.alphaFill(0)
+
+		self.uvs = {}	# char -> (u0, v0, u1, v1)
+		for ch, (cx, cy, cell_w) in cells.items():
+			if ch != " ":
+				maker.generateInto(ch, image, cx + padding, cy + self.ascent)
+			# PNMImage rows go top to bottom, texture V goes bottom to top
+			self.uvs[ch] = (cx / tex_w, 1 - (cy + cell_h) / tex_h,
+							(cx + cell_w) / tex_w, 1 - cy / tex_h)
+
+		self.texture = Texture("hud_glyph_atlas")
+		self.texture.load(image)
+		self.texture.setWrapU(SamplerState.WMClamp)
+		self.texture.setWrapV(SamplerState.WMClamp)
+		self.texture.setMinfilter(SamplerState.FTLinearMipmapLinear)
+		self.texture.setMagfilter(SamplerState.FTLinear)
+
+	def get_uv(self, ch):
+		"""
+		Params:
+		 - ch (str): A single character.
+		Returns:
+		 - tuple[float, float, float, float]: The (u0, v0, u1, v1) of the character's cell,
+											  or of the blank cell if it was not baked.
+		"""
+		return self.uvs.get(ch, self.uvs[" "])
+
+	def get_advance(self, ch):
+		"""
+		Params:
+		 - ch (str): A single character.
+		Returns:
+		 - int: The horizontal advance of the character in pixels (that of a space if it was not baked).
+		"""
+		return self.advances.get(ch, self.advances[" "])
+
+
+def get_glyph_atlas(font_path=HUD_FONT, charset=HUD_CHARSET, pixel_size=64):
+	"""
+	Returns the glyph atlas for the given font and charset, baking it only the first time it is requested.
+
+	Params:
+	 - font_path (str): Path to the .ttf font to rasterize.
+	 - charset (str): The characters to bake.
+	 - pixel_size (int): The font size in pixels used for rasterizing.
+	Returns:
+	 - GlyphAtlas: The (cached) glyph atlas.
+	"""
+	key = (font_path, charset, pixel_size)
+	if key not in _atlas_cache:
+		_atlas_cache[key] = GlyphAtlas(font_path, charset, pixel_size)
+	return _atlas_cache[key]
+
+
+class ReadoutFormat:
+	"""
+	The text of a numeric readout: values are clamped to a range and formatted, and max_chars is the
+	width of the widest formatted value, so a HudText with that many slots shows every value in full.
+	"""
+	def __init__(self, format, low, high):
+		"""
+		Params:
+		 - format (callable): Formats a value (e.g. lambda money: f"${money:.2f}").
+		 - low (float): The smallest value shown (smaller values show as `low`).
+		 - high (float): The largest value shown (larger values show as `high`).
+		Returns: None
+		"""
+		self.format = format
+		self.low = low
+		self.high = high
+		self.max_chars = max(len(format(low)), len(format(high)))
+
+	def __call__(self, value):
+		"""
+		Params:
+		 - value (float): The value to show.
+		Returns:
+		 - str: The formatted value, clamped to the range.
+		"""
+		return self.format(min(max(value, self.low), self.high))
+
+
+class HudText:
+	"""
+	A text readout with a fixed number of character slots drawn from a GlyphAtlas.
+
+	The vertex buffer is created once with one quad per slot. setText only rewrites
+	the slots whose character or position changed; since the digits of the HUD font
+	all have the same advance, a changing number usually only rewrites texture coordinates.
+	"""
+	def __init__(self, atlas, max_chars, parent, pos=(0, 0), scale=0.05, fg=(1, 1, 1, 1), align=TextNode.ALeft, text=""):
+		"""
+		Params:
+		 - atlas (GlyphAtlas): The atlas to draw the characters from.
+		 - max_chars (int): The number of character slots (see ReadoutFormat.max_chars).
+		 - parent (NodePath): The node to attach the readout to (e.g. aspect2d).
+		 - pos (tuple[float, float]): The (x, y) of the baseline anchor, like OnscreenText.
+		 - scale (float): The height of one em, like OnscreenText.
+		 - fg (tuple): The RGBA text color.
+		 - align (int): TextNode.ALeft, TextNode.ACenter or TextNode.ARight.
+		 - text (str): The initial text.
+		Returns: None
+		"""
+		self.atlas = atlas
+		self.max_chars = max_chars
+		self.align = align
+		self.slots = [None] * max_chars	# (char, x) currently written to each slot
+		self.text = None
+		self.width = 0.0
+
+		vdata = GeomVertexData("hud_text", GeomVertexFormat.getV3t2(), Geom.UHDynamic)
+		vdata.setNumRows(4 * max_chars)
+		vertex = GeomVertexWriter(vdata, "vertex")
+		texcoord = GeomVertexWriter(vdata, "texcoord")
+		tris = GeomTriangles(Geom.UHStatic)
+		for i in range(4 * max_chars):
+			vertex.addData3(0, 0, 0)
+			texcoord.addData2(0, 0)
+		for i in range(max_chars):
+			tris.addVertices(4 * i, 4 * i + 1, 4 * i + 2)
+			tris.addVertices(4 * i, 4 * i + 2, 4 * i + 3)
+
+		geom = Geom(vdata)
+		geom.addPrimitive(tris)
+		geom_node = GeomNode("hud_text")
+		geom_node.addGeom(geom)
+		self.vdata = geom_node.modifyGeom(0).modifyVertexData()
+
+		self.root = parent.attachNewNode("hud_text_root")
+		self.root.setPos(pos[0], 0, pos[1])
+		self.root.setScale(scale)
+		self.node_path = self.root.attachNewNode(geom_node)
+		self.node_path.setTexture(atlas.texture)
+		self.node_path.setTransparency(TransparencyAttrib.MAlpha)
+		self.node_path.setColor(fg)
+		self.node_path.setLightOff()
+		self.node_path.setShaderOff()
+
+		self.setText(text)
+
+	def setText(self, text):
+		"""
+		Displays `text`, rewriting only the slots whose character or position changed.
+
+		Params:
+		 - text (str): The text to display.
+		Returns: None
+		"""
+		if text == self.text:
+			return
+		if len(text) > self.max_chars:
+			raise ValueError(f"{text!r} does not fit in {self.max_chars} HUD text slots")
+		self.text = text
+		atlas = self.atlas
+		px = float(atlas.pixel_size)
+		top = atlas.ascent / px
+		bottom = -atlas.descent / px
+		pad = atlas.padding / px
+
+		vertex = None
+		texcoord = None
+		x = 0
+		for i in range(self.max_chars):
+			ch = text[i] if i < len(text) else " "
+			slot = (ch, x)
+			if slot != self.slots[i]:
+				if texcoord is None:
+					texcoord = GeomVertexWriter(self.vdata, "texcoord")
+				u0, v0, u1, v1 = atlas.get_uv(ch)
+				texcoord.setRow(4 * i)
+				texcoord.setData2(u0, v0)
+				texcoord.setData2(u1, v0)
+				texcoord.setData2(u1, v1)
+				texcoord.setData2(u0, v1)
+
+				# Glyphs with the same advance at the same position keep their quad
+				prev = self.slots[i]
+				if prev is None or prev[1] != x or atlas.get_advance(prev[0]) != atlas.get_advance(ch):
+					if vertex is None:
+						vertex = GeomVertexWriter(self.vdata, "vertex")
+					x0 = x / px - pad
+					x1 = (x + atlas.get_advance(ch)) / px + pad
+					vertex.setRow(4 * i)
+					vertex.setData3(x0, 0, bottom)
+					vertex.setData3(x1, 0, bottom)
+					vertex.setData3(x1, 0, top)
+					vertex.setData3(x0, 0, top)
+				self.slots[i] = slot
+			if i < len(text):
+				x += atlas.get_advance(ch)
+
+		# Anchor the text like OnscreenText anchors its text
+		self.width = x / px
+		if self.align == TextNode.ARight:
+			self.node_path.setX(-self.width)
+		elif self.align == TextNode.ACenter:
+			self.node_path.setX(-self.width / 2)
+
+	def getText(self):
+		"""
+		Returns:
+		 - str: The displayed text.
+		"""
+		return self.text
+
+	def getWidth(self):
+		"""
+		Returns:
+		 - float: The width of the displayed text in the parent's coordinate space.
+		"""
+		return self.width * self.root.getSx()
+
+	def show(self):
+		"""
+		Shows the readout.
+
+		Params: None
+		Returns: None
+		"""
+		self.root.show()
+
+	def hide(self):
+		"""
+		Hides the readout.
+
+		Params: None
+		Returns: None
+		"""
+		self.root.hide()
+
+	def destroy(self):
+		"""
+		Removes the readout from the scene graph (called by the screen cleanup).
+
+		Params: None
+		Returns: None
+		"""
+		self.root.removeNode()
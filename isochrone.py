@@ -0,0 +1,153 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Fuel-range isochrones. The fuel needed to drive from an intersection to every other one
+ is found with one Dijkstra search over the road intersections, bounded by a full tank, where driving one street
+ at its speed limit burns the fuel the game's rules (rules.fuel_used) burn over that many frames. The results are
+ cached per (intersection, vehicle) with LRU eviction, so the cells, gas stations and delivery houses within reach
+ of any fuel level are found without searching again while the car stays on the same intersection. The cache is
+ emptied as soon as the map's version changes (its roads were relabelled).
+"""
+import heapq
+from collections import OrderedDict
+import rules
+from grid_map import DELIVERY_HOUSE, GAS_STATION
+from spatial import REFUEL_NEIGHBOURHOOD
+
+FULL_TANK = 100.0		# Fuel level of a full tank (the searches never go further)
+FRAME_RATE = 60			# The rules burn fuel per frame, so the fuel of a street depends on the frame rate
+CACHE_SIZE = 64			# Isochrones kept by the cache
+
+
+class IsochroneEngine:
+	"""
+	Finds the fuel needed to reach every intersection from a source intersection, for a vehicle's fuel consumption.
+	"""
+	def __init__(self, router, spacing, capacity=CACHE_SIZE, frame_rate=FRAME_RATE):
+		"""
+		Params:
+		 - router (RoutingEngine): The routing engine over the map (its grid and speed limits).
+		 - spacing (float): The distance in world units between adjacent intersections.
+		 - capacity (int): The maximum number of isochrones kept in the cache.
+		 - frame_rate (float): The frame rate at which the fuel is burnt.
+		Returns: None
+		"""
+		self.router = router
+		self.spacing = spacing
+		self.capacity = capacity
+		self.frame_rate = frame_rate
+		self.cache = OrderedDict()	# (source, fuel_consumption) -> isochrone, least recently used first
+		self.version = router.grid.version
+		self.hits = 0
+		self.misses = 0
+
+	def street_fuel(self, speed, fuel_consumption):
+		"""
+		Params:
+		 - speed (float): The speed limit of the street (driven at that speed).
+		 - fuel_consumption (float): The vehicle model's fuel consumption.
+		Returns:
+		 - float: The fuel (in percent of the tank) burnt driving from one intersection to the next.
+		"""
+		frames = self.spacing / speed * self.frame_rate
+		return rules.fuel_used(speed, fuel_consumption) * frames
+
+	def fuel_costs(self, source, fuel_consumption):
+		"""
+		Finds the fuel needed to reach every intersection within a full tank of the source (cached).
+
+		Params:
+		 - source (tuple[int, int]): The (row, column) to start from (e.g. the car's cell).
+		 - fuel_consumption (float): The vehicle model's fuel consumption.
+		Returns:
+		 - dict: (row, column) -> fuel of the most fuel-efficient route from the source, for every intersection
+				 reachable on a full tank. The dict is shared with the cache and must not be modified.
+		"""
+		if self.version != self.router.grid.version:
+			self.clear()
+			self.version = self.router.grid.version
+		key = (source, fuel_consumption)
+		costs = self.cache.get(key)
+		if costs is not None:
+			self.hits += 1
+			self.cache.move_to_end(key)
+			return costs
+		self.misses += 1
+
+		router = self.router
+		road_isx_grid = router.grid.road_isx_grid
+		# Fuel to enter every road type's intersections
+		entry_fuel = {label: self.street_fuel(speed, fuel_consumption) for label, speed in router.road_types.items() if speed}
+		rows, cols = router.rows, router.cols
+		costs = {}
+		best = {source: 0.0}
+		heap = [(0.0, source)]
+		while heap:
+			cost, node = heapq.heappop(heap)
+			if node in costs:
+				continue
+			costs[node] = cost
+			r, c = node
+			for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+				if 0 <= nr < rows and 0 <= nc < cols:
+					step = entry_fuel.get(road_isx_grid[nr][nc])
+					if step is None:
+						continue
+					new_cost = cost + step
+					# Bounded by a full tank: nothing further can ever be reached
+					if new_cost <= FULL_TANK and new_cost < best.get((nr, nc), FULL_TANK + 1):
+						best[nr, nc] = new_cost
+						heapq.heappush(heap, (new_cost, (nr, nc)))
+
+		self.cache[key] = costs
+		if len(self.cache) > self.capacity:
+			self.cache.popitem(last=False)
+		return costs
+
+	def reachable(self, source, fuel_consumption, fuel_level):
+		"""
+		Params:
+		 - source (tuple[int, int]): The (row, column) to start from.
+		 - fuel_consumption (float): The vehicle model's fuel consumption.
+		 - fuel_level (float): The fuel left in percent.
+		Returns:
+		 - dict: (row, column) -> fuel needed, for every intersection reachable with the fuel left.
+		"""
+		return {cell: cost for cell, cost in self.fuel_costs(source, fuel_consumption).items() if cost <= fuel_level}
+
+	def reachable_places(self, source, fuel_consumption, fuel_level):
+		"""
+		Finds the gas stations and delivery houses that can be reached with the fuel left.
+
+		Params:
+		 - source (tuple[int, int]): The (row, column) to start from.
+		 - fuel_consumption (float): The vehicle model's fuel consumption.
+		 - fuel_level (float): The fuel left in percent.
+		Returns:
+		 - dict: GAS_STATION and DELIVERY_HOUSE -> dict of building (row, column) -> fuel needed to get there
+				 (to the nearest intersection where the car can refuel, or deliver to the house).
+		"""
+		costs = self.fuel_costs(source, fuel_consumption)
+		grid = self.router.grid
+		places = {GAS_STATION: {}, DELIVERY_HOUSE: {}}
+		for i, j in grid.positions(GAS_STATION):
+			cells = [(i - dr, j - dc) for dr, dc in REFUEL_NEIGHBOURHOOD]
+			cost = min((costs[cell] for cell in cells if cell in costs), default=None)
+			if cost is not None and cost <= fuel_level:
+				places[GAS_STATION][i, j] = cost
+		for house in grid.positions(DELIVERY_HOUSE):
+			if house == (grid.rows - 1, grid.cols - 1):
+				continue	# No intersection next to it (see rules.pick_delivery_target)
+			cells = [(house[0] + dr, house[1] + dc) for dr, dc in rules.DELIVERY_NEIGHBOURHOOD]
+			cost = min((costs[cell] for cell in cells if cell in costs), default=None)
+			if cost is not None and cost <= fuel_level:
+				places[DELIVERY_HOUSE][house] = cost
+		return places
+
+	def clear(self):
+		"""
+		Empties the cache (done by fuel_costs when the map's version changes).
+
+		Params: None
+		Returns: None
+		"""
+		self.cache.clear()
@@ -0,0 +1,274 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Load-phase tracer for the scene construction. Every setup stage between pressing
+ "Start Delivery!" and the first rendered frame (physics world, buildings, roads, NPCs, vehicle, UI) and
+ every asset load is recorded with its duration and its allocation count, then written as a Chrome trace
+ (open it in chrome://tracing, Perfetto or speedscope) and as folded stacks (for flamegraph.pl). The phase
+ totals can be checked against a budget file, so that a slower scene construction fails the check.
+
+Usage:
+	python loadtrace.py run [--budget load_budget.json]          (build the city headless, trace it, check the budget)
+	python loadtrace.py check trace.json [--budget load_budget.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGET = os.path.join(ROOT_DIR, "load_budget.json")
+TRACE_DIR = os.path.join(ROOT_DIR, "telemetry")
+
+
+class LoadTracer:
+	"""
+	Records nested, timed phases of one load session.
+	"""
+	def __init__(self):
+		self.events = []	# Chrome trace "complete" events of the current session
+		self.folded = {}	# "outer;inner" stack -> self time in microseconds
+		self.stack = []		# [name, category, args, start_ns, child_ns, allocated blocks] of the open phases
+		self.session = None
+		self.session_start = 0
+
+	def begin(self, session):
+		"""
+		Starts a new load session, discarding the previous one.
+
+		Params:
+		 - session (str): The session name (e.g. "gameplay").
+		Returns: None
+		"""
+		self.events = []
+		self.folded = {}
+		self.stack = []
+		self.session = session
+		self.session_start = time.perf_counter_ns()
+
+	def push(self, name, category="phase", **args):
+		"""
+		Opens a phase of the current session; it ends at the matching pop(). Use phase() unless the phase
+		spans several frames or tasks (e.g. up to the first rendered frame).
+
+		Params:
+		 - name (str): The phase name.
+		 - category (str): "phase" for setup stages, "asset" for asset loads, or a custom category.
+		 - **args: Extra values stored with the event (e.g. the asset path).
+		Returns: None
+		"""
+		self.stack.append([name, category, args, time.perf_counter_ns(), 0, sys.getallocatedblocks()])
+
+	def pop(self):
+		"""
+		Closes the innermost open phase and records it.
+
+		Params: None
+		Returns: None
+		"""
+		end = time.perf_counter_ns()
+		blocks = sys.getallocatedblocks()
+		name, category, args, start, child_ns, start_blocks = self.stack.pop()
+		duration = end - start
+		if self.stack:
+			self.stack[-1][4] += duration
+		path = ";".join([entry[0] for entry in self.stack] + [name])
+		self.folded[path] = self.folded.get(path, 0) + (duration - child_ns) // 1000
+		args["allocated_blocks"] = blocks - start_blocks
+		self.events.append({
+			"name": name, "cat": category, "ph": "X", "pid": 1, "tid": 1,
+			"ts": (start - self.session_start) / 1000, "dur": duration / 1000, "args": args,
+		})
+
+	@contextmanager
+	def phase(self, name, category="phase", **args):
+		"""
+		Times the body of a `with` block as a phase of the current session (does nothing outside a session).
+
+		Params:
+		 - name (str): The phase name.
+		 - category (str): "phase" for setup stages, "asset" for asset loads, or a custom category.
+		 - **args: Extra values stored with the event (e.g. the asset path).
+		Returns: None
+		"""
+		if self.session is None:
+			yield
+			return
+		self.push(name, category, **args)
+		try:
+			yield
+		finally:
+			self.pop()
+
+	def asset(self, path):
+		"""
+		Times an asset load.
+
+		Params:
+		 - path (str): The asset path.
+		Returns:
+		 - contextmanager: The phase context.
+		"""
+		return self.phase(os.path.basename(str(path)), "asset", path=str(path))
+
+	def end(self):
+		"""
+		Ends the current session, closing any phase still open.
+
+		Params: None
+		Returns:
+		 - dict: The session summary (see summary()).
+		"""
+		while self.stack:
+			self.pop()
+		summary = self.summary()
+		self.session = None
+		return summary
+
+	def summary(self):
+		"""
+		Returns:
+		 - dict: The session name, total milliseconds since the session began, and per phase name
+				 (assets grouped under "assets") the total milliseconds, call count and allocated blocks.
+		"""
+		phases = {}
+		for event in self.events:
+			key = "assets" if event["cat"] == "asset" else event["name"]
+			entry = phases.setdefault(key, {"ms": 0.0, "count": 0, "allocated_blocks": 0})
+			entry["ms"] += event["dur"] / 1000
+			entry["count"] += 1
+			entry["allocated_blocks"] += event["args"]["allocated_blocks"]
+		return {
+			"session": self.session,
+			"total_ms": (time.perf_counter_ns() - self.session_start) / 1e6,
+			"phases": phases,
+		}
+
+	def write(self, path):
+		"""
+		Writes the session as a Chrome trace (JSON) and as folded stacks (same path with .folded).
+
+		Params:
+		 - path (str): The trace file to write.
+		Returns: None
+		"""
+		os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+		with open(path, "w") as f:
+			json.dump({"traceEvents": sorted(self.events, key=lambda e: e["ts"]), "displayTimeUnit": "ms",
+					   "otherData": {"session": self.session}}, f)
+		with open(os.path.splitext(path)[0] + ".folded", "w") as f:
+			for stack, micros in sorted(self.folded.items()):
+				f.write(f"{stack} {micros}\n")
+
+
+load_trace = LoadTracer()
+
+
+def check_budget(summary, budget):
+	"""
+	Checks a session summary against a budget.
+
+	Params:
+	 - summary (dict): The session summary (see LoadTracer.summary).
+	 - budget (dict): {"total_ms": limit, "phases": {phase name: limit in ms}}; missing limits are not checked.
+	Returns:
+	 - list[str]: One message per exceeded limit (empty if the session is within budget).
+	"""
+	failures = []
+	if "total_ms" in budget and summary["total_ms"] > budget["total_ms"]:
+		failures.append(f"total {summary['total_ms']:.0f} ms > {budget['total_ms']} ms")
+	for name, limit in budget.get("phases", {}).items():
+		phase = summary["phases"].get(name)
+		if phase and phase["ms"] > limit:
+			failures.append(f"{name} {phase['ms']:.0f} ms > {limit} ms")
+	return failures
+
+
+def load_budget(path=DEFAULT_BUDGET):
+	"""
+	Params:
+	 - path (str): The budget JSON file.
+	Returns:
+	 - dict: The budget (empty if the file does not exist).
+	"""
+	try:
+		with open(path) as f:
+			return json.load(f)
+	except OSError:
+		return {}
+
+
+def summarize_trace(path):
+	"""
+	Rebuilds a session summary from a Chrome trace written by LoadTracer.write.
+
+	Params:
+	 - path (str): The trace file.
+	Returns:
+	 - dict: The session summary.
+	"""
+	with open(path) as f:
+		trace = json.load(f)
+	tracer = LoadTracer()
+	tracer.events = trace["traceEvents"]
+	summary = tracer.summary()
+	summary["session"] = trace.get("otherData", {}).get("session")
+	summary["total_ms"] = max((e["ts"] + e["dur"] for e in tracer.events), default=0) / 1000
+	return summary
+
+
+def print_summary(summary):
+	"""
+	Prints a session summary, slowest phases first.
+
+	Params:
+	 - summary (dict): The session summary.
+	Returns: None
+	"""
+	print(f"Load session '{summary['session']}': {summary['total_ms']:.1f} ms")
+	for name, phase in sorted(summary["phases"].items(), key=lambda item: -item[1]["ms"]):
+		print(f"  {name:<28} {phase['ms']:9.1f} ms  x{phase['count']:<4} {phase['allocated_blocks']:+9d} blocks")
+
+
+def main():
+	"""
+	Command line entry point: trace a headless scene construction, or check a saved trace.
+
+	Params: None
+	Returns:
+	 - int: The exit code (1 if the budget is exceeded).
+	"""
+	parser = argparse.ArgumentParser(description="Trace the Delivery Deluxe scene construction and check it against a budget.")
+	sub = parser.add_subparsers(dest="command", required=True)
+	run = sub.add_parser("run", help="build the city headless and trace it")
+	run.add_argument("--out", help="trace file (default telemetry/loadtrace-<date>-<time>.json)")
+	run.add_argument("--budget", default=DEFAULT_BUDGET, help="budget file (default load_budget.json)")
+	check = sub.add_parser("check", help="check a saved trace")
+	check.add_argument("trace", help="the trace file")
+	check.add_argument("--budget", default=DEFAULT_BUDGET, help="budget file (default load_budget.json)")
+	args = parser.parse_args()
+
+	if args.command == "run":
+		from panda3d.core import loadPrcFileData
+		loadPrcFileData("", "window-type offscreen\naudio-library-name null\nnotify-level error")
+		os.chdir(ROOT_DIR)
+		import main as game
+		app = game.MyApp()
+		app.load_trace_path = args.out
+		app.switch_screen("game")
+		while load_trace.session is not None:	# Until the first frame is rendered
+			app.taskMgr.step()
+		summary = app.load_trace_summary
+	else:
+		summary = summarize_trace(args.trace)
+
+	print_summary(summary)
+	failures = check_budget(summary, load_budget(args.budget))
+	for failure in failures:
+		print(f"OVER BUDGET: {failure}")
+	return 1 if failures else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
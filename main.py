@@ -10,9 +10,10 @@
  ends if the player runs out of fuel or fails too many deliveries. More detailed explanations of game
  objectives and rules are mentioned on the README file.
 """
+import os
 import random
+import time
 from math import *
-from queue import PriorityQueue
 from direct.actor.Actor import Actor
 from direct.showbase import Audio3DManager
 from direct.showbase.ShowBase import ShowBase
@@ -23,6 +24,22 @@ from direct.task import Task
 from panda3d.core import *
 from panda3d.bullet import *
 import grid_map
+import rules
+from dashboard import DashboardModel, ordinal
+from hud_text import HudText, ReadoutFormat, get_glyph_atlas
+from color_picker import ColorPicker
+from asset_cache import VehicleModelCache, load_model
+from texture_manager import TextureManager
+from profiler import Profiler, ProfilerOverlay
+from telemetry import TelemetrySink
+from routing import RoutingEngine, DStarLite
+from collision import BUILDING_GROUP, CAR_GROUP, CONTACT_ADDED_EVENT, GROUND_GROUP, NPC_GROUP, HitEvents, set_collision_group, setup_collision_filter
+from trajectory import PurePursuit, build_trajectory
+from spatial import SpatialIndex
+from isochrone import IsochroneEngine
+from fleet import Fleet, delivery_nodes
+from dispatch import Dispatcher, OrderStream, connect_fleet
+from loadtrace import load_trace, load_budget, check_budget, TRACE_DIR
 
 loadPrcFileData("", "load-file-type p3assimp")		   # Use glTF loader
 loadPrcFileData("", "basic-shaders-only #f")		   # Enable advanced shaders
@@ -36,6 +53,18 @@ MINIMAP_MASK = BitMask32.bit(1)
 ROWS = 20
 COLUMNS = 20
 NUM_LOCATIONS = 10
+TEXTURE_BUDGET_MB = 128	# Video memory budget for the city textures
+FLEET_SIZE = 0	# Autonomous delivery vehicles sharing the city (fleet mode, to load-test the dispatch; see fleet.py)
+FLEET_ORDER_RATE = 0.2	# Orders per second per delivery house in fleet mode (see dispatch.py)
+AUTOPILOT_MAX_DEVIATION = 15.0	# Distance from the autopilot's trajectory at which its path is repaired
+GARAGE_IDLE_FPS = 12	# Frame rate of the garage turntable while the user is not interacting
+GARAGE_IDLE_DELAY = 2.0	# Seconds without mouse movement or clicks before the garage slows down
+
+# Dashboard readouts: values are clamped to these ranges, and each readout has the slots of its widest value
+MONEY_READOUT = ReadoutFormat(lambda money: f"${money:.2f}", -9999.99, 99999.99)
+TIMER_READOUT = ReadoutFormat(lambda seconds: f"{seconds} s", 0, 999)
+COUNT_READOUT = ReadoutFormat(str, 0, 999)	# Successful and failed deliveries
+SPEED_READOUT = ReadoutFormat(str, 0, 999)
 ROAD_TYPES = {
 	'.': 15,
 	':': 25,
@@ -45,7 +74,104 @@ ROAD_TYPES = {
 	'%': 100
 }
 
-g_map = grid_map.generate_map(ROWS, COLUMNS, NUM_LOCATIONS, ROAD_TYPES)
+VEHICLE_MODELS = [	# Properties/stats for every single vehicle model from which the user can choose (also used by episodes.py)
+	{
+		"file_path": "./assets/models/cars/porsche.glb",
+		"model_scale": 130,
+		"name": "Porsche 992",
+		"tier": "D",
+		"mass": 800.0,
+		"acceleration": 5.0,
+		"handling_coeff": 0.6,
+		"fuel_consumption": 0.002
+	},
+	{
+		"file_path": "./assets/models/cars/mazda.glb",
+		"model_scale": 1.3,
+		"name": "Mclaren Furai",
+		"tier": "C",
+		"mass": 600.0,
+		"acceleration": 7.0,
+		"handling_coeff": 0.7,
+		"fuel_consumption": 0.002
+	},
+	{
+		"file_path": "./assets/models/cars/mclaren.glb",
+		"model_scale": 1.1,
+		"name": "Mclaren Gold",
+		"tier": "B",
+		"mass": 800.0,
+		"acceleration": 6.0,
+		"handling_coeff": 0.8,
+		"fuel_consumption": 0.0015
+	},
+	{
+		"file_path": "./assets/models/cars/mercedes.glb",
+		"model_scale": 1.5,
+		"name": "Mercedes AMG One",
+		"tier": "A",
+		"mass": 850.0,
+		"acceleration": 7.0,
+		"handling_coeff": 0.9,
+		"fuel_consumption": 0.001
+	},
+	{
+		"file_path": "./assets/models/cars/corvette.glb",
+		"model_scale": 1.1,
+		"name": "Corvette C9",
+		"tier": "S",
+		"mass": 900.0,
+		"acceleration": 7.5,
+		"handling_coeff": 0.9,
+		"fuel_consumption": 0.0007
+	},
+	{
+		"file_path": "./assets/models/cars/lamborghini.glb",
+		"model_scale": 1.2,
+		"name": "Lamborghini Aventador",
+		"tier": "S",
+		"mass": 850.0,
+		"acceleration": 8.0,
+		"handling_coeff": 1.0,
+		"fuel_consumption": 0.0007
+	}
+]
+
+MAP_SEED = random.randrange(2**32)	# Recorded with input recordings (see replay.py) so the same map can be rebuilt
+g_map = grid_map.generate_map(ROWS, COLUMNS, NUM_LOCATIONS, ROAD_TYPES, random.Random(MAP_SEED))
+
+
+_router = None
+
+def get_router():
+	"""
+	Returns the routing engine over the current map, shared by the autopilot and the fleet.
+	It is rebuilt when g_map is replaced (e.g. by a replay regenerating the recorded map).
+
+	Params: None
+	Returns:
+	 - RoutingEngine: The routing engine.
+	"""
+	global _router
+	if _router is None or _router.grid is not g_map:
+		_router = RoutingEngine(g_map, ROAD_TYPES)
+	return _router
+
+
+def find_shortest_time_path(start, goal):
+	"""
+	Finds the shortest time path from a start grid position to a goal grid position
+	using Dijkstra's algorithm over the road intersections of g_map.
+
+	Params:
+	 - start (tuple[int, int]): The (row, column) coordinates to start from (e.g. the car's cell).
+	 - goal (tuple[int, int]): The (row, column) coordinates of the target destination.
+
+	Returns:
+	 - list[tuple[int, int]]: A list of (row, column) tuples representing the path
+								from start to goal, or an empty list if no path is found.
+	"""
+	return get_router().shortest_time_path(start, goal)
 
 
 class MyApp(ShowBase):
@@ -61,6 +187,34 @@ class MyApp(ShowBase):
 		# Initialize game variables with default values
 		self.init_game_variables()
 		
+		# Prepared vehicle models, shared by the garage and gameplay (kept across screens)
+		self.vehicle_cache = VehicleModelCache(self.loader, self.vehicle_models)
+		
+		# Deduplicated textures with a video memory budget (kept across screens)
+		self.textures = TextureManager(self.loader, TEXTURE_BUDGET_MB)
+		
+		# Per-task timings (F3 shows the overlay; the timers are also sent to PStats when want-pstats is set)
+		self.profiler = Profiler()
+		self.profiler.watch_render(self.taskMgr)
+		self.profiler_overlay = ProfilerOverlay(self.profiler, self.taskMgr, self.profiler_extra_lines)
+		
+		# Gameplay events and per-second performance samples, written to telemetry/ by a background thread
+		self.telemetry = TelemetrySink()
+		self.telemetry_calls = {}	# timer name -> call count at the previous performance sample
+		
+		# Load-phase trace of the scene construction, written to telemetry/ once the first game frame is rendered
+		self.load_trace_path = None		# None for a timestamped file name
+		self.load_trace_summary = None
+		
+		# On-demand rendering of the garage: the frame rate is limited while the user is not interacting
+		self.garage_idle = False
+		self.garage_last_input = 0.0
+		self.garage_mouse = None	# Mouse position at the previous garage frame
+		
+		# Input recording of the next game (set by replay.py when recording a session)
+		self.input_recorder = None
+		self.exitFunc = self.close_outputs
+		
 		# Start with the start screen
 		self.switch_screen("start")
 		
@@ -100,74 +254,20 @@ class MyApp(ShowBase):
 		
 		# Vehicle properties
 		self.chassisNP = None
-		self.vehicle_models = [{    # Properties/stats for every single vehicle model from which the user can choose.
-									"file_path": "./assets/models/cars/porsche.glb",
-									"model_scale": 130,
-									"name": "Porsche 992",
-									"tier": "D",
-									"mass": 800.0,
-									"acceleration": 5.0,
-									"handling_coeff": 0.6,
-									"fuel_consumption": 0.002
-								},
-								{
-									"file_path": "./assets/models/cars/mazda.glb",
-									"model_scale": 1.3,
-									"name": "Mclaren Furai",
-									"tier": "C",
-									"mass": 600.0,
-									"acceleration": 7.0,
-									"handling_coeff": 0.7,
-									"fuel_consumption": 0.002
-								},
-								{
-									"file_path": "./assets/models/cars/mclaren.glb",
-									"model_scale": 1.1,
-									"name": "Mclaren Gold",
-									"tier": "B",
-									"mass": 800.0,
-									"acceleration": 6.0,
-									"handling_coeff": 0.8,
-									"fuel_consumption": 0.0015
-								},
-								{
-									"file_path": "./assets/models/cars/mercedes.glb",
-									"model_scale": 1.5,
-									"name": "Mercedes AMG One",
-									"tier": "A",
-									"mass": 850.0,
-									"acceleration": 7.0,
-									"handling_coeff": 0.9,
-									"fuel_consumption": 0.001
-								},
-								{
-									"file_path": "./assets/models/cars/corvette.glb",
-									"model_scale": 1.1,
-									"name": "Corvette C9",
-									"tier": "S",
-									"mass": 900.0,
-									"acceleration": 7.5,
-									"handling_coeff": 0.9,
-									"fuel_consumption": 0.0007
-								},
-								{
-									"file_path": "./assets/models/cars/lamborghini.glb",
-									"model_scale": 1.2,
-									"name": "Lamborghini Aventador",
-									"tier": "S",
-									"mass": 850.0,
-									"acceleration": 8.0,
-									"handling_coeff": 1.0,
-									"fuel_consumption": 0.0007
-								}
-						]
+		self.vehicle_models = VEHICLE_MODELS
 		self.vehicle_model_idx = 0
 		self.vehicle_color = Vec4(1, 1, 1, 1)  # Default white
 		
 		# NPC variables
 		self.npcs = []  # List to store NPCs
-		self.npc_collision_group = 2  # Collision group for NPCs
+		self.npc_collision_group = NPC_GROUP  # Collision group for NPCs (see collision.py)
 		self.last_fine_time = 0  # To prevent rapid fines
+		self.pedestrian_hits = None  # The car's hits of NPCs, queued from the contact events (see setup_vehicle)
+		
+		# Autonomous delivery fleet and its order dispatch (only created when FLEET_SIZE is set)
+		self.fleet = None
+		self.dispatcher = None
+		self.order_stream = None
 		
 		# Game state
 		self.fuel_level = 100.0
@@ -179,6 +279,8 @@ class MyApp(ShowBase):
 		self.successful_delivery_count = 0
 		self.delivery_scores = []
 		self.speeding_timer = 0.0
+		self.session_seed = None	# Seed of self.rng, the random source of a game (picked when the game starts)
+		self.rng = random
 		
 		# Camera
 		self.cameraTarget = Point3(0, 0, 0)
@@ -203,6 +305,9 @@ class MyApp(ShowBase):
 		# Minimap
 		self.minimap_root = None
 		self.minimap_zoom_coeff = 1
+		self.fuel_overlay_enabled = False	# Fuel range overlay on the minimap (toggled with F)
+		self.fuel_overlay = None
+		self.fuel_overlay_key = None		# (cell, fuel consumption, fuel level) the overlay was drawn for
 		
 		# Autopilot control
 		self.autopilot_used = False
@@ -212,9 +317,13 @@ class MyApp(ShowBase):
 		self.ui_bg = None
 		self.ui_text = None
 		self.delivery_text = None
+		self.delivery_timer_label = None
 		self.delivery_timer = None
+		self.del_wins_label = None
 		self.del_wins_text = None
 		self.del_losses_text = None
+		self.del_losses_label = None
+		self.speed_text = None
 		self.speedometer_dial = None
 		self.needle_pivot = None
 		self.speedometer_needle = None
@@ -227,6 +336,7 @@ class MyApp(ShowBase):
 		self.speeding_text = None
 		self._show_warning_timer = 0.0
 		self._is_flashing_on = True
+		self.dashboard = None
 	
 	def setup_controls(self):
 		"""
@@ -243,10 +353,15 @@ class MyApp(ShowBase):
 		
 		# Common controls
 		self.accept("escape", self.user_exit)
+		self.accept("f3", self.profiler_overlay.toggle)
 		
 		if self.game_state == "start":
 			self.accept("mouse1", self.start_button_click)
 			
+		elif self.game_state == "garage":
+			self.accept("mouse1", self.press_color_picker)
+			self.accept("mouse1-up", self.release_color_picker)
+			
 			
 		elif self.game_state == "game":
 			# Mouse controls
@@ -269,12 +384,34 @@ class MyApp(ShowBase):
 			# Gameplay keys
 			self.accept("z", self.minimap_zoom, [1])
 			self.accept("x", self.minimap_zoom, [-1])
-			self.accept("c", self.refuel, [g_map])
-			self.accept("v", self.complete_delivery)
+			self.accept("f", self.toggle_fuel_overlay)
+			self.accept("c", self.run_action, ["refuel"])
+			self.accept("v", self.run_action, ["complete_delivery"])
+			
+			# Physics events
+			self.accept(CONTACT_ADDED_EVENT, self.on_contact_added)
 			
 		elif self.game_state in ["win", "loss"]:
 			self.accept("mouse1", self.restart_game)
 	
+	def run_action(self, action):
+		"""
+		Runs a one-shot gameplay action bound to a key or button, noting it for the input recorder.
+
+		Params:
+		 - action (str): "refuel", "complete_delivery" or "autopilot".
+		Returns: None
+		"""
+		if self.input_recorder:
+			self.input_recorder.note_action(action)
+		
+		if action == "refuel":
+			self.refuel()
+		elif action == "complete_delivery":
+			self.complete_delivery()
+		elif action == "autopilot":
+			self.activate_autopilot_assist()
+	
 	def set_key(self, key, value):
 		"""
 		Sets the state of a specific key in the key_map.
@@ -312,9 +449,14 @@ class MyApp(ShowBase):
 			self.show_garage_screen()
 			self.setup_controls()  # Setup controls for new state
 		elif new_state == "game":
-			self.cleanup_previous_state()  # Clean up previous state
-			self.start_gameplay()
+			load_trace.begin("gameplay")  # Trace everything up to the first rendered frame
+			with load_trace.phase("cleanup_previous_state"):
+				self.cleanup_previous_state()  # Clean up previous state
+			with load_trace.phase("start_gameplay"):
+				self.start_gameplay()
 			self.setup_controls()  # Setup controls for new state
+			load_trace.push("first_frame")
+			self.taskMgr.add(self.finish_load_trace, "finishLoadTrace", sort=51)  # Right after the frame is rendered
 		elif new_state == "win":
 			self.show_end_screen(True)
 		elif new_state == "loss":
@@ -338,6 +480,8 @@ class MyApp(ShowBase):
 		
 		# Stop all tasks
 		self.taskMgr.remove("rotateGarageCar")
+		self.taskMgr.remove("dragColorPicker")
+		self.set_garage_idle(False)
 		self.taskMgr.remove("update")
 		self.taskMgr.remove("updateCamera")
 		self.taskMgr.remove("updateMinimap")
@@ -345,6 +489,13 @@ class MyApp(ShowBase):
 		self.taskMgr.remove("handleSpeeding")
 		self.taskMgr.remove("updateDelivery")
 		self.taskMgr.remove("UpdateLightingTask")
+		self.taskMgr.remove("updateTextureBudget")
+		self.taskMgr.remove("sampleTelemetry")
+		self.taskMgr.remove("finishLoadTrace")
+		self.taskMgr.remove("updateFleet")
+		self.taskMgr.remove("autopilotDriveTask")
+		self.textures.clear_tiles()
+		self.remove_fuel_overlay()
 		
 		# Clean up physics world if it exists
 		if hasattr(self, 'world') and self.world:
@@ -370,6 +521,24 @@ class MyApp(ShowBase):
 				npc['node'].removeNode()
 				npc['actor'].cleanup()
 			self.npcs = []
+		
+		# Remove the fleet
+		if self.fleet:
+			self.fleet.destroy()
+			self.fleet = None
+			self.dispatcher = None
+			self.order_stream = None
+	
+	def close_outputs(self):
+		"""
+		Finishes the input recording (if any) and flushes the telemetry file. Called when the application exits.
+		
+		Params: None
+		Returns: None
+		"""
+		if self.input_recorder:
+			self.input_recorder.close(self)
+		self.telemetry.close()
 	
 	def user_exit(self):
 		"""
@@ -428,7 +597,7 @@ class MyApp(ShowBase):
 		
 		# Instructions
 		instructions = OnscreenText(
-			text="Use arrow keys to drive\nSpace to manual brake\nV to complete delivery\nC to refuel at gas stations\nUse Z and X to zoom the minimap\nUse ESC to escape autopilot",
+			text="Use arrow keys to drive\nSpace to manual brake\nV to complete delivery\nC to refuel at gas stations\nUse Z and X to zoom the minimap\nF to show the fuel range on the minimap\nUse ESC to escape autopilot",
 			pos=(0, -0.5),
 			scale=0.05,
 			fg=(1, 1, 1, 1),
@@ -485,8 +654,9 @@ class MyApp(ShowBase):
 		self.camera.lookAt(0, 0, 5)
 		self.camera.show()
 		
-		# Start rotating the car
-		self.taskMgr.add(self.rotate_garage_car, "rotateGarageCar")
+		# Start rotating the car (at full frame rate only while the user interacts)
+		self.garage_interact()
+		self.profiler.add_task(self.taskMgr, self.rotate_garage_car, "rotateGarageCar")
 	
 	def setup_garage_environment(self):
 		"""
@@ -499,13 +669,13 @@ class MyApp(ShowBase):
 		self.render.show()
 		
 		# Load garage floor
-		floor = self.loader.loadModel("./assets/models/ground/ground.egg")
+		floor = load_model(self.loader, "./assets/models/ground/ground.egg")
 		floor.reparentTo(self.garage_render)
 		floor.setScale(3)
 		floor.setPos(-8, 42, -2)
 		floor.setColor(0.3, 0.3, 0.3, 1)
 		
-		garage = self.loader.loadModel("./assets/models/garage/garage.glb")
+		garage = load_model(self.loader, "./assets/models/garage/garage.glb")
 		garage.setShaderAuto()
 		garage.reparentTo(self.garage_render)
 		garage.setScale(3.5)
@@ -532,10 +702,7 @@ class MyApp(ShowBase):
 		Returns: None
 		"""
 		
-		self.garage_car = self.loader.loadModel(self.vehicle_models[self.vehicle_model_idx]["file_path"])
-		self.garage_car.setShaderAuto()
-		self.garage_car.reparentTo(self.garage_render)
-		self.garage_car.setScale(self.vehicle_models[self.vehicle_model_idx]["model_scale"])
+		self.garage_car = self.vehicle_cache.instance(self.vehicle_model_idx, self.garage_render)
 		self.garage_car.setPos(0, 12, -1.3)
 		self.garage_car.setColorScale(self.vehicle_color)
 		
@@ -565,6 +732,9 @@ class MyApp(ShowBase):
 		self.garage_render.setLight(key_light_np)
 		self.garage_render.setLight(fill_light_np)
 		self.garage_render.setLight(ambient_np)
+		
+		# Load the other vehicle models in the background so switching cars is instant
+		self.vehicle_cache.preload_async()
 	
 	def setup_garage_ui(self):
 		"""
@@ -584,126 +754,8 @@ class MyApp(ShowBase):
 			font=loader.loadFont("./assets/fonts/OpenSans_Condensed-ExtraBold.ttf")
 		)
 
-		# Generate 50 colors in rainbow order
-		rainbow_colors = []
-		rainbow_count = 25
-
-		for i in range(rainbow_count):
-			# Creating colors in rainbow sequence (red to violet)
-			hue = i / rainbow_count
-			saturation = 0.9
-			value = 0.9
-			
-			# Convert HSV to RGB
-			if saturation == 0.0:
-				rgb = (value, value, value)
-			else:
-				h_i = int(hue * 6.0)
-				f = hue * 6.0 - h_i
-				p = value * (1.0 - saturation)
-				q = value * (1.0 - saturation * f)
-				t = value * (1.0 - saturation * (1.0 - f))
-				h_i = h_i % 6
-				
-				if h_i == 0: rgb = (value, t, p)
-				elif h_i == 1: rgb = (q, value, p)
-				elif h_i == 2: rgb = (p, value, t)
-				elif h_i == 3: rgb = (p, q, value)
-				elif h_i == 4: rgb = (t, p, value)
-				else: rgb = (value, p, q)
-			
-			rainbow_colors.append((rgb[0], rgb[1], rgb[2], 1))
-
-		# create color buttons in a grid
-		color_buttons = []
-		button_size = 0.03
-		start_x = -0.85
-		start_y = -0.62
-		spacing = 0.07
-		
-		self.saturation_buttons = []
-		self.color_outlines = []
-		self.saturation_outlines = []
-		self.selected_hue = 0  # Track selected hue for saturation updates
-		
-		for i, color in enumerate(rainbow_colors):
-			row = i // (rainbow_count)
-			col = i % (rainbow_count)
-			x = start_x + col * spacing
-			y = start_y - row * spacing
-			
-			outline = DirectFrame(
-				frameSize=(-button_size*1.2, button_size*1.2, -button_size*1.2, button_size*1.1),
-				pos=(x, 0, y),
-				frameColor=(1, 1, 1, 0),
-				state=DGG.NORMAL
-			)
-			self.color_outlines.append(outline)
-			
-			btn = DirectButton(
-				frameSize=(-button_size, button_size, -button_size, button_size),
-				pos=(x, 0, y),
-				frameColor=color,
-				command=self.change_car_color,
-				extraArgs=[color, i, False, rainbow_count],  # False = rainbow button
-				pressEffect=1
-			)
-			color_buttons.append(btn)
-
-		# Create saturation buttons row
-		saturation_row_y = start_y - 1.5 * spacing
-		saturation_count = rainbow_count
-
-		for i in range(saturation_count):
-			x = start_x + i * spacing
-			
-			outline = DirectFrame(
-				frameSize=(-button_size*1.2, button_size*1.2, -button_size*1.2, button_size*1.1),
-				pos=(x, 0, saturation_row_y),
-				frameColor=(1, 1, 1, 0),
-				state=DGG.NORMAL
-			)
-			self.saturation_outlines.append(outline)
-			
-			btn = DirectButton(
-				frameSize=(-button_size, button_size, -button_size, button_size),
-				pos=(x, 0, saturation_row_y),
-				frameColor=(1, 1, 1, 1),  # Initial white color
-				command=self.change_car_color,
-				extraArgs=[(1, 1, 1, 1), i, True, rainbow_count],  # True = saturation button
-				pressEffect=1
-			)
-			self.saturation_buttons.append(btn)
-
-		# Initialize saturation buttons with first color's shades
-		hue = 0 / rainbow_count
-		for i, btn in enumerate(self.saturation_buttons):
-			pos = i / (saturation_count - 1)
-			
-			if pos < 0.5:
-				saturation = pos * 2
-				value = 1.0
-			else:
-				saturation = 1.0
-				value = 1.0 - (pos - 0.5) * 2
-			
-			# Convert HSV to RGB
-			h_i = int(hue * 6.0)
-			f = hue * 6.0 - h_i
-			p = value * (1.0 - saturation)
-			q = value * (1.0 - saturation * f)
-			t = value * (1.0 - saturation * (1.0 - f))
-			h_i = h_i % 6
-			
-			if h_i == 0: rgb = (value, t, p)
-			elif h_i == 1: rgb = (q, value, p)
-			elif h_i == 2: rgb = (p, value, t)
-			elif h_i == 3: rgb = (p, q, value)
-			elif h_i == 4: rgb = (t, p, value)
-			else: rgb = (value, p, q)
-			
-			btn['frameColor'] = (rgb[0], rgb[1], rgb[2], 1)
-			btn['extraArgs'][0] = (rgb[0], rgb[1], rgb[2], 1)
+		# Hue strip and saturation/value area (one shader-drawn quad)
+		self.color_picker = ColorPicker(self.aspect2d, (-0.88, 0.45, -0.95, -0.55), self.vehicle_color, self.change_car_color)
 		
 		# Specs Box - Top Left
 		specs_bg = DirectFrame(
@@ -819,70 +871,58 @@ class MyApp(ShowBase):
 		)
 
 		# Store UI elements
-		self.garage_elements.extend([title, play_btn, left_nav_btn, right_nav_btn] + color_buttons + self.color_outlines + self.saturation_buttons + self.saturation_outlines)
+		self.garage_elements.extend([title, play_btn, left_nav_btn, right_nav_btn, self.color_picker])
 	
-	def change_car_color(self, color, index, is_saturation_button, rainbow_count):
+	def change_car_color(self, color):
 		"""
-		Handle color change of the car display model in the garag,  and update selection outline accordingly.
+		Handle color change of the car display model in the garage (called by the color picker).
 		Params:
-		 - color (tuple[float, float, float, float]): The RGBA color tuple (0.0-1.0 for each component)
-														to apply to the car.
-		 - index (int): The index of the clicked button within its respective list
-						(color_outlines or saturation_outlines).
-		 - is_saturation_button (bool): True if the clicked button is from the saturation row,
-									   False if it's from the main rainbow color grid.
-		 - rainbow_count (int): The total number of hue buttons (used for calculating hue value).
+		 - color (Vec4): The RGBA color (0.0-1.0 for each component) to apply to the car.
 		Returns: None
 		"""
 		
 		self.vehicle_color = Vec4(color)
 		
-		# Hide all outlines first
-		for outline in self.color_outlines + self.saturation_outlines:
-			outline['frameColor'] = (1, 1, 1, 0)
-		
-		# Show the appropriate outline
-		if is_saturation_button:
-			self.saturation_outlines[index]['frameColor'] = (1, 1, 1, 1)
-		else:
-			self.color_outlines[index]['frameColor'] = (1, 1, 1, 1)
-			self.selected_hue = index / rainbow_count
-			
-			for i, btn in enumerate(self.saturation_buttons):
-				pos = i / (rainbow_count - 1)
-				
-				if pos < 0.5:
-					saturation = pos * 2
-					value = 1.0
-				else:
-					saturation = 1.0
-					value = 1.0 - (pos - 0.5) * 2
-				
-				# Convert HSV to RGB
-				if saturation == 0.0:
-					rgb = (value, value, value)
-				else:
-					h_i = int(self.selected_hue * 6.0)
-					f = self.selected_hue * 6.0 - h_i
-					p = value * (1.0 - saturation)
-					q = value * (1.0 - saturation * f)
-					t = value * (1.0 - saturation * (1.0 - f))
-					h_i = h_i % 6
-					
-					if h_i == 0: rgb = (value, t, p)
-					elif h_i == 1: rgb = (q, value, p)
-					elif h_i == 2: rgb = (p, value, t)
-					elif h_i == 3: rgb = (p, q, value)
-					elif h_i == 4: rgb = (t, p, value)
-					else: rgb = (value, p, q)
-				
-				new_color = (rgb[0], rgb[1], rgb[2], 1)
-				btn['frameColor'] = new_color
-				btn['extraArgs'][0] = new_color
-		
 		# Apply color to car model
 		if hasattr(self, 'garage_car') and self.garage_car:
 			self.garage_car.setColor(color)
+			self.garage_car.setColorScale(self.vehicle_color)
+	
+	def press_color_picker(self):
+		"""
+		Starts picking a color if the mouse was pressed on the color picker, and follows the mouse until it is released.
+		
+		Params: None
+		Returns: None
+		"""
+		
+		self.garage_interact()
+		if self.color_picker.press(self.mouseWatcherNode):
+			self.profiler.add_task(self.taskMgr, self.drag_color_picker, "dragColorPicker")
+	
+	def release_color_picker(self):
+		"""
+		Stops picking a color when the mouse is released.
+		
+		Params: None
+		Returns: None
+		"""
+		
+		self.color_picker.release()
+		self.taskMgr.remove("dragColorPicker")
+	
+	def drag_color_picker(self, task):
+		"""
+		Task to pick the color under the mouse while the mouse button is held on the color picker.
+		Params:
+		 - task (Task.Task): The Panda3D task object.
+		Returns:
+		 - int: Task.cont to continue the task.
+		"""
+		
+		self.garage_interact()
+		self.color_picker.drag(self.mouseWatcherNode)
+		return Task.cont
 			
 	def update_vehicle_specs(self):
 		"""
@@ -941,19 +981,15 @@ class MyApp(ShowBase):
 		Returns: None
 		"""
 		
-		self.vehicle_model_idx += direction
-		
-		if self.vehicle_model_idx >= len(self.vehicle_models):
-			self.vehicle_model_idx = 0
+		self.garage_interact()
+		self.vehicle_model_idx = (self.vehicle_model_idx + direction) % len(self.vehicle_models)
 		
 		if hasattr(self, 'garage_car') and self.garage_car:
-			new_car = self.loader.loadModel(self.vehicle_models[self.vehicle_model_idx]["file_path"])
-			new_car.reparentTo(self.garage_render)
-			new_car.clearTransform()
-			new_car.setScale(self.vehicle_models[self.vehicle_model_idx]["model_scale"])
+			# Instance of the cached, already prepared model (no disk access)
+			new_car = self.vehicle_cache.instance(self.vehicle_model_idx, self.garage_render)
 			new_car.setPos(0, 12, -1.3)
+			new_car.setH(self.garage_car.getH())
 			new_car.setColorScale(self.vehicle_color)
-			new_car.setShaderAuto()  # Enable proper shading
 			
 			self.garage_car.removeNode()
 			self.garage_car = new_car
@@ -973,12 +1009,49 @@ class MyApp(ShowBase):
 		if self.game_state != "garage":
 			return Task.done
 		
-		self.garage_car.setColorScale(self.vehicle_color)
+		# Any mouse movement counts as interaction (hover effects need full rate too)
+		mouse = Point2(self.mouseWatcherNode.getMouse()) if self.mouseWatcherNode and self.mouseWatcherNode.hasMouse() else None
+		if mouse != self.garage_mouse:
+			self.garage_mouse = mouse
+			self.garage_interact()
+		self.set_garage_idle(globalClock.getRealTime() - self.garage_last_input > GARAGE_IDLE_DELAY)
 		
 		dt = globalClock.getDt()
 		self.garage_car.setH(self.garage_car.getH() + 20 * dt)
 		return Task.cont
 	
+	def garage_interact(self):
+		"""
+		Notes user interaction in the garage, returning the turntable to full frame rate.
+		
+		Params: None
+		Returns: None
+		"""
+		
+		self.garage_last_input = globalClock.getRealTime()
+		self.set_garage_idle(False)
+	
+	def set_garage_idle(self, idle):
+		"""
+		Limits the frame rate to GARAGE_IDLE_FPS while the garage is idle, and restores it when the user interacts or leaves the garage.
+		A clock that is not in normal mode (e.g. a forced frame rate or a replay) is left alone.
+		
+		Params:
+		 - idle (bool): True to limit the frame rate, False to restore it.
+		Returns: None
+		"""
+		
+		if idle == self.garage_idle:
+			return
+		if idle:
+			if globalClock.getMode() != ClockObject.MNormal:
+				return
+			globalClock.setMode(ClockObject.MLimited)
+			globalClock.setFrameRate(GARAGE_IDLE_FPS)
+		else:
+			globalClock.setMode(ClockObject.MNormal)
+		self.garage_idle = idle
+	
 	# =============================================
 	# Gameplay Screen Methods
 	# =============================================
@@ -991,18 +1064,33 @@ class MyApp(ShowBase):
 		Returns: None
 		"""
 		
+		# Seed the random source of this game, so that the game can be replayed from its inputs
+		if self.session_seed is None:
+			self.session_seed = random.randrange(2**32)
+		self.rng = random.Random(self.session_seed)
+		
 		# Setup physics world
-		self.world = BulletWorld()
-		self.world.setGravity(Vec3(0, 0, -9.81))
+		with load_trace.phase("BulletWorld"):
+			self.world = BulletWorld()
+			self.world.setGravity(Vec3(0, 0, -9.81))
+			setup_collision_filter(self.world)
 		
 		# Setup game environment
-		self.setup_game_environment()
+		with load_trace.phase("setup_game_environment"):
+			self.setup_game_environment()
 		
 		# Setup NPCs
-		self.setup_npcs(2 * ROWS)  # Create NPCs
+		with load_trace.phase("setup_npcs"):
+			self.setup_npcs(2 * ROWS)  # Create NPCs
 		
 		# Setup vehicle
-		self.setup_vehicle()
+		with load_trace.phase("setup_vehicle"):
+			self.setup_vehicle()
+		
+		# Setup the delivery fleet (fleet mode)
+		if FLEET_SIZE:
+			with load_trace.phase("setup_fleet"):
+				self.setup_fleet(FLEET_SIZE)
 		
 		# Setup camera
 		self.cameraTarget = Point3(0, 0, 0)
@@ -1010,20 +1098,31 @@ class MyApp(ShowBase):
 		self.camera.lookAt(self.cameraTarget + Vec3(0, 5, 5))
 		
 		# Setup UI
-		self.create_minimap()
-		self.create_dashboard()
+		with load_trace.phase("create_ui"):
+			self.create_minimap()
+			self.create_dashboard()
+		
+		self.telemetry.event("game_start", vehicle=self.vehicle_models[self.vehicle_model_idx]["name"],
+							 rows=ROWS, columns=COLUMNS, npcs=len(self.npcs))
 		
 		# Start delivery system
-		self.start_new_delivery()
+		with load_trace.phase("start_new_delivery"):
+			self.start_new_delivery()
 		
-		# Start game tasks
-		self.taskMgr.add(self.update, "update")
-		self.taskMgr.add(self.update_camera, "updateCamera")
-		self.taskMgr.add(self.update_minimap, "updateMinimap")
-		self.taskMgr.add(self.update_dashboard, "updateDashboard")
-		self.taskMgr.add(self.handle_speeding, "handleSpeeding")
-		self.taskMgr.add(self.update_delivery, "updateDelivery")
-		self.taskMgr.add(self.update_lighting_task, "UpdateLightingTask")
+		# Start game tasks (the input recorder samples the controls before any game task runs)
+		if self.input_recorder:
+			self.input_recorder.begin(self)
+		self.profiler.add_task(self.taskMgr, self.update, "update")
+		self.profiler.add_task(self.taskMgr, self.update_camera, "updateCamera")
+		self.profiler.add_task(self.taskMgr, self.update_minimap, "updateMinimap")
+		self.profiler.add_task(self.taskMgr, self.update_dashboard, "updateDashboard")
+		self.profiler.add_task(self.taskMgr, self.handle_speeding, "handleSpeeding")
+		self.profiler.add_task(self.taskMgr, self.update_delivery, "updateDelivery")
+		self.profiler.add_task(self.taskMgr, self.update_lighting_task, "UpdateLightingTask")
+		if self.fleet:
+			self.profiler.add_task(self.taskMgr, self.update_fleet, "updateFleet")
+		self.profiler.do_method_later(self.taskMgr, 1.0, self.update_texture_budget, "updateTextureBudget")
+		self.taskMgr.doMethodLater(1.0, self.sample_telemetry, "sampleTelemetry")
 		
 		# Show the 3D world
 		self.render.show()
@@ -1038,10 +1137,11 @@ class MyApp(ShowBase):
 		"""
 		
 		# Add ground plane
-		self.add_ground()
+		with load_trace.phase("add_ground"):
+			self.add_ground()
 		
 		# Load and position ground model
-		self.scene = self.loader.loadModel("./assets/models/ground/ground.egg")
+		self.scene = load_model(self.loader, "./assets/models/ground/ground.egg")
 		self.scene.reparentTo(self.render)
 		self.scene.setScale(3)
 		self.scene.setPos(-8, 42, 0)
@@ -1049,12 +1149,19 @@ class MyApp(ShowBase):
 		# Setup road system
 		self.road_offset_start_x = -8
 		self.road_offset_start_y = -34
+		self.building_offset_start_x = -37
+		self.building_offset_start_y = -37
 		self.buildings_spacing = 60
+		self.spatial = self.build_spatial_index()
+		self.isochrones = IsochroneEngine(get_router(), self.buildings_spacing)
+		get_router().cache.counter = self.profiler.count	# Route cache hits and misses in the profiler overlay
 		self.closest_buildings = []
-		self.add_building_grid(g_map, self.buildings_spacing)
+		with load_trace.phase("add_building_grid"):
+			self.add_building_grid(g_map, self.buildings_spacing)
 		
 		# Add lighting
-		self.add_light_scene()
+		with load_trace.phase("add_light_scene"):
+			self.add_light_scene()
 	
 	def add_ground(self):
 		"""
@@ -1069,6 +1176,7 @@ class MyApp(ShowBase):
 		ground_np.node().addShape(shape)
 		ground_np.setPos(0, 0, 1)
 		ground_np.node().setMass(0)
+		set_collision_group(ground_np.node(), GROUND_GROUP)
 		self.world.attachRigidBody(ground_np.node())
 		
 	
@@ -1089,21 +1197,18 @@ class MyApp(ShowBase):
 		self.chassisNP.setPos(0, -5, 1.0)
 		self.chassisNP.node().setMass(self.vehicle_models[self.vehicle_model_idx]["mass"])
 		self.chassisNP.node().setDeactivationEnabled(False)
+		set_collision_group(self.chassisNP.node(), CAR_GROUP)
 		self.world.attachRigidBody(self.chassisNP.node())
+		self.pedestrian_hits = HitEvents(self.chassisNP.node(), self.npc_collision_group)
 		
 		# Visual model
-		car_model = self.loader.loadModel(self.vehicle_models[self.vehicle_model_idx]["file_path"])
-		car_model.clearModelNodes()
-		car_model.flattenStrong()
-		car_model.setShaderAuto()
-		car_model.reparentTo(self.chassisNP)
-		car_model.setScale(self.vehicle_models[self.vehicle_model_idx]["model_scale"])
+		car_model = self.vehicle_cache.instance(self.vehicle_model_idx, self.chassisNP)
 		car_model.setHpr(0, 0, 0)
 		car_model.setZ(0.5)
 		car_model.setColorScale(self.vehicle_color)
 		
 		# Car marker for minimap
-		arrow_tx = self.loader.loadTexture("./assets/images/arrow.png")
+		arrow_tx = self.textures.load("./assets/images/arrow.png")
 		cm = CardMaker("car_marker")
 		cm.setFrame(-0.5, 0.5, -0.5, 0.5)
 		self.car_marker = self.chassisNP.attachNewNode(cm.generate())
@@ -1162,7 +1267,8 @@ class MyApp(ShowBase):
 				
 				if count >= 0:
 					# Use built-in panda actor with walk animation
-					actor = Actor("panda", {"walk": "panda-walk"})   # Using built-in panda models because couldn't find an .egg model with a human
+					with load_trace.asset("panda"):
+						actor = Actor("panda", {"walk": "panda-walk"})   # Using built-in panda models because couldn't find an .egg model with a human
 					actor.setScale(0.25)
 					actor.reparentTo(self.render)
 					actor.loop("walk")  # Loop walking animation
@@ -1177,6 +1283,7 @@ class MyApp(ShowBase):
 					np_node.addShape(shape)
 					np_node.setMass(1.0)
 					np_node.setDeactivationEnabled(False)
+					set_collision_group(np_node, self.npc_collision_group)
 
 					np_np = self.render.attachNewNode(np_node)
 					np_np.setPos(actor.getPos())
@@ -1186,9 +1293,9 @@ class MyApp(ShowBase):
 					self.npcs.append({
 						'actor': actor,
 						'node': np_np,
-						'speed': random.uniform(6.5, 10.5),
-						'direction': random.choice([0, 90, 180, 270]),
-						'change_dir_timer': random.uniform(20, 30)
+						'speed': self.rng.uniform(6.5, 10.5),
+						'direction': self.rng.choice([0, 90, 180, 270]),
+						'change_dir_timer': self.rng.uniform(20, 30)
 					})
 					
 					count -= 1
@@ -1198,6 +1305,37 @@ class MyApp(ShowBase):
 		for i in range(count):
 			pass
 	
+	def setup_fleet(self, count):
+		"""
+		Create the autonomous delivery fleet and its dispatch. Every delivery house receives a stream of orders,
+		and the dispatcher sends idle vehicles to them on routes from the shared routing engine.
+		The fleet vehicles have no physics bodies.
+		
+		Params:
+		 - count (int): The number of fleet vehicles.
+		Returns: None
+		"""
+		self.fleet = Fleet(get_router(), count, self.buildings_spacing,
+						   (self.road_offset_start_x, self.road_offset_start_y), self.rng)
+		self.dispatcher = Dispatcher(get_router(), self.buildings_spacing)
+		self.order_stream = OrderStream(delivery_nodes(g_map), FLEET_ORDER_RATE, self.rng, start=globalClock.getFrameTime())
+		connect_fleet(self.dispatcher, self.fleet)
+		
+		# Nearby fleet vehicles are drawn with random car models, the others as points
+		self.fleet.attach(self.render, lambda holder: self.vehicle_cache.instance(self.rng.randrange(len(self.vehicle_models)), holder))
+	
+	
+	def build_spatial_index(self):
+		"""
+		Builds the position lookups of the current map (the car's cell, street and speed limit, gas stations
+		and delivery houses) used by the delivery, refuel, speeding, dashboard and autopilot logic.
+
+		Params: None
+		Returns:
+		 - SpatialIndex: The lookups.
+		"""
+		return SpatialIndex(g_map, ROAD_TYPES, self.buildings_spacing, (self.road_offset_start_x, self.road_offset_start_y),
+							(self.building_offset_start_x, self.building_offset_start_y))
 	
 	def add_building_grid(self, grid, spacing):
 		"""
@@ -1220,8 +1358,8 @@ class MyApp(ShowBase):
 		]
 		delivery_house = ("townhouse1/townhouse1.glb", 25, 0)
 		gas_station = ("rest_station/rest_station.egg", 0.04, 180)
-		start_x = -37
-		start_y = -37
+		start_x = self.building_offset_start_x
+		start_y = self.building_offset_start_y
 
 		for i in range(ROWS):
 			for j in range(COLUMNS):
@@ -1230,22 +1368,23 @@ class MyApp(ShowBase):
 				elif grid[i, j] == "+":
 					chosen = gas_station
 				else:
-					chosen = random.choice(buildings)
+					chosen = self.rng.choice(buildings)
 
 				model_path = "assets/models/" + chosen[0]
 				scale = chosen[1]
 				h = chosen[2]
 
 				dummy = NodePath("dummy")
-				building_model = self.loader.loadModel(model_path)
+				building_model = load_model(self.loader, model_path)
 				building_model.reparentTo(dummy)
 				building_model.setScale(scale)
 				building_model.setH(h)
 				building_model.setShaderAuto()
 
 				# Tight bounds
-				dummy.flattenStrong()  # Apply transforms
-				min_bound, max_bound = dummy.getTightBounds()
+				with load_trace.phase("flatten_bounds"):
+					dummy.flattenStrong()  # Apply transforms
+					min_bound, max_bound = dummy.getTightBounds()
 				size = (max_bound - min_bound) * 0.5  # half extents
 				center = (min_bound + max_bound) * 0.5
 				# Bullet collision
@@ -1257,6 +1396,7 @@ class MyApp(ShowBase):
 				building_node = BulletRigidBodyNode(f"Building_{i}_{j}")
 				building_node.setMass(0)
 				building_node.addShape(shape, TransformState.makePos(center))
+				set_collision_group(building_node, BUILDING_GROUP)
 
 				building_np = self.render.attachNewNode(building_node)
 				building_np.setPos(x, y, 0)
@@ -1264,7 +1404,7 @@ class MyApp(ShowBase):
 				
 				# Set a gas icon marker for the gas stations in the minimap
 				if grid[i, j] == "+":
-					gas_tx = loader.loadTexture("./assets/images/gas_icon.png")
+					gas_tx = self.textures.load("./assets/images/gas_icon.png")
 					cm = CardMaker("gas_marker")
 					cm.setFrame(-0.5, 0.5, -0.5, 0.5)
 					self.gas_marker = building_np.attachNewNode(cm.generate())
@@ -1279,8 +1419,10 @@ class MyApp(ShowBase):
 				self.world.attachRigidBody(building_node)
 				building_model.reparentTo(building_np)
 				self.game_elements.append(building_np)
+				self.textures.register_tile(building_np, (x, y))
 				
-		self.add_roads(grid, spacing)
+		with load_trace.phase("add_roads"):
+			self.add_roads(grid, spacing)
 	
 	def add_roads(self, grid, spacing):
 		"""
@@ -1294,13 +1436,13 @@ class MyApp(ShowBase):
 		"""
 		
 		# Load and prepare intersection model
-		intersection_model = self.loader.loadModel("./assets/models/roads_pack/intersection.glb")
+		intersection_model = load_model(self.loader, "./assets/models/roads_pack/intersection.glb")
 		intersection_model.clearModelNodes()
 		intersection_model.flattenStrong()
 		intersection_model.setShaderAuto()
 
 		# Load and prepare streetlight model
-		streetlight_model = self.loader.loadModel("./assets/models/streetlight/streetlight.glb")
+		streetlight_model = load_model(self.loader, "./assets/models/streetlight/streetlight.glb")
 		streetlight_model.clearModelNodes()
 		streetlight_model.flattenStrong()
 		streetlight_model.setShaderAuto()
@@ -1450,37 +1592,43 @@ class MyApp(ShowBase):
 			mayChange=True
 		)
 		
+		# Numeric readouts are drawn from a pre-baked glyph atlas (see hud_text.py),
+		# so a changing digit only rewrites texture coordinates instead of rebuilding text geometry
+		hud_atlas = get_glyph_atlas()
+		
 		# Shows countdown for current delivery
-		self.delivery_timer = OnscreenText(
-			text="",
-			pos=(-1.1, 0.12),
+		self.delivery_timer_label = OnscreenText(
+			text="Time Left:",
+			pos=(-1.085, 0.12),
 			fg=(0.8, 0.8, 0.8, 1),
 			scale=0.055,
-			align=TextNode.ACenter,
-			font=bold_font,
-			mayChange=True
+			align=TextNode.ARight,
+			font=bold_font
 		)
+		self.delivery_timer = HudText(hud_atlas, TIMER_READOUT.max_chars, aspect2d, pos=(-1.07, 0.12), scale=0.055, fg=(0.8, 0.8, 0.8, 1), align=TextNode.ALeft)
 		
 		# Shows the user's no. of successful deliveries
-		self.del_wins_text = OnscreenText(
-			text="",
+		self.del_wins_label = OnscreenText(
+			text="DEL",
 			pos=(-1.15, 0.0),
 			fg=(0.2, 0.7, 0.4, 1),
 			scale=0.05,
 			align=TextNode.ARight,
-			font=bold_font,
-			mayChange=True
+			font=bold_font
 		)
+		wins_label_width = self.del_wins_label.textNode.getWidth() * 0.05
+		self.del_wins_text = HudText(hud_atlas, COUNT_READOUT.max_chars, aspect2d, pos=(-1.16 - wins_label_width, 0.0), scale=0.05, fg=(0.2, 0.7, 0.4, 1), align=TextNode.ARight)
 		
 		# Shows the user's no. of failed deliveries
-		self.del_losses_text = OnscreenText(
-			text="",
-			pos=(-1.08, 0.0),
+		digit_width = hud_atlas.get_advance("0") / hud_atlas.pixel_size * 0.05
+		self.del_losses_text = HudText(hud_atlas, COUNT_READOUT.max_chars, aspect2d, pos=(-1.08 + digit_width, 0.0), scale=0.05, fg=(0.7, 0.2, 0.2, 1), align=TextNode.ARight)
+		self.del_losses_label = OnscreenText(
+			text="FAIL",
+			pos=(-1.07 + digit_width, 0.0),
 			fg=(0.7, 0.2, 0.2, 1),
 			scale=0.05,
 			align=TextNode.ALeft,
-			font=bold_font,
-			mayChange=True
+			font=bold_font
 		)
 		
 		### Speedometer Section ###
@@ -1496,6 +1644,9 @@ class MyApp(ShowBase):
 		self.speedometer_needle.reparentTo(self.needle_pivot)
 		self.speedometer_needle.setPos(0, 0, -0.1)
 		
+		# Digital speed readout on the dial
+		self.speed_text = HudText(hud_atlas, SPEED_READOUT.max_chars, aspect2d, pos=(-1.1, -0.85), scale=0.045, fg=(1, 1, 1, 1), align=TextNode.ACenter)
+		
 		### Fuel System Section ###
 		# Dial background and pivot node for needle rotation
 		self.fuelguage_dial = OnscreenImage(image="./assets/images/fuel_gauge/dial.png", pos=(-1.1, 0.35, -0.3), scale=0.2)
@@ -1511,15 +1662,7 @@ class MyApp(ShowBase):
 		
 		### Money Section ###
 		self.money_bar = OnscreenImage(image="./assets/images/money_bar.png", pos=(-1.1, 0.35, 0.85), scale=(0.2, 0.1, 0.07))
-		self.money_text = OnscreenText(
-			text=f"${self.money:.2f}",
-			pos=(-1.2, 0.83),
-			fg=(0.3, 0.1, 0.0, 1),
-			scale=0.055,
-			align=TextNode.ALeft,
-			font=bold_font,
-			mayChange=True
-		)
+		self.money_text = HudText(hud_atlas, MONEY_READOUT.max_chars, aspect2d, pos=(-1.2, 0.83), scale=0.055, fg=(0.3, 0.1, 0.0, 1), align=TextNode.ALeft, text=MONEY_READOUT(self.money))
 		
 		
 		### Autopilot Control Section ###
@@ -1529,7 +1672,8 @@ class MyApp(ShowBase):
 			pos=(1.0, 0, -0.9),
 			frameColor=(1, 0, 0, 1),
 			text_fg=(1, 1, 1, 1),
-			command=self.activate_autopilot_assist
+			command=self.run_action,
+			extraArgs=["autopilot"]
 		)
 		
 		### Overspeeding Section ###
@@ -1552,13 +1696,62 @@ class MyApp(ShowBase):
 		)
 		self.speeding_text.hide()
 		
-		self.game_elements.extend([self.speeding_box, self.speeding_text, self.autopilot_button, self.money_text, self.money_bar, self.fuelguage_needle, self.fuelguage_dial, self.ui_bg, self.ui_text, self.delivery_text, self.delivery_timer, self.del_wins_text, self.del_losses_text])
+		self.game_elements.extend([self.speeding_box, self.speeding_text, self.autopilot_button, self.money_text, self.money_bar, self.fuelguage_needle, self.fuelguage_dial, self.ui_bg, self.ui_text, self.delivery_text, self.delivery_timer_label, self.delivery_timer, self.del_wins_label, self.del_wins_text, self.del_losses_text, self.del_losses_label, self.speed_text])
+		
+		### Change tracking ###
+		# Each widget only re-renders when the value bound to it changes
+		self.dashboard = DashboardModel()
+		self.dashboard.bind_text("street", self.ui_text, self.format_street_info)
+		self.dashboard.bind_text("delivery", self.delivery_text, self.format_delivery_info)
+		self.dashboard.bind_text("timer", self.delivery_timer, TIMER_READOUT)
+		self.dashboard.bind_text("wins", self.del_wins_text, COUNT_READOUT)
+		self.dashboard.bind_text("losses", self.del_losses_text, COUNT_READOUT)
+		self.dashboard.bind_text("money", self.money_text, MONEY_READOUT)
+		self.dashboard.bind_text("speed_readout", self.speed_text, SPEED_READOUT)
+		self.dashboard.bind_needle("speed", self.needle_pivot, 0.5)
+		self.dashboard.bind_needle("fuel", self.fgneedle_pivot, 0.25)
+	
+	def format_street_info(self, cell):
+		"""
+		Formats the road information shown on the dashboard for the grid cell the car is in.
+
+		Params:
+		 - cell (tuple[int, int]): The (row, column) intersection the car is on.
+		Returns:
+		 - str: The street name and speed limit text.
+		"""
+		street_num = self.spatial.street_idx(cell) + 1
+		street_speedlim = self.spatial.speed_limit(cell)
+		return f"{ordinal(street_num)} Avenue\n\nSpeed Limit:\n{street_speedlim} kmph"
+	
+	def format_delivery_info(self, delivery):
+		"""
+		Formats the current delivery mission (address and reward) shown on the dashboard.
+
+		Params:
+		 - delivery (tuple): The (target, reward, code) of the current mission, where target is the
+							 (row, column) of the delivery house and code is the label of the car's cell.
+		Returns:
+		 - str: The mission text.
+		"""
+		(r, c), reward, code = delivery
+		
+		if 0 <= r < ROWS - 1 and 0 <= c < COLUMNS - 1: 
+			street_name = f"{r+c+r*c+1}{code} {ordinal(self.spatial.street_idx((r, c)) + 1)} Avenue"
+		else:
+			street_name = f"{r+c+r*c+1}E Merivale Rd."
+		
+		return (
+			f"\n\nMission Delivery:\n"
+			f"{street_name}\n"
+			f"Reward: ${reward}\n"
+		)
 	
 	def start_new_delivery(self):
 		"""
 		Start a new delivery mission.
 
-		Selects a random delivery target location from the available grid cells,
+		Selects a random delivery house from the map's label index (see rules.pick_delivery_target),
 		calculates the time allotted for the delivery based on distance,
 		and determines the reward for successful completion.
 		It also increments the total delivery count.
@@ -1567,19 +1760,17 @@ class MyApp(ShowBase):
 		Returns: None
 		"""
 
-		delivery_points = [(i, j) for i in range(ROWS-1) for j in range(COLUMNS-1) if g_map[i, j].isalpha()]
-		self.delivery_target = random.choice(delivery_points)
+		self.delivery_target = rules.pick_delivery_target(g_map, self.rng)
 		
 		car_pos = self.chassisNP.getPos()
-		col = round((car_pos.getX() - self.road_offset_start_x) / self.buildings_spacing)
-		row = round((car_pos.getY() - self.road_offset_start_y) / self.buildings_spacing)
-		dist_factor = sqrt((self.delivery_target[0] - row)**2 + (self.delivery_target[1] - col)**2)
-		max_dist_factor = sqrt(ROWS**2 + COLUMNS**2) 
+		cell = self.spatial.cell_of(car_pos.getX(), car_pos.getY())
 		
-		self.delivery_time_given = 45 + 75 * dist_factor/max_dist_factor # seconds
+		self.delivery_time_given = rules.delivery_time_given(self.delivery_target, cell, ROWS, COLUMNS) # seconds
 		self.delivery_time_left = self.delivery_time_given
-		self.delivery_reward = random.choice([20, 30, 40])
+		self.delivery_reward = self.rng.choice(rules.DELIVERY_REWARDS)
 		self.total_delivery_count += 1
+		self.telemetry.event("delivery_start", target=self.delivery_target, reward=self.delivery_reward,
+							 time_given=round(self.delivery_time_given, 2))
 	
 	def complete_delivery(self):
 		"""
@@ -1594,21 +1785,19 @@ class MyApp(ShowBase):
 		Returns: None
 		"""
 		
-		row, col = self.delivery_target
 		car_pos = self.chassisNP.getPos()
-		c = round((car_pos.getX() - self.road_offset_start_x) / self.buildings_spacing)
-		r = round((car_pos.getY() - self.road_offset_start_y) / self.buildings_spacing)
 
-		if (r, c) == (row, col) or (r, c) == (row - 1, col) or (r, c) == (row, col - 1) or (r, c) == (row + 1, col) or (r, c) == (row, col + 1):
-			if self.successful_delivery_count >= 4:
+		if rules.at_target(self.spatial.cell_of(car_pos.getX(), car_pos.getY()), self.delivery_target):
+			if self.successful_delivery_count >= rules.WIN_DELIVERIES - 1:
 				loss_reason = None
 				self.switch_screen("win")
 				return
 			self.money += self.delivery_reward
 			self.successful_delivery_count += 1
-			rating_score = self.delivery_time_left / (0.4*self.delivery_time_given) * 5
-			if rating_score > 5: rating_score = 5
+			rating_score = rules.rating(self.delivery_time_left, self.delivery_time_given)
 			self.delivery_scores.append(rating_score)
+			self.telemetry.event("delivery_complete", target=self.delivery_target, reward=self.delivery_reward,
+								 time_left=round(self.delivery_time_left, 2), rating=round(rating_score, 2))
 			
 			# Show delivery success alert
 			self._show_warning_timer = 4.0
@@ -1628,7 +1817,7 @@ class MyApp(ShowBase):
 			self.speeding_text.show()
 			self._is_flashing_on = True
 	
-	def refuel(self, grid):
+	def refuel(self):
 		"""
 		Refuel the vehicle at gas stations.
 
@@ -1636,26 +1825,15 @@ class MyApp(ShowBase):
 		If the player doesn't have enough money, fuels based on remaining money.
 		Displays a success or insufficient funds message.
 
-		Params:
-		 - grid (ManhattanGrid): The 2D grid map, used to identify gas station locations.
+		Params: None
 		Returns: None
 		"""
 		
 		car_pos = self.chassisNP.getPos()
-		col = round((car_pos.getX() - self.road_offset_start_x) / self.buildings_spacing)
-		row = round((car_pos.getY() - self.road_offset_start_y) / self.buildings_spacing)
-		
-		if '+' in (grid[row-1, col-1], grid[row-1, col], grid[row-1, col+1], grid[row, col-1], grid[row, col], grid[row, col+1]):
-			fuel_price = 20 * (100.0 - self.fuel_level) / 100
-			if self.money < fuel_price:   # if player lacks enough money, then refueling amount is based on remaining money.
-				# Show refueling failure alert
-				increaseable_fuel =  100.0 - 100 * fuel_price / 20
-				fuel_price = self.money
-				self.money = 0
-				self.fuel_level += increaseable_fuel
-			else:
-				self.money -= fuel_price
-				self.fuel_level = 100.0
+		
+		if self.spatial.can_refuel(self.spatial.cell_of(car_pos.getX(), car_pos.getY())):
+			fuel_price, self.fuel_level, self.money = rules.refuel(self.fuel_level, self.money)
+			self.telemetry.event("refuel", cost=round(fuel_price, 2), fuel_level=round(self.fuel_level, 2), money=round(self.money, 2))
 				
 			# Show refueling success alert
 			self._show_warning_timer = 3.0
@@ -1672,8 +1850,7 @@ class MyApp(ShowBase):
 
 		If the autopilot has not been used yet and the player has enough money ($40),
 		it deducts the cost, sets the autopilot status, updates the UI button,
-		finds the shortest time path to the delivery target using Dijkstra's algorithm,
-		and starts the autopilot driving task.
+		and starts driving to the delivery target (see start_autopilot).
 		
 		Params: None
 		Returns: None
@@ -1693,54 +1870,45 @@ class MyApp(ShowBase):
 			self.autopilot_button['state'] = DGG.DISABLED
 		
 		
-		def find_shortest_time_path(car_pos, goal):
-			"""
-			Finds the shortest time path from the car's current grid position to a goal grid position
-			using Dijkstra's algorithm.
-
-			Params:
-			 - car_pos (Point3): The current 3D position of the car.
-			 - goal (tuple[int, int]): The (row, column) coordinates of the target destination.
-
-			Returns:
-			 - list[tuple[int, int]]: A list of (row, column) tuples representing the path
-										from start to goal, or an empty list if no path is found.
-			"""
-			col = round((car_pos.getX() - self.road_offset_start_x) / self.buildings_spacing)
-			row = round((car_pos.getY() - self.road_offset_start_y) / self.buildings_spacing)
-			start = (row, col)
-
-			visited = set()  # To track visited positions thus far
-			pq = PriorityQueue()
-			pq.put((0, start, []))
-
-			while not pq.empty():
-				time_cost, current, path = pq.get()
-				if current in visited:
-					continue
-				visited.add(current)
-				
-				if current == goal:
-					return path + [current]
-
-				r, c = current
-				for dr, dc in [(-1,0),(1,0),(0,-1),(0,1)]:
-					nr, nc = r + dr, c + dc
-					if 0 <= nr < ROWS - 1 and 0 <= nc < COLUMNS - 1:
-						ch = g_map.roadisx_get(nr, nc)
-						if ch and ch in ROAD_TYPES:
-							speed = ROAD_TYPES[ch]
-							time = 1 / speed  # inverse of speed
-							pq.put((time_cost + time, (nr, nc), path + [current]))
-			return []
-
-		# Pathfinding
-		path = find_shortest_time_path(self.chassisNP.getPos(), self.delivery_target)
-		
-		if path:
-			self.auto_drive_path = path
-			self.taskMgr.add(self.autopilot_drive_task, "autopilotDriveTask")
-			
+		if self.start_autopilot():
+			self.profiler.add_task(self.taskMgr, self.autopilot_drive_task, "autopilotDriveTask")
+	
+	def start_autopilot(self):
+		"""
+		Plans the shortest time path from the car to the delivery target with an incremental planner (D* Lite),
+		and the trajectory the autopilot follows along it.
+		
+		Params: None
+		Returns:
+		 - bool: True if the delivery target can be reached.
+		"""
+		
+		car_pos = self.chassisNP.getPos()
+		self.auto_route = DStarLite(get_router(), self.spatial.cell_of(car_pos.getX(), car_pos.getY()),
+									rules.delivery_cell(self.delivery_target, ROWS, COLUMNS))
+		return self.plan_autopilot_trajectory()
+	
+	def plan_autopilot_trajectory(self):
+		"""
+		Builds the autopilot's trajectory from the car's position along the planner's current path,
+		with a speed profile from the streets' speed limits and the corners.
+		
+		Params: None
+		Returns:
+		 - bool: True if there is a path to follow.
+		"""
+		
+		path = self.auto_route.path()
+		if not path:
+			self.auto_pilot = None
+			return False
+		
+		car_pos = self.chassisNP.getPos()
+		points = [(self.road_offset_start_x + c * self.buildings_spacing, self.road_offset_start_y + r * self.buildings_spacing) for r, c in path]
+		limits = [self.spatial.speed_limit(cell) for cell in path]
+		self.auto_pilot = PurePursuit(build_trajectory((car_pos.getX(), car_pos.getY()), points, limits))
+		return True
+	
 	
 	# =============================================
 	# Gameplay Task Methods
@@ -1763,73 +1931,104 @@ class MyApp(ShowBase):
 			return Task.cont
 		
 		dt = globalClock.getDt()
-		self.world.doPhysics(dt, 10, 1.0 / 180.0)
+		with self.profiler.section("physics"):
+			self.world.doPhysics(dt, 10, 1.0 / 180.0)
 		
 				
 		# Handle car movement
-		force = self.vehicle_models[self.vehicle_model_idx]["mass"] * self.vehicle_models[self.vehicle_model_idx]["acceleration"]
-		max_turn = 30 + 25 * self.vehicle_models[self.vehicle_model_idx]["handling_coeff"]
-		velocity = self.chassisNP.node().getLinearVelocity()
-		speed = velocity.length()
-		forward = self.chassisNP.getQuat().getForward()
-
-		if self.key_map["forward"]:
-			self.chassisNP.node().applyCentralForce(forward * force)
-		elif self.key_map["backward"]:
-			self.chassisNP.node().applyCentralForce(-forward * force)
-		elif self.key_map["brake"]:
-			brake_strength = 0.1 * self.vehicle_models[self.vehicle_model_idx]["handling_coeff"]
-			self.chassisNP.node().setLinearVelocity(velocity * (1 - brake_strength))
-
-		if speed > 1.0:
-			turn = max_turn * dt
-			if self.key_map["left"]:
-				self.chassisNP.setH(self.chassisNP.getH() + turn)
-			elif self.key_map["right"]:
-				self.chassisNP.setH(self.chassisNP.getH() - turn)
-				
+		speed = rules.drive(self.chassisNP, self.key_map, self.vehicle_models[self.vehicle_model_idx], dt)
 				
 		# Update NPCs
+		with self.profiler.section("npcs"):
+			self.update_npcs(dt)
+				
+		# Check for car-NPC collisions
+		self.check_pedestrian_hits(speed)
+		
+		return Task.cont
+	
+	def update_fleet(self, task):
+		"""
+		Dispatch the new orders, step every fleet vehicle and move the fleet's visuals (one batched task for the whole fleet).
+
+		Params:
+		 - task (Task.Task): The Panda3D task object.
+		Returns:
+		 - int: Task.cont to continue the task.
+		"""
+		if self.game_state != 'game':
+			return Task.cont
+		
+		now = globalClock.getFrameTime()
+		self.dispatcher.tick(now, self.order_stream.poll(now))
+		self.fleet.step(globalClock.getDt())
+		self.fleet.update_render(self.camera.getPos(self.render))
+		return Task.cont
+	
+	def update_npcs(self, dt):
+		"""
+		Move the NPCs for one frame: occasionally pick a new walking direction, set the physics
+		velocity, and sync the actor to its physics body.
+
+		Params:
+		 - dt (float): The frame time step in seconds.
+		Returns: None
+		"""
 		for npc in self.npcs:
 			# Change direction occasionally
 			npc['change_dir_timer'] -= dt
 			if npc['change_dir_timer'] <= 0:
-				npc['direction'] = random.uniform(0, 360)
-				npc['change_dir_timer'] = random.uniform(2, 5)
-			
+				npc['direction'] = self.rng.uniform(0, 360)
+				npc['change_dir_timer'] = self.rng.uniform(2, 5)
+		
 			# Move NPC
 			rad = radians(npc['direction'])
 			move_vec = Vec3(sin(rad), cos(rad), 0) * npc['speed']
 			npc['node'].node().setLinearVelocity(move_vec)
-			
+		
 			# Update actor position and rotation to match physics
 			npc['actor'].setPos(npc['node'].getPos())
 			npc['actor'].setH(npc['direction'] + 180)  # Face direction of movement
-			
+		
 			# Simple animation
 			if hasattr(npc['actor'], 'loop'):
 				npc['actor'].loop('walk')
-				
-		# Check for car-NPC collisions
+	
+	def on_contact_added(self, node0, node1):
+		"""
+		Handles Bullet's event for a new contact point, queueing it if the car hit an NPC.
+
+		Params:
+		 - node0 (PandaNode): One body of the contact.
+		 - node1 (PandaNode): The other body.
+		Returns: None
+		"""
+		if self.pedestrian_hits is not None:
+			self.pedestrian_hits.on_contact(node0, node1)
+	
+	def check_pedestrian_hits(self, speed):
+		"""
+		Drain the car's NPC hits queued since the last frame (see on_contact_added), fining the player
+		for a pedestrian hit (at most once every 3 seconds).
+
+		Params:
+		 - speed (float): The current speed of the car (for telemetry).
+		Returns: None
+		"""
+		hits = self.pedestrian_hits.drain()  # Always drained, so hits during the cooldown are not fined later
 		current_time = globalClock.getFrameTime()
-		if current_time - self.last_fine_time > 3.0:  # Limit to 1 fine per 3 seconds.
-			car_node = self.chassisNP.node()
-			for npc in self.npcs:
-				result = self.world.contactTestPair(car_node, npc['node'].node())
-				if result.getNumContacts() > 0:
-					self.money -= 20  # Fine for hitting pedestrian
-					self.last_fine_time = current_time
-					
-					# Show hit warning
-					self._show_warning_timer = 2.0
-					self.speeding_box.setColor(1, 0, 0, 0.5)
-					self.speeding_box.show()
-					self.speeding_text.setText("PEDESTRIAN HIT!\n$20 Fine Issued\nGeez.. who gave you a license!")
-					self.speeding_text.show()
-					self._is_flashing_on = True
-					break
-		
-		return Task.cont
+		if hits and current_time - self.last_fine_time > rules.PEDESTRIAN_FINE_COOLDOWN:  # Limit to 1 fine per 3 seconds.
+			self.money -= rules.PEDESTRIAN_FINE  # Fine for hitting pedestrian
+			self.last_fine_time = current_time
+			self.telemetry.event("fine", reason="pedestrian_hit", amount=rules.PEDESTRIAN_FINE, speed=round(speed, 2))
+			
+			# Show hit warning
+			self._show_warning_timer = 2.0
+			self.speeding_box.setColor(1, 0, 0, 0.5)
+			self.speeding_box.show()
+			self.speeding_text.setText(f"PEDESTRIAN HIT!\n${rules.PEDESTRIAN_FINE} Fine Issued\nGeez.. who gave you a license!")
+			self.speeding_text.show()
+			self._is_flashing_on = True
 	
 	
 	def update_camera(self, task):
@@ -1846,7 +2045,7 @@ class MyApp(ShowBase):
 		"""
 		dt = globalClock.getDt()
 
-		if self.mouseWatcherNode.hasMouse() and self.is_dragging and self.last_mouse_pos is not None:
+		if self.mouseWatcherNode and self.mouseWatcherNode.hasMouse() and self.is_dragging and self.last_mouse_pos is not None:
 			current_mouse = self.mouseWatcherNode.getMouse()
 			current_pos = Vec2(current_mouse.getX(), current_mouse.getY())
 			delta = current_pos - self.last_mouse_pos
@@ -1905,9 +2104,80 @@ class MyApp(ShowBase):
 		if self.minimap_frame_count % 3 == 0:  # every 3 frames
 			car_pos = self.chassisNP.getPos()
 			self.minimap_root.setPos(car_pos.getX(), car_pos.getY(), 200)
+			if self.fuel_overlay_enabled:
+				self.update_fuel_overlay()
 			
 		return Task.cont
 	
+	def toggle_fuel_overlay(self):
+		"""
+		Shows or hides the fuel range overlay on the minimap.
+		
+		Params: None
+		Returns: None
+		"""
+		self.fuel_overlay_enabled = not self.fuel_overlay_enabled
+		if not self.fuel_overlay_enabled:
+			self.remove_fuel_overlay()
+	
+	def remove_fuel_overlay(self):
+		"""
+		Removes the fuel range overlay from the scene (it is drawn again on the next update if enabled).
+		
+		Params: None
+		Returns: None
+		"""
+		if self.fuel_overlay:
+			self.fuel_overlay.removeNode()
+		self.fuel_overlay = None
+		self.fuel_overlay_key = None
+	
+	def update_fuel_overlay(self):
+		"""
+		Draws the intersections the car can reach with the fuel left (from the cached isochrone of the car's
+		intersection) on the minimap, green where plenty of fuel would be left and red where it would run out.
+		It is only redrawn when the car's intersection, vehicle or whole fuel percent changes.
+		
+		Params: None
+		Returns: None
+		"""
+		car_pos = self.chassisNP.getPos()
+		cell = self.spatial.cell_of(car_pos.getX(), car_pos.getY())
+		if not self.spatial.on_map(cell):
+			return
+		fuel_consumption = self.vehicle_models[self.vehicle_model_idx]["fuel_consumption"]
+		key = (cell, fuel_consumption, int(self.fuel_level))
+		if key == self.fuel_overlay_key:
+			return
+		self.remove_fuel_overlay()
+		self.fuel_overlay_key = key
+		
+		reachable = self.isochrones.reachable(cell, fuel_consumption, self.fuel_level)
+		vdata = GeomVertexData("fuel_range", GeomVertexFormat.getV3c4(), Geom.UHStatic)
+		vdata.setNumRows(4 * len(reachable))
+		vertex = GeomVertexWriter(vdata, "vertex")
+		color = GeomVertexWriter(vdata, "color")
+		triangles = GeomTriangles(Geom.UHStatic)
+		half = self.buildings_spacing * 0.4
+		for k, ((r, c), cost) in enumerate(reachable.items()):
+			x = self.road_offset_start_x + c * self.buildings_spacing
+			y = self.road_offset_start_y + r * self.buildings_spacing
+			left = 1 - cost / max(self.fuel_level, 1e-6)	# Fraction of the fuel that would be left there
+			for dx, dy in ((-half, -half), (half, -half), (half, half), (-half, half)):
+				vertex.addData3(x + dx, y + dy, 90)	# High above the street, facing up like the other minimap markers
+				color.addData4(1 - left, left, 0, 0.45)
+			triangles.addVertices(4 * k, 4 * k + 1, 4 * k + 2)
+			triangles.addVertices(4 * k, 4 * k + 2, 4 * k + 3)
+		geom = Geom(vdata)
+		geom.addPrimitive(triangles)
+		node = GeomNode("fuel_range_overlay")
+		node.addGeom(geom)
+		
+		self.fuel_overlay = self.render.attachNewNode(node)
+		self.fuel_overlay.setTransparency(TransparencyAttrib.MAlpha)
+		self.fuel_overlay.setLightOff()
+		self.fuel_overlay.setShaderOff()
+	
 	def update_dashboard(self, task):
 		"""
 		Update dashboard information
@@ -1925,58 +2195,29 @@ class MyApp(ShowBase):
 			return Task.cont
 		
 		car_pos = self.chassisNP.getPos()
-		col = round((car_pos.getX() - self.road_offset_start_x) / self.buildings_spacing)
-		row = round((car_pos.getY() - self.road_offset_start_y) / self.buildings_spacing)
-		
-		def ordinal(n):
-			"""
-			Convert number to ordinal (1st, 2nd, etc.)
-			Params:
-			 - n (int): The integer to convert.
-			Returns:
-			 - str: The ordinal string (e.g., "1st", "2nd").
-			"""
-			if 11 <= (n % 100) <= 13:
-				suffix = 'th'
-			else:
-				suffix = ['th', 'st', 'nd', 'rd', 'th'][min(n % 10, 4)]
-			return str(n) + suffix
-		
-		street_info = "1755 Merivale Rd\n\nINF SPEED"
+		row, col = self.spatial.cell_of(car_pos.getX(), car_pos.getY())
 		
-		if 0 <= row < ROWS - 1 and 0 <= col < COLUMNS - 1: 
-			street_num = g_map.get_street_idx((row, col)) + 1
-			street_speedlim = ROAD_TYPES[g_map.roadisx_get(row, col)]
-			self.ui_text.setText(f"{ordinal(street_num)} Avenue\n\nSpeed Limit:\n{street_speedlim} kmph")
+		# Widgets are only re-rendered when their bound value changes (see dashboard.py)
+		if self.spatial.on_map((row, col)):
+			self.dashboard.set("street", (row, col))
 			
 		if self.delivery_target:
 			r, c = self.delivery_target
-			
-			if 0 <= r < ROWS - 1 and 0 <= c < COLUMNS - 1: 
-				code = g_map[row, col]
-				street_name = f"{r+c+r*c+1}{code} {ordinal(g_map.get_street_idx((r, c)) + 1)} Avenue"
-			else:
-				street_name = f"{r+c+r*c+1}E Merivale Rd."
-			
-			self.delivery_text.setText(
-				f"\n\nMission Delivery:\n"
-				f"{street_name}\n"
-				f"Reward: ${self.delivery_reward}\n"
-			)
-			self.delivery_timer.setText(f"Time Left: {int(self.delivery_time_left)} s")
+			code = g_map[row, col] if 0 <= r < ROWS - 1 and 0 <= c < COLUMNS - 1 else None
+			self.dashboard.set("delivery", (self.delivery_target, self.delivery_reward, code))
+			self.dashboard.set("timer", int(self.delivery_time_left))
 		
-		self.del_wins_text.setText(f"{self.successful_delivery_count} DEL")
-		self.del_losses_text.setText(f"{self.total_delivery_count - 1 - self.successful_delivery_count} FAIL")
+		self.dashboard.set("wins", self.successful_delivery_count)
+		self.dashboard.set("losses", self.total_delivery_count - 1 - self.successful_delivery_count)
 		
 		# Speedometer:
 		velocity = self.chassisNP.node().getLinearVelocity()
 		speed = velocity.length()
-		angle = speed * 3 + 15
-		self.needle_pivot.setR(angle)	# Rotate pivot (needle rotates around pivot)
+		self.dashboard.set("speed", speed * 3 + 15)	# Rotate pivot (needle rotates around pivot)
+		self.dashboard.set("speed_readout", int(speed))
 		
 		# Fuel consumption
-		base_consumption = 2 * self.vehicle_models[self.vehicle_model_idx]["fuel_consumption"]
-		fuel_used = speed * self.vehicle_models[self.vehicle_model_idx]["fuel_consumption"] + base_consumption
+		fuel_used = rules.fuel_used(speed, self.vehicle_models[self.vehicle_model_idx]["fuel_consumption"])
 		self.fuel_level = max(0, self.fuel_level - fuel_used)
 
 		# If out of fuel, stop car by preventing movement
@@ -1987,10 +2228,10 @@ class MyApp(ShowBase):
 		# Fuel Guage:
 		min_angle, max_angle = (90, 270)
 		angle = max_angle - (1 - self.fuel_level/100) * (max_angle-min_angle)
-		self.fgneedle_pivot.setR(angle)	# Rotate pivot (needle rotates around pivot)
+		self.dashboard.set("fuel", angle)	# Rotate pivot (needle rotates around pivot)
 		
 		# Money display
-		self.money_text.setText(f"${self.money:.2f}")
+		self.dashboard.set("money", round(self.money, 2))
 		
 		return Task.cont
 	
@@ -2015,27 +2256,27 @@ class MyApp(ShowBase):
 		car_speed = car_velocity.length()
 
 		car_pos = self.chassisNP.getPos()
-		col = round((car_pos.getX() - self.road_offset_start_x) / self.buildings_spacing)
-		row = round((car_pos.getY() - self.road_offset_start_y) / self.buildings_spacing)
+		row, col = self.spatial.cell_of(car_pos.getX(), car_pos.getY())
 
 		dt = globalClock.getDt()
 
 		if not hasattr(self, 'speeding_timer'):
 			self.speeding_timer = 0.0
 
-		if 0 <= row < ROWS - 1 and 0 <= col < COLUMNS - 1:
-			street_speedlim = ROAD_TYPES[g_map.roadisx_get(row, col)]
-
+		street_speedlim = self.spatial.speed_limit((row, col))
+		if street_speedlim is not None:
 			if car_speed > street_speedlim:
 				self.speeding_timer += dt
 
-				if self.speeding_timer >= 3.0:
-					self.money -= 5
+				if self.speeding_timer >= rules.SPEEDING_GRACE:
+					self.money -= rules.SPEEDING_FINE
 					self.speeding_timer = 0.0
+					self.telemetry.event("fine", reason="speeding", amount=rules.SPEEDING_FINE, speed=round(car_speed, 2),
+										 speed_limit=street_speedlim, cell=(row, col))
 
 					# Trigger warning box and timer
 					self._show_warning_timer = 3.0  # Show for 3 seconds
-					self.speeding_text.setText("OVERSPEEDING!\n$5 Fine Issued")
+					self.speeding_text.setText(f"OVERSPEEDING!\n${rules.SPEEDING_FINE} Fine Issued")
 					self.speeding_box.setColor(1, 0, 0, 0.5)
 					self.speeding_box.show()
 					self.speeding_text.show()
@@ -2083,11 +2324,11 @@ class MyApp(ShowBase):
 		self.delivery_time_left -= dt
 		
 		# player loses if they deplete fuel, accumulate 4 failures, or go bankrupt (lose all of their money and more)
-		if self.fuel_level <= 0 or self.total_delivery_count - self.successful_delivery_count >= 4 or self.money < 0:
+		if rules.is_game_lost(self.fuel_level, self.total_delivery_count - self.successful_delivery_count, self.money):
 			self.switch_screen("loss")
 			self.loss_reason = "Ran out of fuel!"
 			return Task.done
-		if self.total_delivery_count - self.successful_delivery_count >= 4:
+		if self.total_delivery_count - self.successful_delivery_count >= rules.MAX_FAILURES:
 			self.switch_screen("loss")
 			self.loss_reason = "Too many delivery failures!"
 			return Task.done
@@ -2099,6 +2340,7 @@ class MyApp(ShowBase):
 		
 		if self.delivery_time_left <= 0:
 			self.delivery_scores.append(0)
+			self.telemetry.event("delivery_failed", target=self.delivery_target, reward=self.delivery_reward)
 			self.start_new_delivery()			
 			# Show delivery failure alert
 			self._show_warning_timer = 3.0
@@ -2203,14 +2445,102 @@ class MyApp(ShowBase):
 
 		return Task.cont
 	
+	def update_texture_budget(self, task):
+		"""
+		Keep the uploaded city textures within the video memory budget.
+
+		Runs once per second; textures of tiles near the car are kept, and the least recently
+		used textures of distant tiles are released if the budget is exceeded.
+
+		Params:
+		 - task (Task.Task): The Panda3D task object.
+		Returns:
+		 - int: Task.again to run again after the delay.
+		"""
+		if self.game_state != "game":
+			return Task.again
+		
+		car_pos = self.chassisNP.getPos()
+		self.textures.update((car_pos.getX(), car_pos.getY()), self.win.getGsg() if self.win else None)
+		return Task.again
+	
+	def finish_load_trace(self, task):
+		"""
+		Task that ends the load trace once the first gameplay frame has been rendered: writes the trace,
+		reports the phase totals to the telemetry sink and warns about phases over the load budget (load_budget.json).
+		
+		Params:
+		 - task (Task): The Panda3D task object.
+		Returns:
+		 - Task.done: The task runs once.
+		"""
+		if load_trace.session is None:
+			return Task.done
+		load_trace.pop()  # first_frame
+		path = self.load_trace_path or os.path.join(TRACE_DIR, time.strftime("loadtrace-%Y%m%d-%H%M%S.json"))
+		load_trace.write(path)
+		self.load_trace_summary = load_trace.end()
+		
+		self.telemetry.event("load_trace", total_ms=round(self.load_trace_summary["total_ms"], 1),
+							 phases={name: round(phase["ms"], 1) for name, phase in self.load_trace_summary["phases"].items()})
+		for failure in check_budget(self.load_trace_summary, load_budget()):
+			print(f"Load budget exceeded: {failure} (trace: {path})")
+		return Task.done
+	
+	def sample_telemetry(self, task):
+		"""
+		Record one performance sample per second: frame, physics, update and render times
+		over the frames since the previous sample, the NPC count and the number of active lights.
+
+		Params:
+		 - task (Task.Task): The Panda3D task object.
+		Returns:
+		 - int: Task.again to run again after the delay.
+		"""
+		if self.game_state != "game":
+			return Task.again
+		
+		sample = {}
+		for name in ("frame", "physics", "update", "render"):
+			timer = self.profiler.timer(name)
+			new_calls = timer.calls - self.telemetry_calls.get(name, 0)
+			self.telemetry_calls[name] = timer.calls
+			stats = timer.stats(last=new_calls)
+			sample[f"{name}_ms"] = round(stats["mean"], 3)
+			sample[f"{name}_p95_ms"] = round(stats["p95"], 3)
+			if name == "frame":
+				sample["frames"] = new_calls
+		if self.fleet:
+			dispatch = self.dispatcher.stats()
+			sample["fleet_deliveries"] = dispatch["delivered"]
+			sample["orders_pending"] = dispatch["pending"]
+			sample["dispatch_latency_p95"] = round(dispatch["latency_p95"], 2)
+		lights = self.render.getAttrib(LightAttrib)
+		self.telemetry.sample(npcs=len(self.npcs), lights=lights.getNumOnLights() if lights else 0, **sample)
+		return Task.again
+	
+	def profiler_extra_lines(self):
+		"""
+		Extra lines for the profiler overlay: the texture memory use.
+
+		Params: None
+		Returns:
+		 - list[str]: The lines to show below the timings.
+		"""
+		report = self.textures.report(self.win.getGsg() if self.win else None)
+		return [f"textures {report['resident']}/{report['managed']} resident, "
+				f"{report['resident_bytes'] / 2**20:.1f}/{report['budget_bytes'] / 2**20:.0f} MB, "
+				f"{report['evictions']} evicted"]
+	
 	# Autopilot drive task		
 	def autopilot_drive_task(self, task):
 		"""
 		Panda3D task for controlling the car using autopilot.
 
-		This task guides the car along a pre-calculated path to the delivery target.
-		It calculates the required turning direction to align with the next path segment
-		and applies force to move the car while respecting speed limits.
+		This task follows the planned trajectory with a pure pursuit controller: it steers towards
+		a point ahead on the trajectory and drives at the trajectory's precomputed speed, which
+		respects the street speed limits and slows down for corners, so the car never stops to turn.
+		If the car is pushed away from the trajectory, the path is repaired from the car's cell.
 		The autopilot can be interrupted by the 'escape' key.
 
 		Params:
@@ -2219,73 +2549,38 @@ class MyApp(ShowBase):
 		 - int: Task.cont to continue the task, Task.done to stop it.
 		"""
 		
-		if not hasattr(self, 'auto_drive_path') or not self.auto_drive_path:
+		if not getattr(self, 'auto_pilot', None):
 			return Task.done
 			
 		if self.key_map["escape"]:
 			print("Autopilot interrupted by Escape key.")
 			self.chassisNP.node().setLinearVelocity(Vec3(0, 0, 0))  # stop car movement
 			self.key_map["escape"] = False  # reset key state
+			self.auto_pilot = None
 			return Task.done
 
 		car_pos = self.chassisNP.getPos()
-		gx = (car_pos.getX() - self.road_offset_start_x) / self.buildings_spacing
-		gy = (car_pos.getY() - self.road_offset_start_y * 0.36) / self.buildings_spacing
-		col = int(gx)
-		row = int(gy)
-		current_grid = (row, col)
-		print(current_grid)
-
-		#Skip current point if reached
-		if current_grid == self.auto_drive_path[0]:
-			self.auto_drive_path.pop(0)
-			if not self.auto_drive_path:
-				self.chassisNP.node().setLinearVelocity(Vec3(0, 0, 0))
-				return Task.done
-
-		if not self.auto_drive_path:
+		velocity = self.chassisNP.node().getLinearVelocity()
+		vehicle = self.vehicle_models[self.vehicle_model_idx]
+		heading, speed, arrived = self.auto_pilot.step(car_pos.getX(), car_pos.getY(), self.chassisNP.getH(),
+													   velocity.getXy().length(), vehicle["acceleration"], globalClock.getDt())
+		if arrived:
 			self.chassisNP.node().setLinearVelocity(Vec3(0, 0, 0))
+			self.auto_pilot = None
 			return Task.done
 
-		next_cell = self.auto_drive_path[0]
-		dx = next_cell[1] - current_grid[1]
-		dy = next_cell[0] - current_grid[0]
-
-		# Determine required heading (grid-based)
-		if dx == 1: desired_h = 270       # right (east)
-		elif dx == -1: desired_h = 90  # left (west)
-		elif dy == -1: desired_h = 180   # down (south)
-		elif dy == 1: desired_h = 0   # up (north)
-		else:
-			return Task.cont  # Invalid move
-		
-		current_h = self.chassisNP.getH()
-		angle_diff = (desired_h - current_h + 180) % 360 - 180
-
-		turn_speed = 100 * globalClock.getDt()
-		
-		
-		if 0 <= row < ROWS - 1 and 0 <= col < COLUMNS - 1:
-			street_speedlim = ROAD_TYPES[g_map.roadisx_get(row, col)]
-			current_velocity = self.chassisNP.node().getLinearVelocity()
-			current_speed = current_velocity.length()
-
-			# Only apply force if under speed limit
-			if current_speed < street_speedlim:
-				force = self.vehicle_models[self.vehicle_model_idx]["mass"] * self.vehicle_models[self.vehicle_model_idx]["acceleration"]
-				forward = self.chassisNP.getQuat().getForward()
-				self.chassisNP.node().applyCentralForce(forward * force)
-			else:
-				self.chassisNP.node().setLinearVelocity(current_velocity.normalized() * street_speedlim)
-
-		# If not aligned, rotate in place and brake
-		if abs(angle_diff) > 1:
-			self.chassisNP.node().setLinearVelocity(Vec3(0, 0, 0))  # Full stop to turn
-			if angle_diff > 0:
-				self.chassisNP.setH(current_h + min(turn_speed, angle_diff))
-			else:
-				self.chassisNP.setH(current_h + max(-turn_speed, angle_diff))
+		# Repair the path from the car's cell if the car was pushed off the trajectory (e.g. by an NPC)
+		if self.auto_pilot.cross_track > AUTOPILOT_MAX_DEVIATION:
+			cell = self.spatial.cell_of(car_pos.getX(), car_pos.getY())
+			if self.spatial.on_map(cell):
+				self.auto_route.move(cell)
+				if not self.plan_autopilot_trajectory():
+					self.chassisNP.node().setLinearVelocity(Vec3(0, 0, 0))
+					return Task.done
 
+		self.chassisNP.setH(heading)
+		forward = self.chassisNP.getQuat().getForward()
+		self.chassisNP.node().setLinearVelocity(Vec3(forward.getX() * speed, forward.getY() * speed, velocity.getZ()))
 		return Task.cont
 
 	
@@ -2400,10 +2695,14 @@ class MyApp(ShowBase):
 		# Store UI elements
 		self.ui_elements.extend([bg, text, stats])
 		
+		self.telemetry.event("game_end", win=win, money=round(self.money, 2), deliveries=self.successful_delivery_count,
+							 total_deliveries=self.total_delivery_count, delivery_scores=self.delivery_scores)
+		
 		# Hide 3D world
 		self.render.hide()
 		self.camera.hide()
 	
 
-app = MyApp()
-app.run()
+if __name__ == "__main__":
+	app = MyApp()
+	app.run()
@@ -0,0 +1,270 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: A binary file format for pre-generated maps, opened with numpy.memmap. The file holds a
+ versioned header, a table of sections and the sections themselves: the building label plane, the road label
+ plane, the street index (the street of every intersection, and the intersections of every street in order)
+ and the table of points of interest (every building that is not an empty lot). Opening a map only reads the
+ header: the sections are read-only views of the mapped file, so loading a huge city is near-instant, and the
+ worker processes of a sweep that open the same file share its pages instead of holding a copy each.
+ The routing, spatial and label lookups still read the labels as Python rows: a process decodes the planes it
+ uses on first use (one str per row, about a byte per cell) and keeps that copy to itself, so only the mapped
+ file is shared, not the decoded rows.
+
+Usage:
+	python mapfile.py write city.ddm --size 400 --seed 1    (generate a map and write it)
+	python mapfile.py info city.ddm                         (open a map and describe it)
+"""
+import argparse
+import random
+import struct
+import time
+import numpy as np
+from grid_map import DELIVERY_HOUSE, GAS_STATION, ManhattanGrid, label_keys
+
+MAGIC = b"DDMP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIIIIcc6x")	# magic, format version, section count, rows, columns, streets, POIs, default building and road labels
+SECTION = struct.Struct("<QQ")			# offset, length in bytes
+ALIGNMENT = 64							# Sections start on a multiple of this, so every view is aligned
+SECTIONS = ("buildings", "roads", "street_of", "street_indptr", "street_nodes", "pois")
+POI_DTYPE = np.dtype([("row", "<i4"), ("col", "<i4"), ("label", "u1"), ("kind", "u1")])
+POI_KINDS = {DELIVERY_HOUSE: 1, GAS_STATION: 2}		# Kind of a POI (0 for the other labels, e.g. '@')
+
+
+def label_plane(rows):
+	"""
+	Params:
+	 - rows (list[list[str]]): A grid of one-character ASCII labels.
+	Returns:
+	 - numpy.ndarray: The labels' character codes (uint8).
+	"""
+	text = "".join("".join(row) for row in rows)
+	if len(text) != sum(len(row) for row in rows) or not text.isascii():
+		raise ValueError("Map files only hold one-character ASCII labels")
+	return np.frombuffer(text.encode("ascii"), dtype=np.uint8).reshape(len(rows), -1)
+
+
+def write_map(grid, path):
+	"""
+	Writes a map to a map file.
+
+	Params:
+	 - grid (ManhattanGrid): The map.
+	 - path (str): The file to write.
+	Returns: None
+	"""
+	rows, cols = grid.rows, grid.cols
+	isx_cols = cols - 1
+	streets = grid.get_streets()
+
+	street_of = np.full((rows - 1, isx_cols), -1, dtype=np.int32)
+	street_indptr = np.zeros(len(streets) + 1, dtype=np.int64)
+	street_nodes = []
+	for idx, street in enumerate(streets):
+		for r, c in street:
+			street_of[r, c] = idx
+			street_nodes.append(r * isx_cols + c)
+		street_indptr[idx + 1] = len(street_nodes)
+
+	# Points of interest in the order of the map's label index, so random picks from the opened map
+	# (e.g. rules.pick_delivery_target) pick the same buildings as on the original map
+	buildings = label_plane(grid.buildings_grid)
+	cells = list(grid.positions(DELIVERY_HOUSE)) + list(grid.positions(GAS_STATION))
+	listed = set(cells)
+	others = np.argwhere(buildings != ord(grid.default_building_label)).tolist()
+	cells += [(r, c) for r, c in others if (r, c) not in listed]
+	pois = np.zeros(len(cells), dtype=POI_DTYPE)
+	if cells:
+		pois["row"], pois["col"] = zip(*cells)
+	pois["label"] = buildings[pois["row"], pois["col"]]
+	pois["kind"] = [POI_KINDS.get(label_keys(chr(label))[-1], 0) for label in pois["label"].tolist()]
+
+	# In the order of SECTIONS
+	arrays = [buildings, label_plane(grid.road_isx_grid), street_of, street_indptr, np.array(street_nodes, dtype=np.int32), pois]
+	offset = HEADER.size + SECTION.size * len(arrays)
+	table = []
+	for array in arrays:
+		offset += -offset % ALIGNMENT
+		table.append(SECTION.pack(offset, array.nbytes))
+		offset += array.nbytes
+
+	with open(path, "wb") as f:
+		f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(arrays), rows, cols, len(streets), len(pois),
+							grid.default_building_label.encode("ascii"), grid.default_road_label.encode("ascii")))
+		f.write(b"".join(table))
+		for array in arrays:
+			f.write(b"\0" * (-f.tell() % ALIGNMENT))
+			f.write(array.tobytes())
+
+
+class MappedGrid(ManhattanGrid):
+	"""
+	A read-only ManhattanGrid over a map file. The planes are views of the mapped file; the label rows, streets
+	and label index that the list-based code (routing, spatial queries) reads are decoded from them on first use,
+	into memory of this process.
+	Pickling a MappedGrid (e.g. to send it to pool workers) only sends its path: the receiver maps the file again.
+	"""
+	def __init__(self, path):
+		"""
+		Params:
+		 - path (str): The map file (see write_map).
+		Returns: None
+		"""
+		self.path = path
+		self.data = np.memmap(path, dtype=np.uint8, mode="r")
+		if len(self.data) < HEADER.size:
+			raise ValueError(f"{path} is not a version {FORMAT_VERSION} map file")
+		magic, version, sections, rows, cols, streets, pois, building_label, road_label = HEADER.unpack_from(self.data, 0)
+		if magic != MAGIC or version != FORMAT_VERSION or sections != len(SECTIONS):
+			raise ValueError(f"{path} is not a version {FORMAT_VERSION} map file")
+		self.rows = rows
+		self.cols = cols
+		self.default_building_label = building_label.decode("ascii")
+		self.default_road_label = road_label.decode("ascii")
+		self.graph = None
+		self.version = 0		# Never changes: the map is read-only
+
+		shapes = {
+			"buildings": (np.uint8, (rows, cols)),
+			"roads": (np.uint8, (rows - 1, cols - 1)),
+			"street_of": (np.int32, (rows - 1, cols - 1)),
+			"street_indptr": (np.int64, (streets + 1,)),
+			"street_nodes": (np.int32, None),
+			"pois": (POI_DTYPE, (pois,)),
+		}
+		self.planes = {}	# Section name -> read-only view of the file
+		for k, name in enumerate(SECTIONS):
+			offset, length = SECTION.unpack_from(self.data, HEADER.size + k * SECTION.size)
+			dtype, shape = shapes[name]
+			view = np.frombuffer(self.data, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=offset)
+			self.planes[name] = view.reshape(shape) if shape else view
+
+		# Decoded on first use
+		self.label_rows = None
+		self.road_rows = None
+		self.street_lists = None
+		self.index = None
+
+	def __reduce__(self):
+		return MappedGrid, (self.path,)
+
+	@property
+	def buildings_grid(self):
+		if self.label_rows is None:
+			self.label_rows = self.decode_plane(self.planes["buildings"])
+		return self.label_rows
+
+	@property
+	def road_isx_grid(self):
+		if self.road_rows is None:
+			self.road_rows = self.decode_plane(self.planes["roads"])
+		return self.road_rows
+
+	@property
+	def streets(self):
+		if self.street_lists is None:
+			indptr = self.planes["street_indptr"].tolist()
+			rows, cols = np.divmod(self.planes["street_nodes"], self.cols - 1)
+			cells = list(zip(rows.tolist(), cols.tolist()))
+			self.street_lists = [cells[indptr[k]:indptr[k + 1]] for k in range(len(indptr) - 1)]
+		return self.street_lists
+
+	@property
+	def label_index(self):
+		if self.index is None:
+			self.index = {}
+			pois = self.planes["pois"]
+			for r, c, label in zip(pois["row"].tolist(), pois["col"].tolist(), pois["label"].tolist()):
+				for key in label_keys(chr(label)):
+					self.index.setdefault(key, []).append((r, c))
+		return self.index
+
+	@staticmethod
+	def decode_plane(plane):
+		"""
+		Params:
+		 - plane (numpy.ndarray): A plane of character codes.
+		Returns:
+		 - list[str]: The labels, one string per row (indexed like the grid's label lists, a byte per label).
+		"""
+		text = plane.tobytes().decode("ascii")
+		width = plane.shape[1]
+		return [text[k * width:(k + 1) * width] for k in range(plane.shape[0])]
+
+	def __setitem__(self, pos, label):
+		raise TypeError("A map opened from a map file is read-only")
+
+	def roadisx_set(self, row, col, label):
+		raise TypeError("A map opened from a map file is read-only")
+
+	def positions(self, key):
+		"""
+		Same as ManhattanGrid.positions. The empty lots (the default label) are not in the POI table, so they are
+		found in the building plane the first time they are asked for.
+
+		Params:
+		 - key (str): A label (e.g. '+' or 'A') or a category (DELIVERY_HOUSE or GAS_STATION).
+		Returns:
+		 - list: The (row, col) of every such cell. The list is the index itself and must not be modified.
+		"""
+		if key == self.default_building_label and key not in self.label_index:
+			rows, cols = np.nonzero(self.planes["buildings"] == ord(key))
+			self.label_index[key] = list(zip(rows.tolist(), cols.tolist()))
+		return self.label_index.get(key, [])
+
+	def count(self, key):
+		return len(self.positions(key))
+
+	def sample(self, key, rng=random):
+		positions = self.positions(key)
+		return rng.choice(positions) if positions else None
+
+	def get_street_idx(self, pos):
+		"""
+		Params:
+		 - pos (tuple[int, int]): The (row, column) of an intersection.
+		Returns:
+		 - int or None: The integer index of the street, or None if the position is not part of any street.
+		"""
+		idx = int(self.planes["street_of"][pos])
+		return idx if idx >= 0 else None
+
+
+def main():
+	"""
+	Command line entry point: writes a generated map to a map file, or describes a map file.
+
+	Params: None
+	Returns: None
+	"""
+	import grid_map
+	from main import NUM_LOCATIONS, ROAD_TYPES
+
+	parser = argparse.ArgumentParser(description="Write or inspect Delivery Deluxe map files.")
+	sub = parser.add_subparsers(dest="command", required=True)
+	write = sub.add_parser("write", help="generate a map and write it to a map file")
+	write.add_argument("path")
+	write.add_argument("--size", type=int, default=20, help="map rows and columns (default 20)")
+	write.add_argument("--seed", type=int, default=0, help="map seed (default 0)")
+	info = sub.add_parser("info", help="open a map file and describe it")
+	info.add_argument("path")
+	args = parser.parse_args()
+
+	if args.command == "write":
+		started = time.perf_counter()
+		grid = grid_map.generate_map(args.size, args.size, NUM_LOCATIONS, ROAD_TYPES, random.Random(args.seed))
+		generated = time.perf_counter()
+		write_map(grid, args.path)
+		print(f"Generated a {args.size}x{args.size} map in {(generated - started) * 1000:.1f} ms, "
+			  f"wrote {args.path} in {(time.perf_counter() - generated) * 1000:.1f} ms")
+	else:
+		started = time.perf_counter()
+		grid = MappedGrid(args.path)
+		opened = time.perf_counter()
+		print(f"{args.path}: {grid.rows}x{grid.cols} buildings, {len(grid.planes['street_indptr']) - 1} streets, "
+			  f"{grid.count(GAS_STATION)} gas stations, {grid.count(DELIVERY_HOUSE)} delivery houses, "
+			  f"{len(grid.data) / 1024:.0f} KB, opened in {(opened - started) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,294 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: This module provides the in-game instrumentation layer. Game tasks and hot sections
+ (such as the physics step) are timed with a high resolution clock into rolling windows that report
+ p50/p95/p99, every timer is mirrored to a PStats collector so it can be watched live in the PStats
+ viewer, and a toggleable on-screen overlay shows the numbers while playing.
+"""
+import time
+from collections import deque
+from contextlib import contextmanager
+from direct.gui.OnscreenText import OnscreenText
+from direct.task import Task
+from panda3d.core import PStatCollector, TextNode
+
+
+def percentile(sorted_samples, fraction):
+	"""
+	Nearest-rank percentile of an already sorted list.
+
+	Params:
+	 - sorted_samples (list[float]): The samples, sorted ascending.
+	 - fraction (float): The percentile as a fraction (e.g. 0.95).
+	Returns:
+	 - float: The percentile value (0.0 if there are no samples).
+	"""
+	if not sorted_samples:
+		return 0.0
+	idx = min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))
+	return sorted_samples[idx]
+
+
+class RollingTimer:
+	"""
+	Keeps the most recent durations of one timed section and mirrors them to a PStats collector.
+	"""
+	def __init__(self, name, window=600):
+		"""
+		Params:
+		 - name (str): The section name (also used as the PStats collector name under "App").
+		 - window (int): The number of most recent samples kept for the percentiles.
+		Returns: None
+		"""
+		self.name = name
+		self.samples = deque(maxlen=window)
+		self.collector = PStatCollector(f"App:{name}")
+		self.calls = 0
+
+	def record(self, seconds):
+		"""
+		Params:
+		 - seconds (float): The duration of one run of the section.
+		Returns: None
+		"""
+		self.samples.append(seconds)
+		self.calls += 1
+
+	def stats(self, last=None):
+		"""
+		Params:
+		 - last (int): Only use the most recent `last` samples (the whole window if None).
+		Returns:
+		 - dict: The p50, p95, p99 and mean of the samples in milliseconds, and the total number of calls.
+		"""
+		samples = self.samples
+		if last is not None:
+			samples = list(samples)[-last:] if last > 0 else []
+		ordered = sorted(samples)
+		mean = sum(ordered) / len(ordered) if ordered else 0.0
+		return {
+			"p50": percentile(ordered, 0.50) * 1000,
+			"p95": percentile(ordered, 0.95) * 1000,
+			"p99": percentile(ordered, 0.99) * 1000,
+			"mean": mean * 1000,
+			"calls": self.calls,
+		}
+
+
+class Profiler:
+	"""
+	The collection of rolling timers and counters of the game.
+	"""
+	def __init__(self, window=600):
+		"""
+		Params:
+		 - window (int): The number of most recent samples kept per timer.
+		Returns: None
+		"""
+		self.window = window
+		self.timers = {}
+		self.counters = {}
+		self._render_start = None
+		self._last_frame = None
+
+	def timer(self, name):
+		"""
+		Returns the timer of a section, creating it on first use.
+
+		Params:
+		 - name (str): The section name.
+		Returns:
+		 - RollingTimer: The timer.
+		"""
+		if name not in self.timers:
+			self.timers[name] = RollingTimer(name, self.window)
+		return self.timers[name]
+
+	@contextmanager
+	def section(self, name):
+		"""
+		Times the body of a `with` block.
+
+		Params:
+		 - name (str): The section name.
+		Returns: None
+		"""
+		timer = self.timer(name)
+		timer.collector.start()
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			timer.record(time.perf_counter() - start)
+			timer.collector.stop()
+
+	def wrap_task(self, func, name):
+		"""
+		Wraps a task function so that every run of it is timed under `name`.
+
+		Params:
+		 - func (callable): The task function (taking the task, returning Task.cont/done/again).
+		 - name (str): The section name, normally the task name.
+		Returns:
+		 - callable: The timed task function.
+		"""
+		timer = self.timer(name)
+		def timed_task(task):
+			timer.collector.start()
+			start = time.perf_counter()
+			try:
+				return func(task)
+			finally:
+				timer.record(time.perf_counter() - start)
+				timer.collector.stop()
+		return timed_task
+
+	def add_task(self, task_mgr, func, name, **kwargs):
+		"""
+		Adds a timed task to the task manager (same arguments as taskMgr.add).
+
+		Params:
+		 - task_mgr (TaskManager): The task manager.
+		 - func (callable): The task function.
+		 - name (str): The task name.
+		Returns:
+		 - Task: The added task.
+		"""
+		return task_mgr.add(self.wrap_task(func, name), name, **kwargs)
+
+	def do_method_later(self, task_mgr, delay, func, name, **kwargs):
+		"""
+		Adds a timed delayed task to the task manager (same arguments as taskMgr.doMethodLater).
+
+		Params:
+		 - task_mgr (TaskManager): The task manager.
+		 - delay (float): The delay in seconds.
+		 - func (callable): The task function.
+		 - name (str): The task name.
+		Returns:
+		 - Task: The added task.
+		"""
+		return task_mgr.doMethodLater(delay, self.wrap_task(func, name), name, **kwargs)
+
+	def watch_render(self, task_mgr, render_sort=50):
+		"""
+		Times the render step (the "igLoop" task, sort 50) and the whole frame, using a pair of tasks
+		that run just before and just after it.
+
+		Params:
+		 - task_mgr (TaskManager): The task manager.
+		 - render_sort (int): The sort value of the render task.
+		Returns: None
+		"""
+		render_timer = self.timer("render")
+		frame_timer = self.timer("frame")
+
+		def before_render(task):
+			now = time.perf_counter()
+			if self._last_frame is not None:
+				frame_timer.record(now - self._last_frame)
+			self._last_frame = now
+			self._render_start = now
+			return Task.cont
+
+		def after_render(task):
+			if self._render_start is not None:
+				render_timer.record(time.perf_counter() - self._render_start)
+			return Task.cont
+
+		task_mgr.add(before_render, "profilerBeforeRender", sort=render_sort - 1)
+		task_mgr.add(after_render, "profilerAfterRender", sort=render_sort + 1)
+
+	def count(self, name, amount=1):
+		"""
+		Increments a named counter (e.g. cache hits).
+
+		Params:
+		 - name (str): The counter name.
+		 - amount (int): The increment.
+		Returns: None
+		"""
+		self.counters[name] = self.counters.get(name, 0) + amount
+
+	def summary(self):
+		"""
+		Returns:
+		 - dict: Section name -> stats dict (see RollingTimer.stats), sorted by p95 descending.
+		"""
+		stats = {name: timer.stats() for name, timer in self.timers.items()}
+		return dict(sorted(stats.items(), key=lambda item: -item[1]["p95"]))
+
+
+class ProfilerOverlay:
+	"""
+	On-screen table of the profiler's timers, refreshed a few times per second while visible.
+	"""
+	def __init__(self, profiler, task_mgr, extra_lines=None, refresh=0.5):
+		"""
+		Params:
+		 - profiler (Profiler): The profiler to display.
+		 - task_mgr (TaskManager): The task manager used for the refresh task.
+		 - extra_lines (callable): Optional function returning extra lines to show below the table.
+		 - refresh (float): Seconds between refreshes.
+		Returns: None
+		"""
+		self.profiler = profiler
+		self.task_mgr = task_mgr
+		self.extra_lines = extra_lines
+		self.refresh = refresh
+		self.text = OnscreenText(
+			text="",
+			pos=(0.35, 0.9),
+			scale=0.035,
+			fg=(1, 1, 0.6, 1),
+			bg=(0, 0, 0, 0.6),
+			align=TextNode.ALeft,
+			mayChange=True
+		)
+		self.text.hide()
+		self.visible = False
+
+	def toggle(self):
+		"""
+		Shows or hides the overlay.
+
+		Params: None
+		Returns: None
+		"""
+		self.visible = not self.visible
+		if self.visible:
+			self.text.show()
+			self.task_mgr.doMethodLater(0, self.update_overlay, "updateProfilerOverlay")
+		else:
+			self.text.hide()
+			self.task_mgr.remove("updateProfilerOverlay")
+
+	def update_overlay(self, task):
+		"""
+		Task that rewrites the overlay text.
+
+		Params:
+		 - task (Task.Task): The Panda3D task object.
+		Returns:
+		 - int: Task.again to run again after the refresh delay.
+		"""
+		lines = [f"{'section':<22}{'p50':>8}{'p95':>8}{'p99':>8}  ms"]
+		for name, stats in self.profiler.summary().items():
+			lines.append(f"{name:<22}{stats['p50']:>8.2f}{stats['p95']:>8.2f}{stats['p99']:>8.2f}")
+		for name, value in sorted(self.profiler.counters.items()):
+			lines.append(f"{name:<22}{value:>8}")
+		if self.extra_lines:
+			lines.extend(self.extra_lines())
+		self.text.setText("\n".join(lines))
+		task.delayTime = self.refresh
+		return Task.again
+
+	def destroy(self):
+		"""
+		Removes the overlay and its refresh task.
+
+		Params: None
+		Returns: None
+		"""
+		self.task_mgr.remove("updateProfilerOverlay")
+		self.text.destroy()
@@ -0,0 +1,336 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Deterministic input recording and replay. A recording stores the map seed, the seed of
+ the game's random source, the chosen vehicle and, for every frame of the game, the frame time, the frame's
+ time step, the state of the driving keys and the one-shot actions (refuel, complete delivery, autopilot)
+ in a compact binary log. Replaying feeds the same time steps and inputs back into the game loop, so the
+ same session runs again (in a window or headless) at real-time speed, at any multiple of it, or as fast as
+ possible for profiling. The final game state is stored in the log and compared at the end of a replay.
+
+Usage:
+	python replay.py record session.ddr                    (play normally, recording the game)
+	python replay.py play session.ddr                      (replay it in a window at real-time speed)
+	python replay.py play session.ddr --headless --fast    (replay it headless, as fast as possible)
+"""
+import argparse
+import json
+import random
+import struct
+import sys
+import time
+
+MAGIC = b"DDRP"
+FOOTER_MAGIC = b"DDND"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHI")		# magic, format version, header JSON length
+TICK = struct.Struct("<ddBB")		# frame time, dt, key bits, action bits
+FOOTER = struct.Struct("<I4s")		# footer JSON length, footer magic
+
+KEYS = ("forward", "backward", "left", "right", "brake", "escape")
+ACTIONS = ("refuel", "complete_delivery", "autopilot")
+
+
+def state_snapshot(app):
+	"""
+	Collects the game state compared between a recording and its replay.
+
+	Params:
+	 - app (MyApp): The game.
+	Returns:
+	 - dict: The money, fuel, delivery counters, delivery target and car position.
+	"""
+	pos = app.chassisNP.getPos() if app.chassisNP else (0, 0, 0)
+	return {
+		"game_state": app.game_state,
+		"money": app.money,
+		"fuel_level": app.fuel_level,
+		"successful_delivery_count": app.successful_delivery_count,
+		"total_delivery_count": app.total_delivery_count,
+		"delivery_target": list(app.delivery_target) if app.delivery_target else None,
+		"car_pos": [pos[0], pos[1], pos[2]],
+	}
+
+
+class InputRecorder:
+	"""
+	Writes the inputs of one game to a binary log, one fixed-size record per frame.
+	"""
+	def __init__(self, path):
+		"""
+		Params:
+		 - path (str): The log file to write.
+		Returns: None
+		"""
+		self.path = path
+		self.file = None
+		self.actions = 0
+		self.ticks = 0
+
+	def begin(self, app):
+		"""
+		Writes the header (seeds, vehicle, map size, lighting) and starts sampling the inputs every frame.
+		Called by the game when gameplay starts, before the game tasks are added.
+
+		Params:
+		 - app (MyApp): The game.
+		Returns: None
+		"""
+		from direct.task import Task
+
+		game = sys.modules[type(app).__module__]
+		header = {
+			"map_seed": game.MAP_SEED,
+			"session_seed": app.session_seed,
+			"rows": game.ROWS,
+			"columns": game.COLUMNS,
+			"num_locations": game.NUM_LOCATIONS,
+			"vehicle_model_idx": app.vehicle_model_idx,
+			"vehicle_color": list(app.vehicle_color),
+			"time_of_day": app.time_of_day,
+			"time_direction": app.time_direction,
+			"recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+		}
+		data = json.dumps(header).encode()
+		self.file = open(self.path, "wb")
+		self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(data)))
+		self.file.write(data)
+
+		def record_tick(task):
+			if app.game_state != "game":
+				self.close(app)
+				return Task.done
+			self.record_tick(globalClock.getFrameTime(), globalClock.getDt(), app.key_map)
+			return Task.cont
+
+		# Same sort as the game tasks but added before them, so it runs after the event manager
+		# has applied this frame's input and before any game task reads it
+		app.taskMgr.add(record_tick, "recordInputTick")
+
+	def note_action(self, action):
+		"""
+		Notes a one-shot action for the current frame.
+
+		Params:
+		 - action (str): One of ACTIONS.
+		Returns: None
+		"""
+		self.actions |= 1 << ACTIONS.index(action)
+
+	def record_tick(self, frame_time, dt, key_map):
+		"""
+		Appends one frame to the log.
+
+		Params:
+		 - frame_time (float): The frame time of the game clock.
+		 - dt (float): The time step of the frame.
+		 - key_map (dict): The state of the driving keys.
+		Returns: None
+		"""
+		keys = 0
+		for bit, name in enumerate(KEYS):
+			if key_map[name]:
+				keys |= 1 << bit
+		self.file.write(TICK.pack(frame_time, dt, keys, self.actions))
+		self.actions = 0
+		self.ticks += 1
+
+	def close(self, app):
+		"""
+		Writes the final game state and closes the log (does nothing if it is already closed).
+
+		Params:
+		 - app (MyApp): The game.
+		Returns: None
+		"""
+		if self.file is None:
+			return
+		footer = {"ticks": self.ticks, "final_state": state_snapshot(app)}
+		data = json.dumps(footer).encode()
+		self.file.write(data)
+		self.file.write(FOOTER.pack(len(data), FOOTER_MAGIC))
+		self.file.close()
+		self.file = None
+		app.taskMgr.remove("recordInputTick")
+		print(f"Recorded {self.ticks} frames to {self.path}")
+
+
+def read_recording(path):
+	"""
+	Reads an input log.
+
+	Params:
+	 - path (str): The log file.
+	Returns:
+	 - tuple[dict, list[tuple], dict]: The header, the (frame_time, dt, keys, actions) of every frame,
+									   and the footer (empty if the recording was cut off).
+	"""
+	with open(path, "rb") as f:
+		data = f.read()
+	magic, version, header_len = HEADER.unpack_from(data, 0)
+	if magic != MAGIC or version != FORMAT_VERSION:
+		raise ValueError(f"{path} is not a version {FORMAT_VERSION} input recording")
+	start = HEADER.size + header_len
+	header = json.loads(data[HEADER.size:start])
+
+	end = len(data)
+	footer = {}
+	if data.endswith(FOOTER_MAGIC):
+		footer_len, _ = FOOTER.unpack_from(data, end - FOOTER.size)
+		end -= FOOTER.size + footer_len
+		footer = json.loads(data[end:end + footer_len])
+	end -= (end - start) % TICK.size	# Drop a partly written last frame
+	ticks = list(TICK.iter_unpack(data[start:end]))
+	return header, ticks, footer
+
+
+class InputReplayer:
+	"""
+	Drives a game from an input log: restores the seeds and the vehicle, then feeds every recorded
+	frame's time step and inputs to the game loop through a slaved game clock.
+	"""
+	def __init__(self, app, path, speed=1.0, on_finish=None):
+		"""
+		Params:
+		 - app (MyApp): The game (on its start screen).
+		 - path (str): The log file to replay.
+		 - speed (float): Playback speed as a multiple of real time; 0 plays as fast as possible.
+		 - on_finish (callable): Called with the replay result dict when the log is exhausted.
+		Returns: None
+		"""
+		self.app = app
+		self.header, self.ticks, self.footer = read_recording(path)
+		self.speed = speed
+		self.on_finish = on_finish
+		self.index = 0
+		self.wall_start = None
+
+	def start(self):
+		"""
+		Rebuilds the recorded map, starts the recorded game and begins feeding the inputs.
+
+		Params: None
+		Returns: None
+		"""
+		import grid_map
+		from direct.task import Task
+		from panda3d.core import ClockObject, Vec4
+
+		app = self.app
+		game = sys.modules[type(app).__module__]
+		header = self.header
+		if (header["rows"], header["columns"], header["num_locations"]) != (game.ROWS, game.COLUMNS, game.NUM_LOCATIONS):
+			raise ValueError("The recording was made with a different map size")
+		game.MAP_SEED = header["map_seed"]
+		game.g_map = grid_map.generate_map(game.ROWS, game.COLUMNS, game.NUM_LOCATIONS, game.ROAD_TYPES, random.Random(game.MAP_SEED))
+
+		app.session_seed = header["session_seed"]
+		app.vehicle_model_idx = header["vehicle_model_idx"]
+		app.vehicle_color = Vec4(*header["vehicle_color"])
+		app.time_of_day = header["time_of_day"]
+		app.time_direction = header["time_direction"]
+
+		# The clock only moves when the replay sets it, so every frame sees the recorded time step
+		globalClock.setMode(ClockObject.MSlave)
+		app.switch_screen("game")
+
+		# Ignore the live controls (keep exit and the profiler overlay)
+		app.ignoreAll()
+		app.accept("escape", app.user_exit)
+		app.accept("f3", app.profiler_overlay.toggle)
+
+		def replay_tick(task):
+			if self.index >= len(self.ticks):
+				self.finish()
+				return Task.done
+			frame_time, dt, keys, actions = self.ticks[self.index]
+			self.index += 1
+			globalClock.setFrameTime(frame_time)
+			globalClock.setDt(dt)
+			for bit, name in enumerate(KEYS):
+				app.key_map[name] = bool(keys & (1 << bit))
+			for bit, name in enumerate(ACTIONS):
+				if actions & (1 << bit):
+					app.run_action(name)
+
+			# Pace the playback against the wall clock unless fast-forwarding
+			if self.wall_start is None:
+				self.wall_start = time.perf_counter()
+			elif self.speed > 0:
+				ahead = (frame_time - self.ticks[0][0]) / self.speed - (time.perf_counter() - self.wall_start)
+				if ahead > 0:
+					time.sleep(ahead)
+			return Task.cont
+
+		# Runs before the event manager and the game tasks, like the input it replaces
+		app.taskMgr.add(replay_tick, "replayInputTick", sort=-1)
+
+	def finish(self):
+		"""
+		Compares the final state with the recorded one and reports the result.
+
+		Params: None
+		Returns: None
+		"""
+		wall = time.perf_counter() - self.wall_start if self.wall_start else 0.0
+		recorded = self.ticks[-1][0] - self.ticks[0][0] if self.ticks else 0.0
+		final_state = state_snapshot(self.app)
+		expected = self.footer.get("final_state")
+		result = {
+			"frames": len(self.ticks),
+			"recorded_seconds": recorded,
+			"wall_seconds": wall,
+			"speedup": recorded / wall if wall else 0.0,
+			"final_state": final_state,
+			"matches_recording": expected == final_state if expected else None,
+			"timings_ms": self.app.profiler.summary(),
+		}
+		if self.on_finish:
+			self.on_finish(result)
+
+
+def main():
+	"""
+	Command line entry point: record a session, or replay one.
+
+	Params: None
+	Returns: None
+	"""
+	parser = argparse.ArgumentParser(description="Record or replay the inputs of a Delivery Deluxe session.")
+	sub = parser.add_subparsers(dest="command", required=True)
+	record = sub.add_parser("record", help="play the game normally and record it")
+	record.add_argument("log", help="the input log to write")
+	play = sub.add_parser("play", help="replay a recorded session")
+	play.add_argument("log", help="the input log to replay")
+	play.add_argument("--headless", action="store_true", help="render offscreen, without a window or sound")
+	play.add_argument("--fast", action="store_true", help="run as fast as possible instead of in real time")
+	play.add_argument("--speed", type=float, default=1.0, help="playback speed as a multiple of real time")
+	play.add_argument("--report", help="write the replay result and the task timings to this JSON file")
+	args = parser.parse_args()
+
+	from panda3d.core import loadPrcFileData
+	if args.command == "play" and args.headless:
+		loadPrcFileData("", "window-type offscreen\naudio-library-name null\nwin-size 320 240")
+
+	import main as game
+	app = game.MyApp()
+
+	if args.command == "record":
+		app.input_recorder = InputRecorder(args.log)
+	else:
+		def on_finish(result):
+			match = {True: "matches the recording", False: "DIFFERS from the recording", None: "was not recorded"}
+			print(f"Replayed {result['frames']} frames ({result['recorded_seconds']:.1f} s of play) "
+				  f"in {result['wall_seconds']:.1f} s ({result['speedup']:.1f}x); final state {match[result['matches_recording']]}")
+			for name, stats in list(result["timings_ms"].items())[:8]:
+				print(f"  {name:<22} p50 {stats['p50']:7.2f}  p95 {stats['p95']:7.2f}  p99 {stats['p99']:7.2f} ms")
+			if args.report:
+				with open(args.report, "w") as f:
+					json.dump(result, f, indent=1)
+			app.userExit()
+
+		InputReplayer(app, args.log, 0 if args.fast else args.speed, on_finish).start()
+	app.run()
+
+
+if __name__ == "__main__":
+	main()
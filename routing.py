@@ -0,0 +1,417 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: The routing engine shared by the player's autopilot and the delivery fleet. Routes are
+ searched over the road intersections of a map, where entering an intersection costs the inverse of its
+ street's speed, so the fastest route prefers the faster streets. The autopilot's route to its goal is kept
+ by an incremental planner (D* Lite), which repairs the route when the car leaves it or when street speeds
+ change, instead of searching again from scratch. Routes asked for again (e.g. by the fleet and the bots going
+ back and forth between the same places) are answered from an LRU cache of compact encoded paths, which
+ empties itself when the map's roads change.
+"""
+import heapq
+from collections import OrderedDict
+
+INF = float("inf")
+KEY_TOLERANCE = 1e-9	# Keys are sums of floats added in different orders, so equal keys can differ by rounding
+ROUTE_CACHE_BYTES = 4 * 2**20	# Memory cap of the route cache
+ENTRY_BYTES = 200		# Approximate memory of a cache entry besides its encoded moves (key, tuple and object headers)
+MOVES = ((-1, 0), (1, 0), (0, -1), (0, 1))	# Steps between adjacent intersections, encoded in 2 bits each
+
+
+class RoutingEngine:
+	"""
+	Finds shortest time routes over the road intersections of a ManhattanGrid.
+	"""
+	def __init__(self, grid, road_types):
+		"""
+		Params:
+		 - grid (ManhattanGrid): The map to route over.
+		 - road_types (dict): Road label -> speed limit (e.g. ROAD_TYPES of the game).
+		Returns: None
+		"""
+		self.grid = grid
+		self.road_types = road_types
+		self.rows = grid.rows - 1	# Intersections lie between the buildings
+		self.cols = grid.cols - 1
+		self.cache = RouteCache(self)
+
+	def speed(self, node):
+		"""
+		Params:
+		 - node (tuple[int, int]): The (row, column) of an intersection.
+		Returns:
+		 - float or None: The speed limit of the intersection's street (None if it is not a road).
+		"""
+		return self.road_types.get(self.grid.road_isx_grid[node[0]][node[1]])
+
+	def neighbors(self, node):
+		"""
+		Params:
+		 - node (tuple[int, int]): The (row, column) of an intersection.
+		Returns:
+		 - list[tuple]: (neighbor, cost) for every drivable adjacent intersection, where cost is 1 / speed.
+		"""
+		r, c = node
+		road_isx_grid = self.grid.road_isx_grid
+		result = []
+		for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+			if 0 <= nr < self.rows and 0 <= nc < self.cols:
+				speed = self.road_types.get(road_isx_grid[nr][nc])
+				if speed:
+					result.append(((nr, nc), 1 / speed))
+		return result
+
+	def predecessors(self, node):
+		"""
+		Params:
+		 - node (tuple[int, int]): The (row, column) of an intersection.
+		Returns:
+		 - list[tuple]: (neighbor, cost) for every adjacent intersection from which the node can be entered, where cost is 1 / speed of the node.
+		"""
+		speed = self.speed(node)
+		if not speed:
+			return []
+		r, c = node
+		return [((nr, nc), 1 / speed) for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+				if 0 <= nr < self.rows and 0 <= nc < self.cols]
+
+	def shortest_time_path(self, start, goal):
+		"""
+		Finds the shortest time path from a start intersection to a goal intersection with Dijkstra's algorithm.
+
+		Params:
+		 - start (tuple[int, int]): The (row, column) to start from (e.g. the car's cell).
+		 - goal (tuple[int, int]): The (row, column) of the target destination.
+		Returns:
+		 - list[tuple[int, int]]: The path from start to goal (both included), or an empty list if no path is found.
+		"""
+		best = {start: 0}
+		previous = {start: None}
+		heap = [(0, start)]
+		while heap:
+			cost, node = heapq.heappop(heap)
+			if node == goal:
+				path = []
+				while node is not None:
+					path.append(node)
+					node = previous[node]
+				return path[::-1]
+			if cost > best[node]:
+				continue	# Stale entry: a faster way to this node was already expanded
+			for neighbor, step in self.neighbors(node):
+				new_cost = cost + step
+				if new_cost < best.get(neighbor, float("inf")):
+					best[neighbor] = new_cost
+					previous[neighbor] = node
+					heapq.heappush(heap, (new_cost, neighbor))
+		return []
+
+	def travel_times(self, source):
+		"""
+		Finds the shortest time from a source intersection to every reachable intersection (Dijkstra's algorithm without a goal).
+
+		Params:
+		 - source (tuple[int, int]): The (row, column) to start from.
+		Returns:
+		 - dict: (row, column) -> cost of the fastest route from the source.
+		"""
+		best = {source: 0}
+		done = {}
+		heap = [(0, source)]
+		while heap:
+			cost, node = heapq.heappop(heap)
+			if node in done:
+				continue
+			done[node] = cost
+			for neighbor, step in self.neighbors(node):
+				new_cost = cost + step
+				if new_cost < best.get(neighbor, float("inf")):
+					best[neighbor] = new_cost
+					heapq.heappush(heap, (new_cost, neighbor))
+		return done
+
+	def travel_time(self, path):
+		"""
+		Params:
+		 - path (list[tuple[int, int]]): A path returned by shortest_time_path.
+		Returns:
+		 - float: The cost of the path (the sum of 1 / speed of every intersection entered).
+		"""
+		return sum(1 / self.speed(node) for node in path[1:])
+
+	def route(self, start, goal):
+		"""
+		Same as shortest_time_path, answered from the route cache when the route was found before.
+
+		Params:
+		 - start (tuple[int, int]): The (row, column) to start from.
+		 - goal (tuple[int, int]): The (row, column) of the target destination.
+		Returns:
+		 - list[tuple[int, int]]: The path from start to goal (both included), or an empty list if no path is found.
+		"""
+		return self.cache.get(start, goal)[0]
+
+
+def encode_path(path):
+	"""
+	Params:
+	 - path (list[tuple[int, int]]): A path of adjacent intersections (at least the start).
+	Returns:
+	 - bytes: The moves between the intersections (indices in MOVES), four per byte.
+	"""
+	data = bytearray((len(path) + 2) // 4)
+	for k in range(1, len(path)):
+		move = MOVES.index((path[k][0] - path[k - 1][0], path[k][1] - path[k - 1][1]))
+		data[(k - 1) >> 2] |= move << (((k - 1) & 3) * 2)
+	return bytes(data)
+
+
+def decode_path(start, length, data):
+	"""
+	Params:
+	 - start (tuple[int, int]): The first intersection of the path.
+	 - length (int): The number of intersections of the path.
+	 - data (bytes): The moves returned by encode_path.
+	Returns:
+	 - list[tuple[int, int]]: The path (empty if the length is 0: no path was found).
+	"""
+	if not length:
+		return []
+	r, c = start
+	path = [start]
+	for k in range(length - 1):
+		dr, dc = MOVES[(data[k >> 2] >> ((k & 3) * 2)) & 3]
+		r, c = r + dr, c + dc
+		path.append((r, c))
+	return path
+
+
+class RouteCache:
+	"""
+	Shortest time routes already found on a map, kept as (length, encoded moves, travel time) per
+	(start, goal) with LRU eviction under a memory cap. The cache is emptied as soon as the map's version
+	changes (its roads were relabelled), so a cached route is always the one a new search would find.
+	"""
+	def __init__(self, router, max_bytes=ROUTE_CACHE_BYTES, counter=None):
+		"""
+		Params:
+		 - router (RoutingEngine): The routing engine that searches the routes missing from the cache.
+		 - max_bytes (int): The memory cap of the cache.
+		 - counter (callable): Called with a counter name ("route_cache_hit", "route_cache_miss" or
+							   "route_cache_evict") for every lookup and eviction, e.g. Profiler.count. Optional.
+		Returns: None
+		"""
+		self.router = router
+		self.max_bytes = max_bytes
+		self.counter = counter
+		self.entries = OrderedDict()	# (start, goal) -> (length, moves, travel time), least recently used first
+		self.bytes = 0
+		self.version = router.grid.version
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def get(self, start, goal):
+		"""
+		Params:
+		 - start (tuple[int, int]): The (row, column) to start from.
+		 - goal (tuple[int, int]): The (row, column) of the target destination.
+		Returns:
+		 - tuple: (path, travel time) of the shortest time route, or ([], inf) if no path is found.
+		"""
+		if self.version != self.router.grid.version:
+			self.clear()
+			self.version = self.router.grid.version
+		key = (start, goal)
+		entry = self.entries.get(key)
+		if entry is not None:
+			self.hits += 1
+			if self.counter:
+				self.counter("route_cache_hit")
+			self.entries.move_to_end(key)
+			length, moves, time = entry
+			return decode_path(start, length, moves), time
+		self.misses += 1
+		if self.counter:
+			self.counter("route_cache_miss")
+
+		path = self.router.shortest_time_path(start, goal)
+		time = self.router.travel_time(path) if path else INF
+		moves = encode_path(path)
+		self.entries[key] = (len(path), moves, time)
+		self.bytes += ENTRY_BYTES + len(moves)
+		while self.bytes > self.max_bytes and self.entries:
+			_, (_, old_moves, _) = self.entries.popitem(last=False)
+			self.bytes -= ENTRY_BYTES + len(old_moves)
+			self.evictions += 1
+			if self.counter:
+				self.counter("route_cache_evict")
+		return path, time
+
+	def clear(self):
+		"""
+		Empties the cache.
+
+		Params: None
+		Returns: None
+		"""
+		self.entries.clear()
+		self.bytes = 0
+
+
+class DStarLite:
+	"""
+	The shortest time route from a moving start to a fixed goal, kept up to date with D* Lite
+	(Koenig and Likhachev). The search runs backwards from the goal, so when the start moves
+	(e.g. the car is pushed off its route) or the speed of some intersections changes, only the
+	intersections whose time to the goal is affected are expanded again.
+	"""
+	def __init__(self, router, start, goal):
+		"""
+		Plans the first route.
+
+		Params:
+		 - router (RoutingEngine): The routing engine of the map.
+		 - start (tuple[int, int]): The (row, column) to start from (e.g. the car's cell).
+		 - goal (tuple[int, int]): The (row, column) of the target destination.
+		Returns: None
+		"""
+		self.router = router
+		self.start = start
+		self.goal = goal
+		self.last_start = start
+		self.km = 0				# Key modifier: sum of the heuristic distances the start moved
+		self.g = {}				# Node -> time to the goal as of its last expansion
+		self.rhs = {goal: 0}	# Node -> one-step lookahead of the time to the goal
+		self.open = {}			# Node -> current key of the queued (inconsistent) nodes
+		self.heap = []			# (key, node) entries, including stale ones
+		self.min_step = 1 / max(router.road_types.values())	# Cheapest step, for an admissible heuristic
+		self.expanded = 0		# Nodes expanded by the last search or repair
+		self.push(goal)
+		self.compute()
+
+	def heuristic(self, a, b):
+		"""
+		Params:
+		 - a (tuple[int, int]): An intersection.
+		 - b (tuple[int, int]): Another intersection.
+		Returns:
+		 - float: A lower bound of the travel time between them (grid distance at the fastest speed).
+		"""
+		return (abs(a[0] - b[0]) + abs(a[1] - b[1])) * self.min_step
+
+	def key(self, node):
+		"""
+		Params:
+		 - node (tuple[int, int]): An intersection.
+		Returns:
+		 - tuple[float, float]: The node's priority in the queue.
+		"""
+		best = min(self.g.get(node, INF), self.rhs.get(node, INF))
+		return (best + self.heuristic(self.start, node) + self.km, best)
+
+	def push(self, node):
+		"""
+		Queues a node with its current key (an older entry of the node becomes stale).
+
+		Params:
+		 - node (tuple[int, int]): An intersection.
+		Returns: None
+		"""
+		key = self.key(node)
+		self.open[node] = key
+		heapq.heappush(self.heap, (key, node))
+
+	def update_node(self, node):
+		"""
+		Recomputes a node's lookahead time and queues it if it became inconsistent.
+
+		Params:
+		 - node (tuple[int, int]): An intersection.
+		Returns: None
+		"""
+		if node != self.goal:
+			self.rhs[node] = min((cost + self.g.get(succ, INF) for succ, cost in self.router.neighbors(node)), default=INF)
+		if self.g.get(node, INF) != self.rhs.get(node, INF):
+			self.push(node)
+		else:
+			self.open.pop(node, None)
+
+	def compute(self):
+		"""
+		Expands inconsistent nodes until the start's time to the goal is settled.
+
+		Params: None
+		Returns: None
+		"""
+		heap, open_nodes, g, rhs = self.heap, self.open, self.g, self.rhs
+		start = self.start
+		self.expanded = 0
+		while heap:
+			k_old, node = heap[0]
+			if open_nodes.get(node) != k_old:
+				heapq.heappop(heap)		# Stale entry: the node was requeued or became consistent
+				continue
+			# Done when the start is consistent and no queued key is below its key (ties are expanded too,
+			# since rounding could put an equal key just above it)
+			if k_old[0] > self.key(start)[0] + KEY_TOLERANCE and rhs.get(start, INF) == g.get(start, INF):
+				break
+			self.expanded += 1
+			k_new = self.key(node)
+			if k_old < k_new:
+				self.push(node)		# The start moved since the node was queued
+			elif g.get(node, INF) > rhs[node]:
+				g[node] = rhs[node]
+				del open_nodes[node]
+				for pred, _ in self.router.predecessors(node):
+					self.update_node(pred)
+			else:
+				g[node] = INF
+				self.update_node(node)
+				for pred, _ in self.router.predecessors(node):
+					self.update_node(pred)
+
+	def move(self, start):
+		"""
+		Moves the start (e.g. the car left its route) and repairs the route from there.
+
+		Params:
+		 - start (tuple[int, int]): The (row, column) of the new start.
+		Returns: None
+		"""
+		if start == self.start:
+			return
+		self.km += self.heuristic(self.last_start, start)
+		self.last_start = start
+		self.start = start
+		self.compute()
+
+	def update_speeds(self, nodes):
+		"""
+		Repairs the route after the speed limit of some intersections changed on the map.
+
+		Params:
+		 - nodes (list[tuple[int, int]]): The intersections whose speed changed.
+		Returns: None
+		"""
+		for node in nodes:
+			r, c = node
+			for adjacent in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+				if 0 <= adjacent[0] < self.router.rows and 0 <= adjacent[1] < self.router.cols:
+					self.update_node(adjacent)		# The cost of entering the node from here changed
+		self.compute()
+
+	def path(self):
+		"""
+		Returns:
+		 - list[tuple[int, int]]: The current route from the start to the goal (both included), or an empty list if the goal is unreachable.
+		"""
+		g = self.g
+		if g.get(self.start, INF) == INF:
+			return []
+		node = self.start
+		path = [node]
+		while node != self.goal and len(path) <= self.router.rows * self.router.cols:
+			node = min(self.router.neighbors(node), key=lambda step: step[1] + g.get(step[0], INF))[0]
+			path.append(node)
+		return path if node == self.goal else []
@@ -0,0 +1,165 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: The game rules shared by the game and the headless episode runner (episodes.py): how the
+ car responds to the controls, fuel consumption, refuelling, delivery time limits, ratings, fines and the
+ win and loss conditions. Keeping them in one place means a balancing sweep measures the same game the
+ player plays.
+"""
+from math import sqrt
+from grid_map import DELIVERY_HOUSE
+
+DELIVERY_REWARDS = [20, 30, 40]		# Possible rewards of a delivery
+DELIVERY_TIME_BASE = 45				# Seconds given for a delivery next to the car
+DELIVERY_TIME_SCALE = 75			# Extra seconds given for a delivery across the whole map
+WIN_DELIVERIES = 5					# Successful deliveries needed to win
+MAX_FAILURES = 4					# Failed deliveries that lose the game
+SPEEDING_FINE = 5
+SPEEDING_GRACE = 3.0				# Seconds of continuous speeding before a fine
+PEDESTRIAN_FINE = 20
+PEDESTRIAN_FINE_COOLDOWN = 3.0		# Minimum seconds between two pedestrian fines
+FULL_TANK_PRICE = 20				# Price of refuelling from empty to full
+DELIVERY_NEIGHBOURHOOD = ((0, 0), (-1, 0), (0, -1), (1, 0), (0, 1))	# Cells of the car, relative to the house, that complete a delivery
+
+
+def drive(chassis_np, key_map, vehicle, dt):
+	"""
+	Applies the controls to the car for one frame: forward/backward force, braking and steering.
+
+	Params:
+	 - chassis_np (NodePath): The car's rigid body node.
+	 - key_map (dict): The control states ("forward", "backward", "brake", "left", "right").
+	 - vehicle (dict): The vehicle model ("mass", "acceleration", "handling_coeff").
+	 - dt (float): The frame time step in seconds.
+	Returns:
+	 - float: The car's speed before the controls were applied.
+	"""
+	force = vehicle["mass"] * vehicle["acceleration"]
+	max_turn = 30 + 25 * vehicle["handling_coeff"]
+	velocity = chassis_np.node().getLinearVelocity()
+	speed = velocity.length()
+	forward = chassis_np.getQuat().getForward()
+
+	if key_map["forward"]:
+		chassis_np.node().applyCentralForce(forward * force)
+	elif key_map["backward"]:
+		chassis_np.node().applyCentralForce(-forward * force)
+	elif key_map["brake"]:
+		brake_strength = 0.1 * vehicle["handling_coeff"]
+		chassis_np.node().setLinearVelocity(velocity * (1 - brake_strength))
+
+	if speed > 1.0:
+		turn = max_turn * dt
+		if key_map["left"]:
+			chassis_np.setH(chassis_np.getH() + turn)
+		elif key_map["right"]:
+			chassis_np.setH(chassis_np.getH() - turn)
+	return speed
+
+
+def fuel_used(speed, fuel_consumption):
+	"""
+	Params:
+	 - speed (float): The car's speed.
+	 - fuel_consumption (float): The vehicle model's fuel consumption.
+	Returns:
+	 - float: The fuel (in percent of the tank) used during one frame.
+	"""
+	return speed * fuel_consumption + 2 * fuel_consumption
+
+
+def refuel(fuel_level, money):
+	"""
+	Fills the tank, or as much of it as the money pays for.
+
+	Params:
+	 - fuel_level (float): The fuel level in percent.
+	 - money (float): The player's money.
+	Returns:
+	 - tuple[float, float, float]: The price paid, the new fuel level and the money left.
+	"""
+	fuel_price = FULL_TANK_PRICE * (100.0 - fuel_level) / 100
+	if money < fuel_price:   # if player lacks enough money, then refueling amount is based on remaining money.
+		increaseable_fuel = 100.0 - 100 * fuel_price / FULL_TANK_PRICE
+		return money, fuel_level + increaseable_fuel, 0
+	return fuel_price, 100.0, money - fuel_price
+
+
+def delivery_time_given(target, cell, rows, cols, base=DELIVERY_TIME_BASE, scale=DELIVERY_TIME_SCALE):
+	"""
+	Params:
+	 - target (tuple[int, int]): The (row, column) of the delivery target.
+	 - cell (tuple[int, int]): The (row, column) of the car.
+	 - rows (int): The number of building rows of the map.
+	 - cols (int): The number of building columns of the map.
+	 - base (float): Seconds given for a delivery next to the car.
+	 - scale (float): Extra seconds given for a delivery across the whole map.
+	Returns:
+	 - float: The seconds given for the delivery.
+	"""
+	dist_factor = sqrt((target[0] - cell[0])**2 + (target[1] - cell[1])**2)
+	max_dist_factor = sqrt(rows**2 + cols**2)
+	return base + scale * dist_factor/max_dist_factor
+
+
+def rating(time_left, time_given):
+	"""
+	Params:
+	 - time_left (float): The seconds left when the delivery was completed.
+	 - time_given (float): The seconds given for the delivery.
+	Returns:
+	 - float: The customer rating in stars (at most 5).
+	"""
+	return min(5, time_left / (0.4*time_given) * 5)
+
+
+def delivery_cell(target, rows, cols):
+	"""
+	Params:
+	 - target (tuple[int, int]): The (row, column) of the delivery house.
+	 - rows (int): The number of building rows of the map.
+	 - cols (int): The number of building columns of the map.
+	Returns:
+	 - tuple[int, int]: The intersection from which the house can be delivered to (the route's goal).
+	"""
+	return min(target[0], rows - 2), min(target[1], cols - 2)
+
+
+def pick_delivery_target(grid, rng):
+	"""
+	Picks a random delivery house from the map's label index. Every house can be picked except one in the
+	far corner, which has no intersection next to it.
+
+	Params:
+	 - grid (ManhattanGrid): The map.
+	 - rng (random.Random): The random source.
+	Returns:
+	 - tuple[int, int]: The (row, column) of the delivery house.
+	"""
+	corner = (grid.rows - 1, grid.cols - 1)
+	target = grid.sample(DELIVERY_HOUSE, rng)
+	while target == corner and grid.count(DELIVERY_HOUSE) > 1:
+		target = grid.sample(DELIVERY_HOUSE, rng)
+	return target
+
+
+def at_target(cell, target):
+	"""
+	Params:
+	 - cell (tuple[int, int]): The (row, column) of the car.
+	 - target (tuple[int, int]): The (row, column) of the delivery target.
+	Returns:
+	 - bool: True if the car is close enough to complete the delivery (on the target or next to it).
+	"""
+	return (cell[0] - target[0], cell[1] - target[1]) in DELIVERY_NEIGHBOURHOOD
+
+
+def is_game_lost(fuel_level, failures, money):
+	"""
+	Params:
+	 - fuel_level (float): The fuel level in percent.
+	 - failures (int): The number of failed deliveries.
+	 - money (float): The player's money.
+	Returns:
+	 - bool: True if the player lost (out of fuel, too many failed deliveries, or bankrupt).
+	"""
+	return fuel_level <= 0 or failures >= MAX_FAILURES or money < 0
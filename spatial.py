@@ -0,0 +1,282 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: Spatial queries from world positions to the map, shared by the game and the episode runner.
+ Everything a position lookup needs is precomputed from a ManhattanGrid: the intersection (cell) under a
+ position, its street and speed limit, whether the car can refuel there, and a 2-d tree over the points of
+ interest (gas stations and delivery houses) for nearest and within-radius queries. Positions can also be
+ looked up in batches (numpy arrays of many vehicles' positions at once).
+"""
+from math import hypot, inf
+import numpy as np
+from grid_map import DELIVERY_HOUSE, GAS_STATION	# Kinds of points of interest
+
+# Buildings next to which the car can refuel, relative to the car's cell (the neighbourhood of the game's refuel)
+REFUEL_NEIGHBOURHOOD = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 0), (0, 1))
+
+
+class KDTree:
+	"""
+	A static 2-d tree over points, stored in one list: the node of a range of the list is its middle
+	element, split on X at even depths and on Y at odd depths.
+	"""
+	def __init__(self, points, items):
+		"""
+		Params:
+		 - points (list[tuple[float, float]]): The (x, y) of the points.
+		 - items (list): The item returned for every point (e.g. its building cell).
+		Returns: None
+		"""
+		nodes = list(zip(points, items))
+
+		def build(lo, hi, depth):
+			if hi - lo > 1:
+				nodes[lo:hi] = sorted(nodes[lo:hi], key=lambda node: node[0][depth % 2])
+				mid = (lo + hi) // 2
+				build(lo, mid, depth + 1)
+				build(mid + 1, hi, depth + 1)
+
+		build(0, len(nodes), 0)
+		self.xs = [point[0] for point, _ in nodes]
+		self.ys = [point[1] for point, _ in nodes]
+		self.items = [item for _, item in nodes]
+
+	def __len__(self):
+		return len(self.items)
+
+	def nearest(self, x, y):
+		"""
+		Params:
+		 - x (float): The X of the query position.
+		 - y (float): The Y of the query position.
+		Returns:
+		 - tuple: (distance, item) of the nearest point, or (inf, None) if the tree is empty.
+		"""
+		xs, ys = self.xs, self.ys
+		best, best_i = inf, -1
+		stack = [(0, len(xs), 0)]
+		while stack:
+			lo, hi, depth = stack.pop()
+			if lo >= hi:
+				continue
+			mid = (lo + hi) // 2
+			d = (xs[mid] - x) ** 2 + (ys[mid] - y) ** 2
+			if d < best:
+				best, best_i = d, mid
+			diff = (x - xs[mid]) if depth % 2 == 0 else (y - ys[mid])
+			near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+			# The far side is only searched if the splitting line is closer than the best point so far
+			if diff * diff < best:
+				stack.append((far[0], far[1], depth + 1))
+			stack.append((near[0], near[1], depth + 1))
+		return (best ** 0.5, self.items[best_i]) if best_i >= 0 else (inf, None)
+
+	def within(self, x, y, radius):
+		"""
+		Params:
+		 - x (float): The X of the query position.
+		 - y (float): The Y of the query position.
+		 - radius (float): The search radius.
+		Returns:
+		 - list[tuple]: (distance, item) of every point within the radius, nearest first.
+		"""
+		xs, ys = self.xs, self.ys
+		radius_sq = radius * radius
+		found = []
+		stack = [(0, len(xs), 0)]
+		while stack:
+			lo, hi, depth = stack.pop()
+			if lo >= hi:
+				continue
+			mid = (lo + hi) // 2
+			d = (xs[mid] - x) ** 2 + (ys[mid] - y) ** 2
+			if d <= radius_sq:
+				found.append((d ** 0.5, self.items[mid]))
+			diff = (x - xs[mid]) if depth % 2 == 0 else (y - ys[mid])
+			if diff <= radius:
+				stack.append((lo, mid, depth + 1))
+			if diff >= -radius:
+				stack.append((mid + 1, hi, depth + 1))
+		found.sort(key=lambda result: result[0])
+		return found
+
+
+class SpatialIndex:
+	"""
+	Position lookups on a map, answered from grids and trees precomputed from its ManhattanGrid.
+	Cells are (row, column) of the intersections, as the game computes them from the car's position.
+	"""
+	def __init__(self, grid, road_types, spacing, origin, building_origin):
+		"""
+		Params:
+		 - grid (ManhattanGrid): The map.
+		 - road_types (dict): Road label -> speed limit (e.g. ROAD_TYPES of the game).
+		 - spacing (float): The distance in world units between adjacent intersections.
+		 - origin (tuple[float, float]): The world (x, y) of intersection (0, 0).
+		 - building_origin (tuple[float, float]): The world (x, y) of building (0, 0).
+		Returns: None
+		"""
+		self.grid = grid
+		self.road_types = road_types
+		self.spacing = spacing
+		self.origin = origin
+		self.building_origin = building_origin
+		self.rows = grid.rows - 1	# Intersections lie between the buildings
+		self.cols = grid.cols - 1
+		self.offsets = {}			# Radius -> cell offsets within it (see cells_within)
+		self.refresh()
+
+	def refresh(self):
+		"""
+		Re-reads the map (after its labels, streets or road types changed) and rebuilds the lookups.
+
+		Params: None
+		Returns: None
+		"""
+		grid = self.grid
+		rows, cols = self.rows, self.cols
+
+		# Per intersection: speed limit and street index
+		self.speed_limits = [[self.road_types.get(grid.road_isx_grid[r][c]) for c in range(cols)] for r in range(rows)]
+		self.speed_limit_array = np.array([[limit or 0 for limit in row] for row in self.speed_limits], dtype=float).reshape(rows, cols)
+		self.street_indices = [[None] * cols for _ in range(rows)]
+		for idx, street in enumerate(grid.get_streets()):
+			for r, c in street:
+				self.street_indices[r][c] = idx
+
+		# Cells at which the car can refuel (next to a gas station)
+		self.refuel_cells = {(i - dr, j - dc) for i, j in grid.positions(GAS_STATION) for dr, dc in REFUEL_NEIGHBOURHOOD}
+
+		# Points of interest at their buildings' world positions
+		bx, by = self.building_origin
+		self.trees = {}
+		for kind in (GAS_STATION, DELIVERY_HOUSE):
+			cells = sorted(grid.positions(kind))
+			self.trees[kind] = KDTree([(bx + j * self.spacing, by + i * self.spacing) for i, j in cells], cells)
+
+	def cell_of(self, x, y):
+		"""
+		Params:
+		 - x (float): The world X.
+		 - y (float): The world Y.
+		Returns:
+		 - tuple[int, int]: The (row, column) of the nearest intersection (may lie outside the map).
+		"""
+		return round((y - self.origin[1]) / self.spacing), round((x - self.origin[0]) / self.spacing)
+
+	def cells_of(self, xy):
+		"""
+		Batched cell_of.
+
+		Params:
+		 - xy (numpy.ndarray): (n, 2) world positions.
+		Returns:
+		 - numpy.ndarray: (n, 2) int (row, column) cells (rounded half to even, like round).
+		"""
+		xy = np.asarray(xy, dtype=float)
+		return np.rint((xy[:, ::-1] - self.origin[::-1]) / self.spacing).astype(np.int64)
+
+	def on_map(self, cell):
+		"""
+		Params:
+		 - cell (tuple[int, int]): A (row, column).
+		Returns:
+		 - bool: True if the cell is an intersection of the map.
+		"""
+		return 0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols
+
+	def speed_limit(self, cell):
+		"""
+		Params:
+		 - cell (tuple[int, int]): A (row, column).
+		Returns:
+		 - float or None: The speed limit of the cell's street (None if the cell is not on a road).
+		"""
+		r, c = cell
+		return self.speed_limits[r][c] if 0 <= r < self.rows and 0 <= c < self.cols else None
+
+	def speed_limits_of(self, xy):
+		"""
+		Batched speed limit lookup of world positions.
+
+		Params:
+		 - xy (numpy.ndarray): (n, 2) world positions.
+		Returns:
+		 - numpy.ndarray: The speed limit under every position (0 where it is not on a road).
+		"""
+		cells = self.cells_of(xy)
+		inside = (cells[:, 0] >= 0) & (cells[:, 0] < self.rows) & (cells[:, 1] >= 0) & (cells[:, 1] < self.cols)
+		limits = np.zeros(len(cells))
+		limits[inside] = self.speed_limit_array[cells[inside, 0], cells[inside, 1]]
+		return limits
+
+	def street_idx(self, cell):
+		"""
+		Params:
+		 - cell (tuple[int, int]): A (row, column).
+		Returns:
+		 - int or None: The index of the cell's street (None if the cell is not part of any street).
+		"""
+		r, c = cell
+		return self.street_indices[r][c] if 0 <= r < self.rows and 0 <= c < self.cols else None
+
+	def can_refuel(self, cell):
+		"""
+		Params:
+		 - cell (tuple[int, int]): The (row, column) of the car.
+		Returns:
+		 - bool: True if a gas station is next to the cell (the car can refuel there).
+		"""
+		return cell in self.refuel_cells
+
+	def nearest(self, kind, x, y):
+		"""
+		Params:
+		 - kind (str): GAS_STATION or DELIVERY_HOUSE.
+		 - x (float): The world X.
+		 - y (float): The world Y.
+		Returns:
+		 - tuple: (distance, building cell) of the nearest point of that kind, or (inf, None) if the map has none.
+		"""
+		return self.trees[kind].nearest(x, y)
+
+	def nearest_many(self, kind, xy):
+		"""
+		Batched nearest.
+
+		Params:
+		 - kind (str): GAS_STATION or DELIVERY_HOUSE.
+		 - xy (numpy.ndarray): (n, 2) world positions.
+		Returns:
+		 - list[tuple]: (distance, building cell) for every position.
+		"""
+		nearest = self.trees[kind].nearest
+		return [nearest(x, y) for x, y in np.asarray(xy, dtype=float).tolist()]
+
+	def within(self, kind, x, y, radius):
+		"""
+		Params:
+		 - kind (str): GAS_STATION or DELIVERY_HOUSE.
+		 - x (float): The world X.
+		 - y (float): The world Y.
+		 - radius (float): The search radius in world units.
+		Returns:
+		 - list[tuple]: (distance, building cell) of every point of that kind within the radius, nearest first.
+		"""
+		return self.trees[kind].within(x, y, radius)
+
+	def cells_within(self, cell, radius):
+		"""
+		Params:
+		 - cell (tuple[int, int]): A (row, column).
+		 - radius (float): The radius in cells.
+		Returns:
+		 - list[tuple[int, int]]: The intersections of the map within the radius of the cell, nearest first.
+		"""
+		offsets = self.offsets.get(radius)
+		if offsets is None:
+			reach = int(radius)
+			offsets = sorted(((dr, dc) for dr in range(-reach, reach + 1) for dc in range(-reach, reach + 1)
+							  if hypot(dr, dc) <= radius), key=lambda offset: hypot(*offset))
+			self.offsets[radius] = offsets
+		r, c = cell
+		return [(r + dr, c + dc) for dr, dc in offsets if 0 <= r + dr < self.rows and 0 <= c + dc < self.cols]
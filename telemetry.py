@@ -0,0 +1,157 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: This module provides the telemetry sink of the game. Gameplay events (deliveries,
+ fines, pedestrian hits, refuels, game results) and per-second performance samples are appended to an
+ in-memory ring buffer, and a background thread flushes the buffer to a gzip-compressed newline-delimited
+ JSON file (or to a Parquet file when pyarrow is installed), so the game loop never waits on disk I/O.
+"""
+import gzip
+import json
+import os
+import threading
+import time
+from collections import deque
+
+try:
+	import pyarrow
+	import pyarrow.parquet
+except ImportError:		# Parquet output is optional
+	pyarrow = None
+
+TELEMETRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "telemetry")
+
+
+class TelemetrySink:
+	"""
+	Ring buffer of timestamped telemetry records with a background writer thread.
+	"""
+	def __init__(self, path=None, capacity=10000, flush_interval=2.0, parquet=False):
+		"""
+		Params:
+		 - path (str): The output file. Defaults to telemetry/session-<date>-<time>.ndjson.gz
+					   (or .parquet when parquet output is used).
+		 - capacity (int): The maximum number of buffered records; the oldest are dropped when it is full.
+		 - flush_interval (float): Seconds between background flushes.
+		 - parquet (bool): Write Parquet instead of gzip NDJSON (only if pyarrow is installed).
+		Returns: None
+		"""
+		self.parquet = parquet and pyarrow is not None
+		if path is None:
+			extension = ".parquet" if self.parquet else ".ndjson.gz"
+			path = os.path.join(TELEMETRY_DIR, time.strftime("session-%Y%m%d-%H%M%S") + extension)
+		self.path = path
+		self.session = os.path.basename(path).split(".")[0]
+		self.buffer = deque(maxlen=capacity)
+		self.dropped = 0
+		self.written = 0
+		self.flush_interval = flush_interval
+		self._writer = None
+		self._io_lock = threading.Lock()
+		self._stop = threading.Event()
+		self._thread = threading.Thread(target=self._run, name="telemetry-flush", daemon=True)
+		self._thread.start()
+
+	def event(self, kind, **fields):
+		"""
+		Records an event. Only appends to the ring buffer, so it is safe to call from the game loop.
+
+		Params:
+		 - kind (str): The event type (e.g. "fine", "refuel").
+		 - **fields: The event data (JSON-serializable values).
+		Returns: None
+		"""
+		if len(self.buffer) == self.buffer.maxlen:
+			self.dropped += 1
+		fields["t"] = time.time()
+		fields["type"] = kind
+		self.buffer.append(fields)
+
+	def sample(self, **fields):
+		"""
+		Records a performance sample (an event of type "perf").
+
+		Params:
+		 - **fields: The measured values (e.g. frame_ms, physics_ms, npcs, lights).
+		Returns: None
+		"""
+		self.event("perf", **fields)
+
+	def _run(self):
+		"""
+		Background thread: flushes the buffer every flush_interval seconds until the sink is closed.
+
+		Params: None
+		Returns: None
+		"""
+		while not self._stop.wait(self.flush_interval):
+			self.flush()
+
+	def flush(self):
+		"""
+		Writes every buffered record to the output file.
+
+		Params: None
+		Returns:
+		 - int: The number of records written.
+		"""
+		with self._io_lock:
+			records = []
+			while self.buffer:
+				records.append(self.buffer.popleft())
+			if not records:
+				return 0
+			if self._writer is None:
+				os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+			if self.parquet:
+				self._write_parquet(records)
+			else:
+				self._write_ndjson(records)
+			self.written += len(records)
+			return len(records)
+
+	def _write_ndjson(self, records):
+		"""
+		Appends records as one JSON object per line to the gzip file.
+
+		Params:
+		 - records (list[dict]): The records to write.
+		Returns: None
+		"""
+		if self._writer is None:
+			self._writer = gzip.open(self.path, "at", encoding="utf-8")
+		self._writer.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+		self._writer.flush()
+
+	def _write_parquet(self, records):
+		"""
+		Appends records as a row group to the Parquet file. The common fields get their own columns,
+		the event-specific fields are kept as a JSON string.
+
+		Params:
+		 - records (list[dict]): The records to write.
+		Returns: None
+		"""
+		table = pyarrow.table({
+			"t": [record["t"] for record in records],
+			"session": [self.session] * len(records),
+			"type": [record["type"] for record in records],
+			"data": [json.dumps({k: v for k, v in record.items() if k not in ("t", "type")}) for record in records],
+		})
+		if self._writer is None:
+			self._writer = pyarrow.parquet.ParquetWriter(self.path, table.schema, compression="zstd")
+		self._writer.write_table(table)
+
+	def close(self):
+		"""
+		Stops the writer thread, flushes what is left and closes the file.
+
+		Params: None
+		Returns: None
+		"""
+		self._stop.set()
+		self._thread.join()
+		self.flush()
+		with self._io_lock:
+			if self._writer is not None:
+				self._writer.close()
+				self._writer = None
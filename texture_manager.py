@@ -0,0 +1,161 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: This module provides the texture manager of the game. It loads every texture file only
+ once (preferring the compressed, mipmapped .txo written by bake_assets.py), keeps track of which city
+ tiles use which textures, and keeps the textures uploaded to the graphics card under a memory budget by
+ releasing the least recently used textures whose tiles are all far away from the car.
+"""
+import os
+from collections import OrderedDict
+from panda3d.core import Filename
+from asset_cache import baked_assets
+from loadtrace import load_trace
+
+
+def texture_bytes(tex):
+	"""
+	Estimates the video memory a texture takes once uploaded. Compressed textures are measured
+	from their (compressed) RAM images, the rest from their size and format.
+
+	Params:
+	 - tex (Texture): The texture.
+	Returns:
+	 - int: The estimated size in bytes.
+	"""
+	if tex.hasRamImage() and tex.getRamImageCompression() != tex.CMOff:
+		return sum(tex.getRamMipmapImageSize(n) for n in range(tex.getNumRamMipmapImages()))
+	return tex.estimateTextureMemory()
+
+
+class TextureManager:
+	"""
+	Deduplicates texture loads and enforces a video memory budget with LRU eviction.
+	"""
+	def __init__(self, loader, budget_mb=256, resident_radius=300.0):
+		"""
+		Params:
+		 - loader (Loader): The Panda3D loader.
+		 - budget_mb (float): The video memory budget for the managed textures, in megabytes.
+		 - resident_radius (float): Textures used by a tile within this distance of the car are never evicted.
+		Returns: None
+		"""
+		self.loader = loader
+		self.budget_bytes = int(budget_mb * 1024 * 1024)
+		self.resident_radius = resident_radius
+		self.by_path = {}			# source path -> Texture
+		self.lru = OrderedDict()	# Texture -> list of tile (x, y) positions using it, least recently used first
+		self.evictions = 0
+
+	def load(self, path):
+		"""
+		Loads a texture file, returning the already loaded texture if the same file was loaded before.
+
+		Params:
+		 - path (str): The texture path.
+		Returns:
+		 - Texture: The shared texture.
+		"""
+		key = os.path.abspath(path)
+		if key not in self.by_path:
+			with load_trace.asset(path):
+				baked = baked_assets.baked_path(path)
+				tex = self.loader.loadTexture(Filename.fromOsSpecific(baked) if baked else path)	# The manifest paths are OS-native
+			self.by_path[key] = tex
+			self.lru.setdefault(tex, [])
+		return self.by_path[key]
+
+	def register_tile(self, node_path, pos):
+		"""
+		Records that the textures under `node_path` are used by the tile at `pos`.
+
+		Params:
+		 - node_path (NodePath): The tile's node (e.g. a building).
+		 - pos (tuple[float, float]): The (x, y) world position of the tile.
+		Returns: None
+		"""
+		for tex in node_path.findAllTextures():
+			self.lru.setdefault(tex, []).append(pos)
+
+	def clear_tiles(self):
+		"""
+		Forgets every tile (e.g. when the city is torn down). Loaded textures stay cached.
+
+		Params: None
+		Returns: None
+		"""
+		self.lru = OrderedDict((tex, []) for tex in self.by_path.values())
+
+	def update(self, focus, gsg=None):
+		"""
+		Marks the textures of nearby tiles as recently used, then releases least recently used
+		textures from the graphics card until the uploaded textures fit in the budget.
+		Released textures are uploaded again automatically if they are drawn later.
+
+		Params:
+		 - focus (tuple[float, float]): The (x, y) world position to measure distances from (the car).
+		 - gsg (GraphicsStateGuardian): The graphics card state, used to see which textures are uploaded.
+		Returns:
+		 - int: The number of textures released.
+		"""
+		fx, fy = focus
+		radius_sq = self.resident_radius ** 2
+		near = [tex for tex, tiles in self.lru.items()
+				if not tiles or any((x - fx) ** 2 + (y - fy) ** 2 <= radius_sq for x, y in tiles)]
+		for tex in near:
+			self.lru.move_to_end(tex)
+
+		released = 0
+		used = self.resident_bytes(gsg)
+		near = set(near)
+		for tex in list(self.lru):
+			if used <= self.budget_bytes:
+				break
+			if tex in near or not self.is_resident(tex, gsg):
+				continue
+			used -= texture_bytes(tex)
+			tex.releaseAll()
+			released += 1
+		self.evictions += released
+		return released
+
+	def is_resident(self, tex, gsg):
+		"""
+		Params:
+		 - tex (Texture): A managed texture.
+		 - gsg (GraphicsStateGuardian): The graphics card state (None if unknown).
+		Returns:
+		 - bool: True if the texture is uploaded (assumed True when there is no gsg to ask).
+		"""
+		if gsg is None:
+			return True
+		return tex.isPrepared(gsg.getPreparedObjects())
+
+	def resident_bytes(self, gsg=None):
+		"""
+		Params:
+		 - gsg (GraphicsStateGuardian): The graphics card state (None to count every managed texture).
+		Returns:
+		 - int: The estimated video memory used by the uploaded managed textures, in bytes.
+		"""
+		return sum(texture_bytes(tex) for tex in self.lru if self.is_resident(tex, gsg))
+
+	def report(self, gsg=None):
+		"""
+		Summarizes the texture memory use.
+
+		Params:
+		 - gsg (GraphicsStateGuardian): The graphics card state (None to count every managed texture).
+		Returns:
+		 - dict: The budget, the uploaded bytes, the texture counts and the number of evictions so far,
+				 plus a per-texture list of (name, bytes, resident, tile count) sorted by size.
+		"""
+		textures = sorted(((tex.getName(), texture_bytes(tex), self.is_resident(tex, gsg), len(tiles))
+						   for tex, tiles in self.lru.items()), key=lambda t: -t[1])
+		return {
+			"budget_bytes": self.budget_bytes,
+			"resident_bytes": self.resident_bytes(gsg),
+			"managed": len(self.lru),
+			"resident": sum(1 for t in textures if t[2]),
+			"evictions": self.evictions,
+			"textures": textures,
+		}
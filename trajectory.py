@@ -0,0 +1,201 @@
+"""
+-Game title: Delivery Deluxe (GTA 5.5)
+-Brief description: The autopilot's trajectory controller. A route of intersections becomes a smooth trajectory
+ (straight streets joined by rounded corners) sampled every few units, with a speed profile precomputed from
+ each street's speed limit, the curvature of the corners and the braking distance to the next slower part.
+ A pure pursuit controller follows it: every frame it steers towards a point a little ahead on the trajectory
+ and accelerates or brakes towards the profile speed, so the car takes corners without stopping.
+"""
+from math import atan2, ceil, cos, degrees, hypot, radians, sin, sqrt, tan
+
+CORNER_RADIUS = 14.0		# Radius of the rounded corners (shortened where the streets are too short)
+LATERAL_ACCELERATION = 9.0	# Maximum sideways acceleration in corners (sets the corner speeds)
+BRAKING = 12.0				# Deceleration used for the speed profile and when braking
+SPEED_MARGIN = 0.95			# Fraction of the speed limit driven at, so the car is never fined
+SAMPLE_STEP = 2.0			# Distance between two samples of the trajectory
+LOOKAHEAD_TIME = 0.5		# Seconds ahead of the car the pursued point is (at the current speed)
+LOOKAHEAD_MIN = 6.0
+LOOKAHEAD_MAX = 24.0
+TURN_RATE = 120.0			# Maximum turn rate in degrees per second
+TURN_IN_PLACE = 60.0		# Angle to the pursued point above which the car stops and turns in place
+ARRIVE_DISTANCE = 3.0		# Distance from the end of the trajectory at which the car has arrived
+BLOCKED_SLOWDOWN = 3.0		# Speed below the commanded speed at which the car counts as blocked (e.g. by a collision)
+
+
+def heading_to(dx, dy):
+	"""
+	Params:
+	 - dx (float): X component of a direction.
+	 - dy (float): Y component of a direction.
+	Returns:
+	 - float: The Panda3D heading (H) in degrees of a node facing that direction (H = 0 faces +Y).
+	"""
+	return degrees(atan2(-dx, dy))
+
+
+def build_trajectory(start, points, limits, radius=CORNER_RADIUS):
+	"""
+	Builds the trajectory from the car's position through the route's intersections, with a speed profile
+	that ends at a stop on the last intersection.
+
+	Params:
+	 - start (tuple[float, float]): The (x, y) of the car.
+	 - points (list[tuple[float, float]]): The (x, y) of the route's intersections.
+	 - limits (list[float]): The speed limit of each intersection's street.
+	 - radius (float): The radius of the rounded corners.
+	Returns:
+	 - dict: "x", "y" (the samples), "s" (distance along the trajectory), "speed" (the profile) and "length".
+	"""
+	# Skip the first intersection if the car is already past it towards the second one
+	if len(points) > 1 and ((start[0] - points[0][0]) * (points[1][0] - points[0][0])
+							+ (start[1] - points[0][1]) * (points[1][1] - points[0][1])) > 0:
+		points, limits = points[1:], limits[1:]
+	vertices = [start] + list(points)
+	vertex_limits = [limits[0]] + list(limits)
+
+	# Length cut from both streets of every corner for its rounding
+	cuts = [0.0] * len(vertices)
+	for k in range(1, len(vertices) - 1):
+		(x0, y0), (x1, y1), (x2, y2) = vertices[k - 1], vertices[k], vertices[k + 1]
+		len_in, len_out = hypot(x1 - x0, y1 - y0), hypot(x2 - x1, y2 - y1)
+		if len_in == 0 or len_out == 0:
+			continue
+		cos_turn = ((x1 - x0) * (x2 - x1) + (y1 - y0) * (y2 - y1)) / (len_in * len_out)
+		turn = atan2(sqrt(max(0.0, 1 - cos_turn * cos_turn)), cos_turn)
+		if 1e-3 < turn < radians(170):
+			cuts[k] = min(radius * tan(turn / 2), len_in / 2, len_out / 2)
+
+	xs, ys, sample_limits = [], [], []
+
+	def add(x, y, limit):
+		xs.append(x)
+		ys.append(y)
+		sample_limits.append(limit)
+
+	for k in range(len(vertices) - 1):
+		(x0, y0), (x1, y1) = vertices[k], vertices[k + 1]
+		length = hypot(x1 - x0, y1 - y0)
+		if length == 0:
+			continue
+		ux, uy = (x1 - x0) / length, (y1 - y0) / length
+		# Straight part of the street (each half has the limit of its nearest intersection)
+		a, b = cuts[k], length - cuts[k + 1]
+		steps = max(1, ceil((b - a) / SAMPLE_STEP))
+		for i in range(steps):
+			d = a + (b - a) * i / steps
+			add(x0 + ux * d, y0 + uy * d, vertex_limits[k] if d < length / 2 else vertex_limits[k + 1])
+		# Rounded corner around the next intersection (quadratic Bezier curve through the corner)
+		cut = cuts[k + 1]
+		if cut:
+			x2, y2 = vertices[k + 2]
+			out_length = hypot(x2 - x1, y2 - y1)
+			vx, vy = (x2 - x1) / out_length, (y2 - y1) / out_length
+			px, py = x1 - ux * cut, y1 - uy * cut
+			qx, qy = x1 + vx * cut, y1 + vy * cut
+			steps = max(3, ceil(2 * cut / SAMPLE_STEP))
+			for i in range(steps):
+				t = i / steps
+				add((1 - t) ** 2 * px + 2 * t * (1 - t) * x1 + t * t * qx,
+					(1 - t) ** 2 * py + 2 * t * (1 - t) * y1 + t * t * qy, vertex_limits[k + 1])
+	add(vertices[-1][0], vertices[-1][1], vertex_limits[-1])
+
+	# Distance along the trajectory, and curvature from the turn between consecutive samples
+	n = len(xs)
+	s = [0.0] * n
+	for i in range(1, n):
+		s[i] = s[i - 1] + hypot(xs[i] - xs[i - 1], ys[i] - ys[i - 1])
+	speed = [limit * SPEED_MARGIN for limit in sample_limits]
+	for i in range(1, n - 1):
+		h0 = atan2(ys[i] - ys[i - 1], xs[i] - xs[i - 1])
+		h1 = atan2(ys[i + 1] - ys[i], xs[i + 1] - xs[i])
+		turn = abs((h1 - h0 + 3.141592653589793) % 6.283185307179586 - 3.141592653589793)
+		ds = (s[i + 1] - s[i - 1]) / 2
+		if turn > 1e-6 and ds > 0:
+			speed[i] = min(speed[i], sqrt(LATERAL_ACCELERATION * ds / turn))
+
+	# Stop at the end, and brake early enough for every slower part ahead
+	speed[-1] = 0.0
+	for i in range(n - 2, -1, -1):
+		speed[i] = min(speed[i], sqrt(speed[i + 1] ** 2 + 2 * BRAKING * (s[i + 1] - s[i])))
+	return {"x": xs, "y": ys, "s": s, "speed": speed, "length": s[-1]}
+
+
+class PurePursuit:
+	"""
+	Follows a trajectory: steers towards a point ahead of the car on the trajectory and drives at the profile speed.
+	"""
+	def __init__(self, trajectory):
+		"""
+		Params:
+		 - trajectory (dict): The trajectory returned by build_trajectory.
+		Returns: None
+		"""
+		self.trajectory = trajectory
+		self.index = 0				# Sample nearest to the car (only moves forward)
+		self.cross_track = 0.0		# Distance from the car to the trajectory at the last step
+		self.speed = 0.0			# Speed commanded at the last step
+
+	def step(self, x, y, heading, speed, acceleration, dt):
+		"""
+		Computes the car's heading and speed for one frame.
+
+		Params:
+		 - x (float): The car's X.
+		 - y (float): The car's Y.
+		 - heading (float): The car's heading (H) in degrees.
+		 - speed (float): The car's speed.
+		 - acceleration (float): The car's acceleration (from its vehicle model).
+		 - dt (float): The frame time step in seconds.
+		Returns:
+		 - tuple: (heading, speed, arrived): the new heading and speed, and True once the car reached the end.
+		"""
+		traj = self.trajectory
+		xs, ys, s = traj["x"], traj["y"], traj["s"]
+		n = len(xs)
+		# Continue from the commanded speed (the ground's friction slows the car a little every frame),
+		# unless the car was clearly slowed down by something else
+		if speed > self.speed - BLOCKED_SLOWDOWN:
+			speed = self.speed
+
+		# Nearest sample, searching forward from the previous one
+		i = self.index
+		best = (xs[i] - x) ** 2 + (ys[i] - y) ** 2
+		while i + 1 < n:
+			d = (xs[i + 1] - x) ** 2 + (ys[i + 1] - y) ** 2
+			if d > best:
+				break
+			i, best = i + 1, d
+		self.index = i
+		self.cross_track = sqrt(best)
+		if traj["length"] - s[i] < ARRIVE_DISTANCE and self.cross_track < ARRIVE_DISTANCE + SAMPLE_STEP:
+			return heading, 0.0, True
+
+		# Pursued point: the first sample at least one lookahead distance along the trajectory
+		lookahead = min(LOOKAHEAD_MAX, max(LOOKAHEAD_MIN, speed * LOOKAHEAD_TIME))
+		j = i
+		while j + 1 < n and s[j] - s[i] < lookahead:
+			j += 1
+		dx, dy = xs[j] - x, ys[j] - y
+		alpha = (heading_to(dx, dy) - heading + 180) % 360 - 180
+		max_turn = TURN_RATE * dt
+
+		if abs(alpha) > TURN_IN_PLACE:
+			# The car faces away from the trajectory (e.g. at the start): stop and turn in place
+			speed = max(0.0, speed - BRAKING * dt)
+			if speed < 1.0:
+				heading += max(-max_turn, min(max_turn, alpha))
+			self.speed = speed
+			return heading, speed, False
+
+		# Pure pursuit: the arc through the pursued point has curvature 2 sin(alpha) / distance
+		distance = max(hypot(dx, dy), 1e-6)
+		turn = degrees(2 * speed * sin(radians(alpha)) / distance) * dt
+		heading += max(-max_turn, min(max_turn, turn))
+
+		target = traj["speed"][i] * max(0.0, cos(radians(alpha)))
+		if speed < target:
+			speed = min(target, speed + acceleration * dt)
+		else:
+			speed = max(target, speed - BRAKING * dt)
+		self.speed = speed
+		return heading, speed, False